@@ -1,13 +1,32 @@
-import sys
-import os
+"""
+The squad's agents, their registry and the fan-out team.
 
-# Add parent directory to Python path
-_parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-if _parent_dir not in sys.path:
-    sys.path.insert(0, _parent_dir)
+Exports are resolved on first access (PEP 562); the agent factories and the
+registry import autogen only when an agent is built.
+"""
+import importlib
 
-from agents.trendsetter import TrendSetterAgent
-from agents.newsbreaker import NewsBreakerAgent
-from agents.logicqa import LogicQAAgent
+_EXPORTS = {
+    "TrendSetterAgent": "agents.trendsetter",
+    "NewsBreakerAgent": "agents.newsbreaker",
+    "LogicQAAgent": "agents.logicqa",
+    "FanOutTeam": "agents.team",
+    "AgentSpec": "agents.registry",
+    "AGENT_SPECS": "agents.registry",
+    "AgentRegistry": "agents.registry",
+    "get_agent_registry": "agents.registry",
+}
 
-__all__ = ["TrendSetterAgent", "NewsBreakerAgent", "LogicQAAgent"]
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,264 @@
+"""
+Declarative agent registry: what the squad's agents are, built once per process.
+
+Each agent is an ``AgentSpec`` (name, prompt key in ``AgentPrompts``, tool
+names). The ``AgentRegistry`` turns specs into ``AssistantAgent``s and keeps
+everything that is expensive to build around for the next run:
+
+    clients  one model client per (cache mode, provider, event loop), so
+             every run reuses its HTTP connection pool instead of paying for
+             a new client and TLS handshake
+    tools    one set of ``FunctionTool``s per feed store
+    agents   built agents are leased for a run and returned with
+             ``release``, which resets their model context; the next run
+             with the same configuration gets one of those instead of a
+             new agent
+
+Only clients handed out by the registry are pooled; agents built for any
+other client (e.g. a benchmark's fake) are built fresh and dropped on release.
+"""
+import asyncio
+import threading
+from typing import TYPE_CHECKING, NamedTuple
+
+from config.prompts import AgentPrompts
+from config.settings import LLM_STREAMING
+
+if TYPE_CHECKING:
+    from autogen_agentchat.agents import AssistantAgent
+
+DEFAULT_TOOLS = ("post_to_site", "read_site_feed")
+
+
+class AgentSpec(NamedTuple):
+    name: str
+    prompt_key: str
+    tools: tuple = DEFAULT_TOOLS
+
+    @property
+    def system_message(self) -> str:
+        return getattr(AgentPrompts, self.prompt_key)
+
+    def build(self, model_client, tools=(), context_policy=None, stream=None) -> "AssistantAgent":
+        """A new ``AssistantAgent`` for this spec with its own model context."""
+        from autogen_agentchat.agents import AssistantAgent
+        from llm.context import create_model_context
+        return AssistantAgent(
+            name=self.name,
+            model_client=model_client,
+            tools=list(tools),
+            system_message=self.system_message,
+            model_context=create_model_context(context_policy),
+            model_client_stream=LLM_STREAMING if stream is None else stream
+        )
+
+
+# The squad, in turn order
+AGENT_SPECS = (
+    AgentSpec("TrendSetter", "TRENDSETTER"),
+    AgentSpec("NewsBreaker", "NEWSBREAKER"),
+    AgentSpec("LogicQA", "LOGICQA"),
+)
+
+
+class AgentFactory:
+    """
+    Factory for one registered agent; subclasses set ``spec``.
+
+    Typical usage is::
+
+        assistant = LogicQAAgent(model_client, tool_bench=[...]).build()
+
+    model_client:   client the ``AssistantAgent`` generates with
+    tool_bench:     tools it may call (default: none)
+    context_policy: "full", "window", "tokens" or "summary"
+                    (default: ``AGENT_CONTEXT_POLICY``)
+    stream:         emit ``ModelClientStreamingChunkEvent``s (default: ``LLM_STREAMING``)
+    """
+
+    spec = None
+
+    def __init__(self, model_client, tool_bench=None, context_policy=None, stream=None):
+        self.model_client = model_client
+        self.name = self.spec.name
+        self.tool_bench = tool_bench if tool_bench is not None else []
+        self.system_message = self.spec.system_message
+        self.context_policy = context_policy
+        self.stream = LLM_STREAMING if stream is None else stream
+
+    def build(self) -> "AssistantAgent":
+        """Creates and returns the AutoGen AssistantAgent object."""
+        return self.spec.build(self.model_client, self.tool_bench, self.context_policy, self.stream)
+
+
+class _Lease:
+    """A built agent plus the per-agent wrappers that are re-pointed on each lease."""
+
+    def __init__(self, key, owner, agent, client, tools, staged):
+        self.key = key
+        self.owner = owner
+        self.agent = agent
+        self.client = client
+        self.tools = tools
+        self.staged = staged
+
+
+class AgentRegistry:
+    """Builds agents from ``specs`` and reuses clients, tools and agents across runs."""
+
+    def __init__(self, specs=AGENT_SPECS, max_idle=32):
+        self.specs = {spec.name: spec for spec in specs}
+        self.max_idle = max_idle
+        self.agents_built = 0
+        self.agents_reused = 0
+        self._clients = {}
+        self._tools = {}
+        self._idle = {}
+        self._leased = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> list:
+        return list(self.specs)
+
+    # -- shared clients and tools ----------------------------------------------
+
+    def client(self, cache_mode=None, provider=None):
+        """The shared model client for ``cache_mode`` / ``provider`` on the running event loop."""
+        from llm import create_model_client
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            # A client's connection pool is bound to its loop; forget the ones whose loop is gone
+            for key, (client_loop, client) in list(self._clients.items()):
+                if client_loop is not None and client_loop.is_closed():
+                    del self._clients[key]
+                    self._forget_idle(client)
+            key = (cache_mode, provider, id(loop))
+            if key not in self._clients:
+                self._clients[key] = (loop, create_model_client(cache_mode, provider))
+            return self._clients[key][1]
+
+    def tools(self, store=None) -> dict:
+        """Tool name -> ``FunctionTool`` posting to / reading ``store`` (default: the site feed)."""
+        from agents.tools import build_tools, make_feed_tools
+        with self._lock:
+            if id(store) not in self._tools:
+                self._tools[id(store)] = {tool.name: tool for tool in build_tools(*make_feed_tools(store))}
+            return self._tools[id(store)]
+
+    def _owns(self, client) -> bool:
+        with self._lock:
+            return any(owned is client for _, owned in self._clients.values())
+
+    # -- agent leases ------------------------------------------------------------
+
+    def acquire(self, name, client, store=None, recorder=None, context_policy=None, stream=None,
+                staged=False, tools=None):
+        """
+        Lease an agent named ``name`` for one run; hand it back with ``release``.
+
+        store:    feed the default tools post to / read from
+        recorder: ``RunRecorder`` the agent's model and tool time is charged to
+        staged:   post into a staging list (see ``staged_posts``) instead of the
+                  feed, for ``FanOutTeam``
+        tools:    explicit tools instead of the spec's; such agents aren't pooled
+        """
+        from agents.tools import build_tools, make_feed_tools, make_staged_post
+        spec = self.specs[name]
+        stream = LLM_STREAMING if stream is None else stream
+        pooled = tools is None and self._owns(client)
+        key = (name, id(client), id(store), recorder is not None, context_policy, stream, staged)
+        with self._lock:
+            idle = self._idle.get(key) if pooled else None
+            lease = idle.pop() if idle else None
+        if lease is not None:
+            self.agents_reused += 1
+            if recorder is not None:
+                lease.client.recorder = recorder
+                for tool in lease.tools:
+                    tool.recorder = recorder
+        else:
+            self.agents_built += 1
+            staged_posts = [] if staged else None
+            if tools is None:
+                shared = self.tools(store)
+                if staged:
+                    _, read_fn = make_feed_tools(store)
+                    shared = {tool.name: tool for tool in build_tools(make_staged_post(staged_posts), read_fn)}
+                tools = [shared[tool] for tool in spec.tools]
+            model_client = client
+            if recorder is not None:
+                model_client = recorder.client(client, name)
+                tools = recorder.tools(tools, name)
+            agent = spec.build(model_client, tools, context_policy, stream)
+            lease = _Lease(key if pooled else None, client, agent, model_client, tools, staged_posts)
+        with self._lock:
+            self._leased[id(lease.agent)] = lease
+        return lease.agent
+
+    def staged_posts(self, agent) -> list:
+        """The staging list a ``staged=True`` agent's ``post_to_site`` appends to."""
+        return self._leased[id(agent)].staged
+
+    async def release(self, agents):
+        """Reset ``agents`` and keep them for the next run with the same configuration."""
+        from autogen_core import CancellationToken
+        for agent in agents:
+            with self._lock:
+                lease = self._leased.pop(id(agent), None)
+            # Not pooled, or its client has since been closed
+            if lease is None or lease.key is None or not self._owns(lease.owner):
+                continue
+            await agent.on_reset(CancellationToken())
+            if lease.staged is not None:
+                lease.staged.clear()
+            with self._lock:
+                idle = self._idle.setdefault(lease.key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(lease)
+
+    def discard(self, agents):
+        """End ``agents``' leases without pooling them, e.g. when a cancelled run may still be using them."""
+        with self._lock:
+            for agent in agents:
+                self._leased.pop(id(agent), None)
+
+    async def close(self):
+        """Close the clients bound to the running event loop and drop their agents."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            closing = [(key, client) for key, (client_loop, client) in self._clients.items() if client_loop is loop]
+            for key, client in closing:
+                del self._clients[key]
+                self._forget_idle(client)
+        for _, client in closing:
+            await client.close()
+
+    def _forget_idle(self, client):
+        for key in [key for key in self._idle if key[1] == id(client)]:
+            del self._idle[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "agents_built": self.agents_built,
+                "agents_reused": self.agents_reused,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Return the process-wide registry of the squad's agents."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+        return _registry
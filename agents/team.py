@@ -0,0 +1,127 @@
+"""
+Fan-out team: agents whose turns don't depend on each other run concurrently.
+
+``RoundRobinGroupChat`` runs one agent at a time. ``FanOutTeam`` takes the
+dependencies between turns instead (``{"LogicQA": ["TrendSetter",
+"NewsBreaker"]}``) and, in every cycle, starts each agent as soon as the
+agents it depends on have answered, so a cycle takes about as long as its
+longest chain of turns rather than the sum of all of them.
+
+Agents post through a staging buffer (``agents.tools.make_staged_post``).
+Each agent's posts are committed once it and every agent before it in the
+declared order are done, so the feed order is the same on every run no
+matter which model call returns first.
+"""
+import asyncio
+from datetime import datetime
+
+from autogen_agentchat.base import Response, TaskResult
+from autogen_agentchat.messages import TextMessage
+from autogen_core import CancellationToken
+
+_DONE = object()
+
+
+def turn_order(names, depends_on) -> list:
+    """Topological order of ``names``, ties broken by declaration order."""
+    order, placed = [], set()
+    while len(order) < len(names):
+        ready = [n for n in names if n not in placed and all(d in placed for d in depends_on.get(n, ()))]
+        if not ready:
+            raise ValueError(f"Cyclic turn dependencies: {depends_on}")
+        order.append(ready[0])
+        placed.add(ready[0])
+    return order
+
+
+class FanOutTeam:
+    """
+    Runs ``cycles`` rounds of ``participants`` honouring ``depends_on``.
+
+    participants: agents (``AssistantAgent``), in the order their posts land
+    depends_on:   agent name -> names whose answer in the same cycle it needs
+    staged:       agent name -> list its ``post_to_site`` tool appends to
+    writer:       ``FeedWriter`` the staged posts are committed through
+
+    Every agent also receives the other agents' answers from earlier cycles,
+    so it sees the whole conversation like in a round-robin chat.
+    """
+
+    def __init__(self, participants, depends_on, staged, writer, cycles=3):
+        self.participants = {agent.name: agent for agent in participants}
+        for name, deps in depends_on.items():
+            unknown = [d for d in [name, *deps] if d not in self.participants]
+            if unknown:
+                raise ValueError(f"Unknown agents in turn dependencies: {unknown}")
+        self.depends_on = depends_on
+        self.order = turn_order(list(self.participants), depends_on)
+        self.staged = staged
+        self.writer = writer
+        self.cycles = cycles
+
+    async def _commit(self, name):
+        posts = self.staged.get(name, [])
+        batch, posts[:] = list(posts), []
+        if batch:
+            now = datetime.now().isoformat()  # stamp in commit order so time and feed order agree
+            await self.writer.write_many_async([dict(post, timestamp=now) for post in batch])
+
+    async def _cycle(self, transcript, seen, events, token):
+        """One round: run every agent when its inputs are ready, commit in order."""
+        history = list(transcript)
+        answered = {name: asyncio.Event() for name in self.participants}
+        answers = {}
+
+        async def take_turn(name):
+            for dep in self.depends_on.get(name, ()):
+                await answered[dep].wait()
+            inputs = [m for m in history if id(m) not in seen[name] and m.source != name]
+            inputs += [answers[dep] for dep in self.depends_on.get(name, ())]
+            seen[name].update(id(m) for m in inputs)
+            async for item in self.participants[name].on_messages_stream(inputs, token):
+                if isinstance(item, Response):
+                    answers[name] = item.chat_message
+                    await events.put(item.chat_message)
+                else:
+                    await events.put(item)
+            answered[name].set()
+
+        async def commit_in_order():
+            for name in self.order:
+                await answered[name].wait()
+                await self._commit(name)
+                transcript.append(answers[name])
+
+        tasks = [asyncio.create_task(take_turn(name)) for name in self.order]
+        tasks.append(asyncio.create_task(commit_in_order()))
+        try:
+            for task in asyncio.as_completed(tasks):
+                await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await events.put(_DONE)
+
+    async def run_stream(self, task, cancellation_token=None):
+        """
+        Yield the task, every agent event and message, then a ``TaskResult``.
+
+        Cancelling ``cancellation_token`` stops the agents' in-flight calls.
+        """
+        task_message = TextMessage(content=task, source="user")
+        yield task_message
+        transcript = [task_message]
+        seen = {name: set() for name in self.participants}
+        token = CancellationToken()
+        if cancellation_token is not None:
+            cancellation_token.add_callback(token.cancel)
+        try:
+            for _ in range(self.cycles):
+                events = asyncio.Queue()
+                cycle = asyncio.create_task(self._cycle(transcript, seen, events, token))
+                while (item := await events.get()) is not _DONE:
+                    yield item
+                await cycle  # re-raises a failed turn
+        finally:
+            token.cancel()
+        yield TaskResult(messages=transcript, stop_reason=f"Completed {self.cycles} fan-out cycles")
@@ -1,29 +1,82 @@
-import json
-import sys
-import os
 from datetime import datetime
-sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-# noinspection PyUnresolvedReferences
-from config.settings import FEED_PATH
+
+from feed import get_feed_digest, get_feed_writer
+from feed.dedup import DuplicatePost
+from feed.post import Post
+
+POSTED = "✅ Posted by"  # prefix of a post_to_site reply for a post that was stored
+
+def _make_post(author: str, text: str) -> Post:
+    return Post(author, text, datetime.now().isoformat())
+
+def _duplicate_reply(e: DuplicatePost) -> str:
+    # Tell the agent why, so its next attempt says something new instead of retrying
+    return (f"🔁 Not posted ({e.action}): too close to an earlier post by {e.author or 'another agent'}. "
+            f"Post something new instead.")
 
 def post_to_site(author: str, text: str) -> str:
     """Append a post to the site feed with timestamp."""
-    with open(FEED_PATH, 'r+', encoding='utf-8') as f:
-        feed = json.load(f)
-        post = {
-            'author': author,
-            'text': text,
-            'timestamp': datetime.now().isoformat()
-        }
-        feed.setdefault('posts', []).append(post)
-        f.seek(0)
-        json.dump(feed, f, ensure_ascii=False, indent=2)
-        f.truncate()
-    return f"✅ Posted by {author}: {text[:50]}..."
+    try:
+        get_feed_writer().write(_make_post(author, text))
+    except DuplicatePost as e:
+        return _duplicate_reply(e)
+    return f"{POSTED} {author}: {text[:50]}..."
 
 def read_site_feed() -> str:
-    """Read all posts from the site feed."""
-    with open(FEED_PATH, 'r', encoding='utf-8') as f:
-        feed = json.load(f)
-        posts = feed.get('posts', [])
-        return f"Feed has {len(posts)} posts"
+    """Read a token-bounded digest of the site feed: latest posts per author and trending keywords."""
+    return get_feed_digest().text()
+
+def make_feed_tools(store=None):
+    """
+    Return ``(post_to_site, read_site_feed)`` coroutine functions bound to ``store``.
+
+    Being coroutines, they run on the caller's event loop instead of tying up
+    an executor thread while the group commit is pending, which matters when
+    many squads share one loop. ``store=None`` means the shared site feed.
+    """
+    writer = get_feed_writer(store)
+    digest = get_feed_digest(store)
+
+    async def post_to_site(author: str, text: str) -> str:
+        """Append a post to the site feed with timestamp."""
+        try:
+            await writer.write_async(_make_post(author, text))
+        except DuplicatePost as e:
+            return _duplicate_reply(e)
+        return f"{POSTED} {author}: {text[:50]}..."
+
+    async def read_site_feed() -> str:
+        """Read a token-bounded digest of the site feed: latest posts per author and trending keywords."""
+        return digest.text()
+
+    return post_to_site, read_site_feed
+
+def make_staged_post(staged: list):
+    """
+    Return a ``post_to_site`` coroutine that appends to ``staged`` instead of the feed.
+
+    Used by teams that run agents concurrently and commit their posts
+    afterwards in a fixed order, so the feed order doesn't depend on which
+    agent's model answered first.
+    """
+    async def post_to_site(author: str, text: str) -> str:
+        """Append a post to the site feed with timestamp."""
+        staged.append(_make_post(author, text))
+        return f"{POSTED} {author}: {text[:50]}..."
+
+    return post_to_site
+
+def build_tools(post_fn=post_to_site, read_fn=read_site_feed):
+    """Wrap the feed functions as FunctionTools for the agents."""
+    from autogen_core.tools import FunctionTool
+    post_tool = FunctionTool(
+        post_fn,
+        name="post_to_site",
+        description="Post a message to the social feed. Args: author (str), text (str)"
+    )
+    read_tool = FunctionTool(
+        read_fn,
+        name="read_site_feed",
+        description="Read a short digest of the social feed: latest posts per author and trending keywords"
+    )
+    return [post_tool, read_tool]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Feed record codec benchmark: parse time and memory of a large feed per format.
+
+Writes one synthetic feed of ``--posts`` posts (default 1M) in each on-disk
+shape the readers meet:
+
+    feed_json   the legacy ``feed.json`` document (``json.load`` -> dicts)
+    v1          JSON-lines segments, as written before record formats existed
+    v2          the compact tagged records ``FEED_RECORD_FORMAT=v2`` writes
+
+and then loads it into a list in a fresh interpreter per case, reporting the
+parse time and the resident memory the loaded posts add. The ``*_index``
+cases decode only the author and timestamp, as ``FeedIndex`` does. Encode
+time per format is measured while writing the files.
+
+Usage:
+    python benchmarks/bench_codec.py [--posts 1000000] [--text-chars 160] [--runs 1]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from feed.post import Post, V1, V2, decode_post, encode_post
+
+AUTHORS = ["TrendSetter", "NewsBreaker", "LogicQA"]
+INDEX_FIELDS = ("author", "timestamp")
+
+# case -> (file, loader); loaders run in the worker process
+CASES = {
+    "feed_json_dicts": ("feed.json", "feed_json"),
+    "v1_dicts": ("v1.jsonl", "json_lines"),
+    "v1_posts": ("v1.jsonl", "posts"),
+    "v2_posts": ("v2.jsonl", "posts"),
+    "v1_index": ("v1.jsonl", "index"),
+    "v2_index": ("v2.jsonl", "index"),
+}
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def synthetic_posts(count, text_chars):
+    text = ("lorem ipsum dolor sit amet\n" * (text_chars // 27 + 1))[:text_chars]
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield Post(AUTHORS[i % 3], f"{i} {text}", (start + timedelta(seconds=i)).isoformat())
+
+
+def write_fixtures(workdir, count, text_chars) -> dict:
+    """Write the three feed files; returns encode seconds and file bytes per format."""
+    stats = {}
+    for record_format in (V1, V2):
+        path = os.path.join(workdir, f"{record_format}.jsonl")
+        encode_s = 0.0
+        with open(path, 'wb') as f:
+            batch = []
+            for post in synthetic_posts(count, text_chars):
+                started = time.perf_counter()
+                batch.append(encode_post(post, record_format))
+                encode_s += time.perf_counter() - started
+                if len(batch) >= 10000:
+                    f.write(b''.join(batch))
+                    batch = []
+            f.write(b''.join(batch))
+        stats[record_format] = {"encode_s": encode_s, "bytes": os.path.getsize(path)}
+    path = os.path.join(workdir, "feed.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"posts": [p.to_dict() for p in synthetic_posts(count, text_chars)]}, f,
+                  ensure_ascii=False, indent=2)
+    stats["feed_json"] = {"encode_s": None, "bytes": os.path.getsize(path)}
+    return stats
+
+
+def worker(loader, path):
+    """Load ``path`` with ``loader`` and print parse seconds and added RSS as JSON."""
+    before = rss_bytes()
+    started = time.perf_counter()
+    if loader == "feed_json":
+        with open(path, 'r', encoding='utf-8') as f:
+            posts = json.load(f)["posts"]
+    else:
+        with open(path, 'rb') as f:
+            if loader == "json_lines":
+                posts = [json.loads(line) for line in f]
+            elif loader == "posts":
+                posts = [decode_post(line) for line in f]
+            else:
+                posts = [decode_post(line, INDEX_FIELDS) for line in f]
+    parse_s = time.perf_counter() - started
+    print(json.dumps({"parse_s": parse_s, "rss_bytes": rss_bytes() - before, "posts": len(posts)}))
+
+
+def run_case(case, workdir):
+    filename, loader = CASES[case]
+    out = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--worker", loader,
+                                   os.path.join(workdir, filename)], text=True)
+    return json.loads(out)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark feed parse time and memory per record format.")
+    parser.add_argument("--posts", type=int, default=1_000_000, help="posts in the synthetic feed (default: 1M)")
+    parser.add_argument("--text-chars", type=int, default=160, help="characters of text per post")
+    parser.add_argument("--runs", type=int, default=1, help="fresh interpreters per case (median is reported)")
+    parser.add_argument("--cases", default=','.join(CASES), help="comma-separated cases to run")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/codec-<commit>.json)")
+    parser.add_argument("--worker", nargs=2, metavar=("LOADER", "PATH"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(args):
+    from bench_workflow import git_commit, RESULTS_DIR
+    workdir = tempfile.mkdtemp(prefix='codec-bench-')
+    try:
+        print(f"📝 Writing {args.posts} posts per format...")
+        files = write_fixtures(workdir, args.posts, args.text_chars)
+        results = []
+        for case in [c.strip() for c in args.cases.split(',') if c.strip()]:
+            print(f"⏱️  {case}...")
+            runs = [run_case(case, workdir) for _ in range(args.runs)]
+            results.append({
+                "case": case,
+                "parse_s": statistics.median(r["parse_s"] for r in runs),
+                "rss_mb": statistics.median(r["rss_bytes"] for r in runs) / 2 ** 20,
+                "posts": runs[0]["posts"],
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'format':<10} {'file MB':>9} {'encode s':>9}")
+    for name, stats in files.items():
+        encode = f"{stats['encode_s']:.2f}" if stats['encode_s'] is not None else "-"
+        print(f"{name:<10} {stats['bytes'] / 2 ** 20:>9.1f} {encode:>9}")
+    print(f"\n{'case':<17} {'parse s':>8} {'us/post':>8} {'RSS MB':>8} {'B/post':>7}")
+    for r in results:
+        print(f"{r['case']:<17} {r['parse_s']:>8.2f} {r['parse_s'] / r['posts'] * 1e6:>8.2f} "
+              f"{r['rss_mb']:>8.1f} {r['rss_mb'] * 2 ** 20 / r['posts']:>7.0f}")
+
+    report = {
+        "benchmark": "codec",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"posts": args.posts, "text_chars": args.text_chars, "runs": args.runs},
+        "files": files,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"codec-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    if cli_args.worker:
+        worker(*cli_args.worker)
+    else:
+        main(cli_args)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens per turn under each agent context policy.
+
+Runs the squad on ``FakeChatCompletionClient`` once per policy with the run
+instrumentation from ``telemetry`` and reports the prompt tokens of every
+model call: at a few checkpoints, in total, and per turn in the JSON output.
+
+Usage:
+    python benchmarks/bench_context.py [--policies full,window,tokens,summary] [--max-messages 30]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from main import build_squad, DEFAULT_MISSION
+from config import settings
+from agents.tools import build_tools, make_feed_tools
+from feed import get_feed_store, get_feed_writer
+from llm.context import CONTEXT_POLICIES
+from llm.fake import FakeChatCompletionClient
+from telemetry import RunRecorder
+from bench_workflow import git_commit, RESULTS_DIR
+
+CHECKPOINTS = (1, 10, 20, 30)
+
+
+async def run_policy(policy, args):
+    workdir = tempfile.mkdtemp(prefix='context-bench-')
+    try:
+        store = get_feed_store(os.path.join(workdir, 'feed'))
+        client = FakeChatCompletionClient(latency=args.latency_ms / 1000, response_chars=args.response_chars)
+        recorder = RunRecorder(f"context-{policy}")
+        squad = build_squad(client, build_tools(*make_feed_tools(store)), args.max_messages, recorder, policy)
+        async for event in squad.run_stream(task=DEFAULT_MISSION):
+            recorder.observe(event)
+        recorder.close()
+        get_feed_writer(store).stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    per_turn = [turn["prompt_tokens"] for turn in recorder.turns]
+    return {
+        "policy": policy,
+        "turns": len(per_turn),
+        "prompt_tokens_per_turn": per_turn,
+        "prompt_tokens_total": sum(per_turn),
+        "turn_ms_total": sum(turn["turn_ms"] for turn in recorder.turns),
+    }
+
+
+def print_table(results):
+    marks = [c for c in CHECKPOINTS if any(len(r["prompt_tokens_per_turn"]) >= c for r in results)]
+    header = f"{'policy':<10} " + ' '.join(f"{'turn ' + str(c):>9}" for c in marks) + f" {'total':>9} {'vs full':>8}"
+    print('\n' + header)
+    full = next((r["prompt_tokens_total"] for r in results if r["policy"] == "full"), None)
+    for r in results:
+        tokens = r["prompt_tokens_per_turn"]
+        cells = ' '.join(f"{tokens[c - 1] if len(tokens) >= c else '-':>9}" for c in marks)
+        saving = f"{(1 - r['prompt_tokens_total'] / full) * 100:>7.1f}%" if full else f"{'-':>8}"
+        print(f"{r['policy']:<10} {cells} {r['prompt_tokens_total']:>9} {saving}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare prompt tokens per turn across context policies.")
+    parser.add_argument("--policies", default=','.join(CONTEXT_POLICIES), help="comma-separated policies to run")
+    parser.add_argument("--max-messages", type=int, default=30, help="message cap per run")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake model latency per call")
+    parser.add_argument("--response-chars", type=int, default=240, help="length of each generated post")
+    parser.add_argument("--window", type=int, default=settings.AGENT_CONTEXT_WINDOW,
+                        help="messages kept by the window and summary policies")
+    parser.add_argument("--max-tokens", type=int, default=1000, help="budget of the tokens policy")
+    parser.add_argument("--summary-chars", type=int, default=settings.AGENT_CONTEXT_SUMMARY_CHARS,
+                        help="size cap of the rolling summary")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/context-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+async def main(args):
+    # create_model_context reads its sizes from the settings module on every call
+    settings.AGENT_CONTEXT_WINDOW = args.window
+    settings.AGENT_CONTEXT_MAX_TOKENS = args.max_tokens
+    settings.AGENT_CONTEXT_SUMMARY_CHARS = args.summary_chars
+    results = []
+    for policy in [p.strip() for p in args.policies.split(',') if p.strip()]:
+        print(f"⏱️  policy {policy}...")
+        results.append(await run_policy(policy, args))
+    print_table(results)
+
+    report = {
+        "benchmark": "context",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"context-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
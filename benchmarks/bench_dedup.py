@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection benchmark: signing throughput, screening cost and recall.
+
+Builds a synthetic feed of ``--posts`` posts (Zipf-distributed words, see
+bench_search.py), signs it in batches, then screens ``--probes`` new posts
+against it: half are light edits of stored posts (a word swapped, a hashtag
+or punctuation added), half are fresh posts. Reports signing throughput,
+screening latency, how many stored posts each check compared against (the
+LSH candidates, versus the whole feed for a linear scan), and recall / false
+positives on the probes.
+
+Usage:
+    python benchmarks/bench_dedup.py [--posts 200000] [--probes 1000] [--threshold 0.7]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# noinspection PyUnresolvedReferences
+from feed.dedup import _Table, signatures
+from bench_search import synthetic_posts, vocabulary
+
+
+def edit(text, rng, vocab):
+    """A light rewrite: one word replaced, plus a tag or punctuation."""
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(vocab[:2000])
+    return ' '.join(words) + rng.choice(["!", " #AI", "?!", " 🚀"])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection over a large feed.")
+    parser.add_argument("--posts", type=int, default=200_000, help="posts already in the feed")
+    parser.add_argument("--probes", type=int, default=1000, help="new posts screened (half near-duplicates)")
+    parser.add_argument("--words", type=int, default=24, help="words per post")
+    parser.add_argument("--threshold", type=float, default=0.7, help="similarity from which posts are near-duplicates")
+    parser.add_argument("--batch", type=int, default=1024, help="posts signed per numpy pass")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/dedup-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(args):
+    from bench_workflow import git_commit, RESULTS_DIR
+    vocab = vocabulary(50_000)
+    texts = [post.text for post in synthetic_posts(args.posts, args.words, vocab)]
+
+    print(f"🔏 Signing {args.posts} posts in batches of {args.batch}...")
+    table = _Table()
+    started = time.perf_counter()
+    for start in range(0, len(texts), args.batch):
+        for keys, sig in signatures(texts[start:start + args.batch]):
+            table.add(keys, sig)
+    sign_s = time.perf_counter() - started
+    started = time.perf_counter()
+    table.freeze()
+    freeze_s = time.perf_counter() - started
+
+    rng = random.Random(3)
+    originals = rng.sample(range(len(texts)), args.probes // 2)
+    fresh = [post.text for post in synthetic_posts(args.probes - len(originals), args.words, vocab, seed=99)]
+    probes = [(edit(texts[i], rng, vocab), True) for i in originals] + [(text, False) for text in fresh]
+
+    latencies, candidates, found, false_hits = [], [], 0, 0
+    for text, is_duplicate in probes:
+        started = time.perf_counter()
+        keys, sig = signatures([text])[0]
+        hit = table.nearest(keys, sig, args.threshold)
+        latencies.append((time.perf_counter() - started) * 1000)
+        candidates.append(len(table.candidates(keys)))
+        if hit is not None:
+            found += is_duplicate
+            false_hits += not is_duplicate
+    latencies.sort()
+
+    result = {
+        "sign_us_per_post": sign_s / args.posts * 1e6,
+        "freeze_s": freeze_s,
+        "screen_p50_ms": statistics.median(latencies),
+        "screen_p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "candidates_mean": statistics.mean(candidates),
+        "candidates_max": max(candidates),
+        "recall": found / len(originals),
+        "false_positives": false_hits,
+    }
+    print(f"\nsign          {result['sign_us_per_post']:.1f} µs/post • band tables sorted in {freeze_s:.2f}s")
+    print(f"screen        p50 {result['screen_p50_ms']:.2f} ms • p95 {result['screen_p95_ms']:.2f} ms")
+    print(f"compared      {result['candidates_mean']:.1f} posts on average (max {result['candidates_max']}) "
+          f"of {args.posts}")
+    print(f"recall        {result['recall']:.1%} of {len(originals)} edited posts • "
+          f"{false_hits} false positives in {len(fresh)} fresh posts")
+
+    report = {
+        "benchmark": "dedup",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"posts": args.posts, "probes": args.probes, "words": args.words,
+                   "threshold": args.threshold, "batch": args.batch},
+        "result": result,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"dedup-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
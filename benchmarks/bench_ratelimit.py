@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Many squads against a rate-limited fake endpoint, with and without the scheduler.
+
+The fake endpoint (``FakeChatCompletionClient(rpm_limit=...)``) answers 429
+once more than ``--limit`` calls land in a rolling ``--window`` seconds. In
+"direct" mode squads call it unguarded; in "scheduler" mode the calls go
+through ``RateLimitedChatCompletionClient`` with a ``ModelScheduler`` sized
+to the same limit. Reports completed turns, failed squads, 429s and time.
+
+Usage:
+    python benchmarks/bench_ratelimit.py [--squads 8] [--limit 40] [--window 5] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from main import build_squad, DEFAULT_MISSION
+from agents.tools import build_tools, make_feed_tools
+from feed import get_feed_store, get_feed_writer
+from llm.fake import FakeChatCompletionClient
+from llm.ratelimit import ModelScheduler, RateLimitedChatCompletionClient
+from bench_workflow import git_commit, RESULTS_DIR
+
+
+async def run_one(client, store, max_messages):
+    squad = build_squad(client, build_tools(*make_feed_tools(store)), max_messages)
+    turns = 0
+    try:
+        async for event in squad.run_stream(task=DEFAULT_MISSION):
+            if getattr(event, 'source', 'user') != 'user' and type(event).__name__ != 'TaskResult':
+                turns += 1
+        return turns, False
+    except Exception:
+        return turns, True
+
+
+async def run_mode(mode, args):
+    endpoint = FakeChatCompletionClient(latency=args.latency_ms / 1000, rpm_limit=args.limit,
+                                        rate_window=args.window, jitter=args.latency_ms / 2000)
+    scheduler = None
+    client = endpoint
+    if mode == "scheduler":
+        # Sized to the endpoint: limit per window, expressed per minute, with a burst of one window
+        scheduler = ModelScheduler(rpm=args.limit * 60 / args.window, rpm_burst=args.limit,
+                                   max_concurrency=args.squads, retry_base=0.1, retry_max=args.window)
+        client = RateLimitedChatCompletionClient(endpoint, scheduler)
+
+    workdir = tempfile.mkdtemp(prefix='ratelimit-bench-')
+    try:
+        store = get_feed_store(os.path.join(workdir, 'feed'))
+        started = time.perf_counter()
+        results = await asyncio.gather(*[run_one(client, store, args.max_messages) for _ in range(args.squads)])
+        elapsed = time.perf_counter() - started
+        get_feed_writer(store).stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "turns": sum(turns for turns, _ in results),
+        "failed_squads": sum(failed for _, failed in results),
+        "model_calls": endpoint.calls,
+        "http_429": endpoint.rejected,
+        "scheduler": scheduler.stats() if scheduler else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the model request scheduler against 429s.")
+    parser.add_argument("--squads", type=int, default=8, help="squads run concurrently")
+    parser.add_argument("--max-messages", type=int, default=10, help="message cap per squad")
+    parser.add_argument("--limit", type=int, default=40, help="calls the fake endpoint accepts per window")
+    parser.add_argument("--window", type=float, default=5.0, help="fake endpoint rate window in seconds")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake model latency per call")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/ratelimit-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+async def main(args):
+    results = []
+    for mode in ("direct", "scheduler"):
+        print(f"⏱️  {mode}...")
+        results.append(await run_mode(mode, args))
+
+    print(f"\n{'mode':<10} {'time s':>8} {'turns':>6} {'failed':>7} {'calls':>6} {'429s':>5} {'retries':>8}")
+    for r in results:
+        retries = r["scheduler"]["retries"] if r["scheduler"] else 0
+        print(f"{r['mode']:<10} {r['elapsed_s']:>8.2f} {r['turns']:>6} {r['failed_squads']:>7} "
+              f"{r['model_calls']:>6} {r['http_429']:>5} {retries:>8}")
+
+    report = {
+        "benchmark": "ratelimit",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"ratelimit-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
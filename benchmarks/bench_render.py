@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Feed rendering benchmark: Streamlit rerun time and payload against posts shown.
+
+For each page size in ``--posts`` it fills a fresh feed, opens site/app.py
+in Streamlit's AppTest harness with that many posts loaded (as if "Load
+more" had been clicked) and times ``--repeat`` reruns in each render mode:
+
+    widgets   columns, buttons and markdown elements for every post
+    html      one pre-rendered HTML element per page, fragments cached
+
+Besides the median rerun time it reports the elements and protobuf bytes
+the rerun sends to the browser, which is what the websocket carries and the
+DOM has to hold.
+
+Usage:
+    python benchmarks/bench_render.py [--posts 20,100,300,500] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+MODES = ("widgets", "html")
+PAGE_SIZE = 20  # site/app.py's posts per "Load more" click
+
+
+def page_size(at):
+    """``(elements, bytes)`` of the rendered page."""
+    elements, size = 0, 0
+    stack = [at._tree]
+    while stack:
+        node = stack.pop()
+        children = getattr(node, 'children', None)
+        if isinstance(children, dict):
+            stack.extend(children.values())
+        proto = getattr(node, 'proto', None)
+        if proto is not None:
+            elements += 1
+            size += proto.ByteSize()
+    return elements, size
+
+
+def measure(app_path, posts, mode, repeat):
+    import config.settings
+    from streamlit.testing.v1 import AppTest
+    config.settings.FEED_RENDER_MODE = mode  # the app re-imports it on every run
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.session_state["feed_pages"] = -(-posts // PAGE_SIZE)
+    started = time.perf_counter()
+    at.run()
+    first_ms = (time.perf_counter() - started) * 1000
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception}")
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - started) * 1000)
+    elements, size = page_size(at)
+    return {"posts": posts, "mode": mode, "first_run_ms": first_ms, "rerun_ms": statistics.median(timings),
+            "elements": elements, "payload_kb": size / 1024}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit rerun time against posts on the page.")
+    parser.add_argument("--posts", default="20,100,300,500", help="comma-separated posts on the page")
+    parser.add_argument("--repeat", type=int, default=5, help="reruns timed per case (median is reported)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/render-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(args):
+    sizes = [int(n) for n in args.posts.split(',') if n.strip()]
+    workdir = tempfile.mkdtemp(prefix='render-bench-')
+    # Before anything reads config.settings
+    os.environ["FEED_STORE_DIR"] = os.path.join(workdir, 'feed')
+    os.environ["RUN_TRACE_DIR"] = os.path.join(workdir, 'run_traces')
+    os.environ["RUN_METRICS_PATH"] = os.path.join(workdir, 'run_metrics.jsonl')
+    from bench_workflow import git_commit, prefill, RESULTS_DIR
+    from feed import get_feed_store
+    app_path = os.path.join(ROOT, 'site', 'app.py')
+    results = []
+    try:
+        prefill(get_feed_store(), max(sizes))
+        for posts in sizes:
+            for mode in MODES:
+                print(f"🖼️  {posts} posts, {mode}...")
+                results.append(measure(app_path, posts, mode, args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'posts':>6} {'mode':<8} {'first ms':>9} {'rerun ms':>9} {'elements':>9} {'payload':>10}")
+    for r in results:
+        print(f"{r['posts']:>6} {r['mode']:<8} {r['first_run_ms']:>9.0f} {r['rerun_ms']:>9.0f} {r['elements']:>9} "
+              f"{r['payload_kb']:>8.0f}KB")
+
+    report = {
+        "benchmark": "render",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"posts": sizes, "repeat": args.repeat},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"render-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
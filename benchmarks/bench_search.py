@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark: query latency of the feed's inverted index.
+
+Writes a synthetic feed of ``--posts`` posts (default 1M) whose words follow
+a Zipf distribution over a ``--vocab``-word vocabulary, so the index holds
+both very common and rare terms. It then times building and reloading the
+index (``SearchIndex.rebuild`` and a cold load of the snapshot) and runs each
+query shape ``--repeat`` times:
+
+    rare / common        one word from the tail / head of the distribution
+    two_terms            a common and a mid-frequency word (AND)
+    three_terms          three mid-frequency words
+    phrase               a quoted two-word phrase taken from a stored post
+    common_phrase        the two most common words as a phrase (worst case)
+    author               a common word restricted to one author
+
+Usage:
+    python benchmarks/bench_search.py [--posts 1000000] [--repeat 50]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from feed.post import Post
+from feed.search import SearchIndex, index_terms, tokenize
+from feed.store import SegmentedFeedStore
+
+AUTHORS = ["TrendSetter", "NewsBreaker", "LogicQA"]
+TARGET_MS = 10.0
+
+
+def vocabulary(size):
+    """Pronounceable pseudo-words, most frequent first."""
+    rng = random.Random(7)
+    syllables = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"]
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def synthetic_posts(count, words_per_post, vocab, seed=42):
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocab) + 1)))
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        words = rng.choices(vocab, cum_weights=cum_weights, k=words_per_post)
+        yield Post(AUTHORS[i % 3], ' '.join(words), (start + timedelta(seconds=i)).isoformat())
+
+
+def write_feed(directory, count, words_per_post, vocab):
+    store = SegmentedFeedStore(directory, segment_max_bytes=64 * 1024 * 1024)
+    batch = []
+    for post in synthetic_posts(count, words_per_post, vocab):
+        batch.append(post)
+        if len(batch) >= 10000:
+            store.append_many(batch)
+            batch = []
+    store.append_many(batch)
+    return store
+
+
+def pick_queries(index, store):
+    """One query per shape, drawn from the terms actually indexed."""
+    by_df = sorted(index.postings, key=lambda term: len(index.postings[term].docs))
+    mid = by_df[len(by_df) * 9 // 10:]  # the top decile: frequent enough to intersect
+    rng = random.Random(1)
+    text = store.read_at(index.doc_offsets[len(index) // 2]).get('text', '')
+    tokens = [t for t in tokenize(text) if index_terms([t])]
+    return {
+        "rare": (by_df[len(by_df) // 2], None),
+        "common": (by_df[-1], None),
+        "two_terms": (f"{by_df[-1]} {rng.choice(mid)}", None),
+        "three_terms": (' '.join(rng.sample(mid, 3)), None),
+        "phrase": (f'"{tokens[0]} {tokens[1]}"', None),
+        "common_phrase": (f'"{by_df[-1]} {by_df[-2]}"', None),
+        "author": (by_df[-2], AUTHORS[1]),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark full-text search latency over a large feed.")
+    parser.add_argument("--posts", type=int, default=1_000_000, help="posts in the synthetic feed (default: 1M)")
+    parser.add_argument("--words", type=int, default=24, help="words per post")
+    parser.add_argument("--vocab", type=int, default=50_000, help="distinct words in the synthetic vocabulary")
+    parser.add_argument("--repeat", type=int, default=50, help="runs per query (p50/p95 are reported)")
+    parser.add_argument("--limit", type=int, default=20, help="results per query")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/search-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(args):
+    from bench_workflow import git_commit, RESULTS_DIR
+    workdir = tempfile.mkdtemp(prefix='search-bench-')
+    try:
+        print(f"📝 Writing {args.posts} posts...")
+        store = write_feed(workdir, args.posts, args.words, vocabulary(args.vocab))
+
+        print("🔨 Building the index...")
+        started = time.perf_counter()
+        index = SearchIndex(store).rebuild()
+        build_s = time.perf_counter() - started
+        started = time.perf_counter()
+        index = SearchIndex(store).sync()
+        load_s = time.perf_counter() - started
+        print(f"   {len(index)} posts, {len(index.postings)} terms • build {build_s:.1f}s • load {load_s:.2f}s "
+              f"• {os.path.getsize(index.path) / 2 ** 20:.0f} MB on disk")
+
+        results = []
+        for case, (query, author) in pick_queries(index, store).items():
+            timings, last = [], None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                last = index.search(query, author=author, limit=args.limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results.append({
+                "case": case, "query": query, "author": author, "hits": len(last.hits),
+                "matched": last.matched, "truncated": last.truncated,
+                "p50_ms": statistics.median(timings), "p95_ms": timings[int(len(timings) * 0.95) - 1],
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'case':<14} {'hits':>5} {'matched':>9} {'p50 ms':>8} {'p95 ms':>8}  query")
+    for r in results:
+        matched = f"{r['matched']}{'+' if r['truncated'] else ''}"
+        status = "✅" if r["p95_ms"] <= TARGET_MS else "⚠️"
+        author = f" (author={r['author']})" if r["author"] else ""
+        print(f"{r['case']:<14} {r['hits']:>5} {matched:>9} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}  "
+              f"{r['query']}{author} {status}")
+
+    report = {
+        "benchmark": "search",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"posts": args.posts, "words": args.words, "vocab": args.vocab, "repeat": args.repeat,
+                   "limit": args.limit, "max_candidates": index.max_candidates},
+        "build_s": build_s,
+        "load_s": load_s,
+        "terms": len(index.postings),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"search-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
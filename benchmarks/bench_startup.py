@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Startup import-time budget for the CLI entry points and the Streamlit app.
+
+Each target runs in a fresh interpreter under ``python -X importtime``. The
+reported import time is the cumulative time of the top-level imports the
+target itself triggers (interpreter startup imports, measured with
+``python -c pass``, are excluded). For the app only the imports made while
+the script renders its first page count: streamlit and its test harness are
+warmed up on a trivial page first, as a running server would have them.
+
+A target fails if its median import time is over budget or if it imports a
+module that it should only load on demand (autogen, openai, dotenv). The
+exit status is 1 if any target fails, so this can gate CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget view_feed=60 ...]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from feed import get_feed_store
+from bench_workflow import git_commit, prefill, RESULTS_DIR
+
+# Milliseconds of import time each target may spend on its own imports
+BUDGETS_MS = {"view_feed": 60.0, "main_help": 80.0, "app_first_paint": 150.0}
+LAZY_MODULES = ("autogen_agentchat", "autogen_core", "autogen_ext", "openai", "dotenv")
+MARKER = "--- first paint ---"
+
+APP_SCRIPT = f"""
+import os, sys, tempfile
+from streamlit.testing.v1 import AppTest
+warmup = os.path.join(tempfile.mkdtemp(), 'warmup.py')
+with open(warmup, 'w') as f:
+    f.write("import streamlit as st\\nst.title('warmup')\\nst.sidebar.button('x')\\n")
+AppTest.from_file(warmup).run()
+sys.stderr.write({MARKER!r} + '\\n')
+sys.stderr.flush()
+at = AppTest.from_file(os.path.join({ROOT!r}, 'site', 'app.py'), default_timeout=60).run()
+if at.exception:
+    raise SystemExit(f"app raised: {{at.exception}}")
+"""
+
+TARGETS = {
+    "view_feed": ["view_feed.py", "--latest", "5"],
+    "main_help": ["main.py", "--help"],
+    "app_first_paint": ["-c", APP_SCRIPT],
+}
+
+
+def parse_importtime(stderr, after=None):
+    """``(name, level, self_us, cumulative_us)`` per import line, optionally only those after ``after``."""
+    lines = stderr.splitlines()
+    if after is not None and after in lines:
+        lines = lines[lines.index(after) + 1:]
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split('|', 2)
+        level = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((name.strip(), level, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def run_target(args, env, baseline, after=None):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args[:1])} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+    entries = parse_importtime(proc.stderr, after)
+    own = [e for e in entries if e[1] == 0 and e[0] not in baseline]
+    loaded = {name for name, _, _, _ in entries}
+    return {
+        "import_ms": sum(e[3] for e in own) / 1000,
+        "wall_ms": wall * 1000,
+        "heaviest": sorted(((name, cumulative / 1000) for name, _, _, cumulative in own),
+                           key=lambda item: -item[1])[:5],
+        "lazy_violations": sorted({name.split('.')[0] for name in loaded} & set(LAZY_MODULES)),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure and enforce the startup import-time budget.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per target (median is reported)")
+    parser.add_argument("--budget", action="append", default=[], metavar="TARGET=MS",
+                        help=f"override a budget (defaults: {BUDGETS_MS})")
+    parser.add_argument("--targets", default=','.join(TARGETS), help="comma-separated targets to run")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/startup-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(args):
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        target, _, ms = item.partition('=')
+        budgets[target] = float(ms)
+
+    workdir = tempfile.mkdtemp(prefix='startup-bench-')
+    env = dict(os.environ, FEED_STORE_DIR=os.path.join(workdir, 'feed'),
+               RUN_TRACE_DIR=os.path.join(workdir, 'run_traces'))
+    try:
+        prefill(get_feed_store(env["FEED_STORE_DIR"]), 200)
+        baseline_run = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], env=env,
+                                      capture_output=True, text=True)
+        baseline = {name for name, _, _, _ in parse_importtime(baseline_run.stderr)}
+
+        results = []
+        for target in [t.strip() for t in args.targets.split(',') if t.strip()]:
+            print(f"⏱️  {target}...")
+            after = MARKER if target == "app_first_paint" else None
+            runs = [run_target(TARGETS[target], env, baseline, after) for _ in range(args.runs)]
+            import_ms = statistics.median(r["import_ms"] for r in runs)
+            violations = sorted({name for r in runs for name in r["lazy_violations"]})
+            results.append({
+                "target": target,
+                "import_ms": import_ms,
+                "wall_ms": statistics.median(r["wall_ms"] for r in runs),
+                "budget_ms": budgets.get(target),
+                "heaviest": runs[-1]["heaviest"],
+                "lazy_violations": violations,
+                "ok": import_ms <= budgets.get(target, float('inf')) and not violations,
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'target':<17} {'import ms':>10} {'budget':>8} {'wall ms':>9}  status")
+    for r in results:
+        status = "ok" if r["ok"] else "OVER BUDGET" if not r["lazy_violations"] else \
+            f"eager import of {', '.join(r['lazy_violations'])}"
+        print(f"{r['target']:<17} {r['import_ms']:>10.1f} {r['budget_ms'] or 0:>8.0f} {r['wall_ms']:>9.1f}  {status}")
+        print("   heaviest: " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in r["heaviest"]))
+
+    report = {
+        "benchmark": "startup",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"runs": args.runs, "budgets_ms": budgets},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
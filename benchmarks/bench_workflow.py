@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+End-to-end workflow benchmark on the local fake model client.
+
+Runs the real TrendSetter/NewsBreaker/LogicQA squad (``main.build_squad``)
+against ``FakeChatCompletionClient`` on feeds pre-filled to several sizes and
+reports time to first visible output per turn, per-turn framework overhead,
+end-to-end time and feed-write cost.
+Results are saved as JSON so runs can be compared between commits.
+
+Usage:
+    python benchmarks/bench_workflow.py [--feed-sizes 0,1000,10000] [--runs 3] [--latency-ms 0]
+    python benchmarks/bench_workflow.py --compare results/old.json results/new.json
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# noinspection PyUnresolvedReferences
+from main import build_squad, DEFAULT_MISSION
+from agents.tools import build_tools, make_feed_tools
+from feed import get_feed_store, get_feed_writer
+from llm.fake import FakeChatCompletionClient
+from telemetry import RunRecorder
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def prefill(store, count, text_chars=240):
+    """Append ``count`` synthetic posts in large batches."""
+    authors = ["TrendSetter", "NewsBreaker", "LogicQA"]
+    text = ("lorem ipsum " * (text_chars // 12 + 1))[:text_chars]
+    for start in range(0, count, 1000):
+        store.append_many([
+            {"author": authors[i % 3], "text": f"{i} {text}", "timestamp": datetime.now().isoformat()}
+            for i in range(start, min(count, start + 1000))
+        ])
+
+
+def timed(fn, bucket):
+    """Wrap a coroutine tool so its execution time is added to ``bucket``."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            bucket.append(time.perf_counter() - started)
+    return wrapper
+
+
+async def run_workflow(store, latency, max_messages, response_chars):
+    client = FakeChatCompletionClient(latency=latency, response_chars=response_chars)
+    tool_times = []
+    post_fn, read_fn = make_feed_tools(store)
+    recorder = RunRecorder()
+    squad = build_squad(client, build_tools(timed(post_fn, tool_times), timed(read_fn, tool_times)), max_messages,
+                        recorder)
+
+    started = time.perf_counter()
+    async for event in squad.run_stream(task=DEFAULT_MISSION):
+        recorder.observe(event)
+    elapsed = time.perf_counter() - started
+    recorder.close()
+    framework = elapsed - client.model_seconds - sum(tool_times)
+    ttft = [turn["ttft_ms"] for turn in recorder.turns]
+    return {
+        "ttft_p50_ms": percentile(ttft, 0.5),
+        "ttft_p95_ms": percentile(ttft, 0.95),
+        "e2e_s": elapsed,
+        "model_calls": client.calls,
+        "model_s": client.model_seconds,
+        "tool_s": sum(tool_times),
+        "overhead_per_call_ms": framework / max(1, client.calls) * 1000,
+    }
+
+
+async def measure_writes(store, samples):
+    """Latency of post_to_site's write path (group-commit writer) and of a raw append."""
+    writer = get_feed_writer(store)
+    post_latencies, append_latencies = [], []
+    for i in range(samples):
+        post = {"author": "Bench", "text": f"write {i}", "timestamp": datetime.now().isoformat()}
+        started = time.perf_counter()
+        await writer.write_async(post)
+        post_latencies.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        store.append(post)
+        append_latencies.append(time.perf_counter() - started)
+    return {
+        "post_p50_ms": percentile(post_latencies, 0.5) * 1000,
+        "post_p95_ms": percentile(post_latencies, 0.95) * 1000,
+        "append_p50_ms": percentile(append_latencies, 0.5) * 1000,
+        "append_p95_ms": percentile(append_latencies, 0.95) * 1000,
+    }
+
+
+async def bench_feed_size(size, args):
+    workdir = tempfile.mkdtemp(prefix='feed-bench-')
+    try:
+        store = get_feed_store(os.path.join(workdir, 'feed'))
+        prefill(store, size)
+        runs = [await run_workflow(store, args.latency_ms / 1000, args.max_messages, args.response_chars)
+                for _ in range(args.runs)]
+        writes = await measure_writes(store, args.write_samples)
+        get_feed_writer(store).stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {"feed_size": size}
+    for key in runs[0]:
+        result[key] = statistics.median(run[key] for run in runs)
+    result.update(writes)
+    return result
+
+
+def print_table(results):
+    print(f"\n{'feed size':>10} {'ttft p50 ms':>12} {'ttft p95 ms':>12} {'e2e s':>8} {'calls':>6} "
+          f"{'overhead/call ms':>17} {'tool s':>8} {'post p50 ms':>12} {'post p95 ms':>12} {'append p50 ms':>14}")
+    for r in results:
+        print(f"{r['feed_size']:>10} {r['ttft_p50_ms']:>12.3f} {r['ttft_p95_ms']:>12.3f} "
+              f"{r['e2e_s']:>8.3f} {r['model_calls']:>6.0f} {r['overhead_per_call_ms']:>17.3f} "
+              f"{r['tool_s']:>8.3f} {r['post_p50_ms']:>12.3f} {r['post_p95_ms']:>12.3f} {r['append_p50_ms']:>14.3f}")
+
+
+def compare(old_path, new_path):
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"Comparing {old['commit']} → {new['commit']}")
+    old_by_size = {r['feed_size']: r for r in old['results']}
+    for r in new['results']:
+        before = old_by_size.get(r['feed_size'])
+        if before is None:
+            continue
+        print(f"\nfeed size {r['feed_size']}:")
+        for key in ("ttft_p50_ms", "ttft_p95_ms", "e2e_s", "overhead_per_call_ms", "tool_s", "post_p50_ms",
+                    "append_p50_ms"):
+            if key not in before:
+                continue  # result file from before the metric existed
+            delta = (r[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            print(f"   {key:<22} {before[key]:>10.3f} → {r[key]:>10.3f}  ({delta:+.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent workflow on a fake model client.")
+    parser.add_argument("--feed-sizes", default="0,1000,10000,100000",
+                        help="comma-separated posts to pre-fill the feed with")
+    parser.add_argument("--runs", type=int, default=3, help="workflow runs per feed size (median is reported)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake model latency per call")
+    parser.add_argument("--response-chars", type=int, default=240, help="length of each generated post")
+    parser.add_argument("--max-messages", type=int, default=30, help="message cap per workflow run")
+    parser.add_argument("--write-samples", type=int, default=50, help="sequential writes timed per feed size")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/workflow-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    return parser.parse_args(argv)
+
+
+async def main(args):
+    sizes = [int(s) for s in args.feed_sizes.split(',') if s.strip()]
+    results = []
+    for size in sizes:
+        print(f"⏱️  feed size {size}...")
+        results.append(await bench_feed_size(size, args))
+    print_table(results)
+
+    report = {
+        "benchmark": "workflow",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"workflow-{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    if cli_args.compare:
+        compare(*cli_args.compare)
+    else:
+        asyncio.run(main(cli_args))
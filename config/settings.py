@@ -1,11 +1,104 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _find_env_file():
+    """The nearest ``.env`` in this directory or a parent (where ``load_dotenv()`` would look)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# python-dotenv is only imported when there is a file for it to load
+_env_file = _find_env_file()
+if _env_file:
+    from dotenv import load_dotenv
+    load_dotenv(_env_file)
 
 # API Configuration
 api_key = os.getenv("OPENAI_API_KEY", "your-api-key-here")
 model_name = os.getenv("MODEL_NAME", "gpt-4o")
+# "openai", or "fake" for the local stand-in client used by benchmarks and offline runs
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+# Stream model tokens to the console / UI as they are generated
+LLM_STREAMING = os.getenv("LLM_STREAMING", "on") == "on"
+
+# Model Request Scheduler (shared by every agent in the process)
+# "on" = token-bucket rate limits, adaptive concurrency and jittered retries; "off" = direct calls
+LLM_SCHEDULER = os.getenv("LLM_SCHEDULER", "on")
+LLM_RPM = int(os.getenv("LLM_RPM", "0"))          # requests per minute, 0 = unlimited
+LLM_TPM = int(os.getenv("LLM_TPM", "0"))          # tokens per minute, 0 = unlimited
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_RETRY_BASE_MS = float(os.getenv("LLM_RETRY_BASE_MS", "500"))
+LLM_RETRY_MAX_MS = float(os.getenv("LLM_RETRY_MAX_MS", "30000"))
+
+# Agent Model Context
+# "full" = whole history (autogen default), "window" = last AGENT_CONTEXT_WINDOW messages,
+# "tokens" = recent messages within AGENT_CONTEXT_MAX_TOKENS, "summary" = window + rolling summary of older ones
+AGENT_CONTEXT_POLICY = os.getenv("AGENT_CONTEXT_POLICY", "full")
+AGENT_CONTEXT_WINDOW = int(os.getenv("AGENT_CONTEXT_WINDOW", "12"))
+AGENT_CONTEXT_MAX_TOKENS = int(os.getenv("AGENT_CONTEXT_MAX_TOKENS", "2000"))
+AGENT_CONTEXT_SUMMARY_CHARS = int(os.getenv("AGENT_CONTEXT_SUMMARY_CHARS", "1200"))
+
+# Team Mode
+# "roundrobin" = agents take turns one at a time, "fanout" = independent turns run concurrently
+TEAM_MODE = os.getenv("TEAM_MODE", "roundrobin")
+TEAM_CYCLES = int(os.getenv("TEAM_CYCLES", "3"))
+
+# Background Jobs (workflows started from the Streamlit UI)
+# Workflows run at once on the shared runner; the rest queue. Finished jobs kept for status display.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "50"))
 
 # Site Configuration
 FEED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'site', 'feed.json')
+
+# Feed Storage Configuration
+# "segments" = append-only JSON-lines log in FEED_STORE_DIR, "json" = legacy FEED_PATH document
+FEED_BACKEND = os.getenv("FEED_BACKEND", "segments")
+FEED_STORE_DIR = os.getenv("FEED_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), 'site', 'feed_store'))
+FEED_SEGMENT_MAX_BYTES = int(os.getenv("FEED_SEGMENT_MAX_BYTES", str(4 * 1024 * 1024)))
+FEED_COMPACT_SEGMENTS = int(os.getenv("FEED_COMPACT_SEGMENTS", "8"))
+# `python -m feed.archive rotate` keeps FEED_HOT_DAYS days uncompressed and archives older days;
+# archived days older than FEED_RETENTION_DAYS are deleted (0 = keep forever)
+FEED_HOT_DAYS = int(os.getenv("FEED_HOT_DAYS", "7"))
+FEED_RETENTION_DAYS = int(os.getenv("FEED_RETENTION_DAYS", "0"))
+# Format new segment lines are written in: "v2" = compact tagged record, "v1" = JSON (see feed/post.py)
+FEED_RECORD_FORMAT = os.getenv("FEED_RECORD_FORMAT", "v2")
+# Group commit: posts arriving within this window share one write + fsync
+FEED_COMMIT_WINDOW_MS = float(os.getenv("FEED_COMMIT_WINDOW_MS", "5"))
+FEED_MAX_BATCH = int(os.getenv("FEED_MAX_BATCH", "512"))
+# Process-wide cache of parsed feed pages shared by all Streamlit sessions
+FEED_CACHE_MAX_BYTES = int(os.getenv("FEED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Feed digest returned by the read_site_feed tool: recent posts per author + trending keywords
+FEED_DIGEST_POSTS_PER_AUTHOR = int(os.getenv("FEED_DIGEST_POSTS_PER_AUTHOR", "3"))
+FEED_DIGEST_TEXT_CHARS = int(os.getenv("FEED_DIGEST_TEXT_CHARS", "140"))
+FEED_DIGEST_MAX_TOKENS = int(os.getenv("FEED_DIGEST_MAX_TOKENS", "400"))
+# How the app draws feed pages: "html" (one pre-rendered element per page, widgets only for the
+# opened post) or "widgets" (buttons and columns for every post)
+FEED_RENDER_MODE = os.getenv("FEED_RENDER_MODE", "html")
+# Full-text search scores at most this many (newest) matching posts per query
+FEED_SEARCH_MAX_CANDIDATES = int(os.getenv("FEED_SEARCH_MAX_CANDIDATES", "5000"))
+# Near-duplicate posts (MinHash similarity >= FEED_DEDUP_THRESHOLD): "off", "flag", "reject" or "merge";
+# anything but "off" needs numpy
+FEED_DEDUP_POLICY = os.getenv("FEED_DEDUP_POLICY", "off")
+FEED_DEDUP_THRESHOLD = float(os.getenv("FEED_DEDUP_THRESHOLD", "0.7"))
+
+# LLM Response Cache
+# "off" = pass-through, "record" = serve hits and store misses, "replay" = hits only (offline)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), '.llm_cache'))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Run Instrumentation
+# Per-turn JSON-lines traces (one file per run) and a Prometheus textfile with the last run's metrics
+RUN_TRACE_DIR = os.getenv("RUN_TRACE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), 'site', 'run_traces'))
+RUN_METRICS_PATH = os.getenv("RUN_METRICS_PATH", os.path.join(RUN_TRACE_DIR, 'metrics.prom'))
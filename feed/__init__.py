@@ -0,0 +1,35 @@
+"""
+Feed storage, indexing and caching.
+
+Exports are resolved on first access (PEP 562), so ``from feed import
+get_feed_store`` doesn't pull in the asyncio-based writer or the digest.
+"""
+import importlib
+
+_EXPORTS = {
+    "FeedStore": "feed.store", "JsonFeedStore": "feed.store", "SegmentedFeedStore": "feed.store",
+    "get_feed_store": "feed.store", "migrate_json_feed": "feed.store",
+    "ArchivePartition": "feed.archive",
+    "Post": "feed.post", "encode_post": "feed.post", "decode_post": "feed.post",
+    "FeedWriter": "feed.writer", "get_feed_writer": "feed.writer",
+    "FeedIndex": "feed.index", "get_feed_index": "feed.index",
+    "FeedCache": "feed.cache", "get_feed_cache": "feed.cache",
+    "FeedDigest": "feed.digest", "get_feed_digest": "feed.digest",
+    "FeedStats": "feed.stats", "get_feed_stats": "feed.stats",
+    "SearchIndex": "feed.search", "get_search_index": "feed.search",
+    "DedupIndex": "feed.dedup", "DuplicatePost": "feed.dedup", "get_dedup_index": "feed.dedup",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Cold, compressed day partitions of a ``SegmentedFeedStore``.
+
+``SegmentedFeedStore.rotate`` moves posts older than the hot window out of
+the snapshot into one archive file per day, ``arc-<base>-<end>.jsonl.z``,
+covering the same logical offsets as before, so offsets held by the indexes
+stay valid. An archive is the original record lines cut into zlib blocks of
+about ``BLOCK_BYTES`` (never splitting a line), followed by a JSON footer:
+
+    [block][block]...[footer JSON][footer length: 8 bytes LE][MAGIC]
+
+The footer holds the offset range, the day, the first/last post epochs, the
+post count, a CRC-32 of the uncompressed lines and each block's uncompressed
+and compressed start. Archives are immutable and opened lazily with mmap, so
+a cold partition costs nothing until a read lands in its range, and then only
+the blocks it touches are decompressed.
+
+Maintenance (run it daily, e.g. from cron):
+Usage: python -m feed.archive [rotate|verify|list] [--hot-days N] [--retention-days N] [--dry-run]
+"""
+import bisect
+import json
+import mmap
+import os
+import sys
+import zlib
+from datetime import date, datetime, timedelta
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feed.post import decode_post
+
+ARCHIVE_PREFIX = "arc"
+ARCHIVE_SUFFIX = ".jsonl.z"
+FORMAT_VERSION = 1
+MAGIC = b"FEEDARC1"
+BLOCK_BYTES = 64 * 1024
+_CACHED_BLOCKS = 4
+
+
+class ArchiveError(Exception):
+    """An archive partition is unreadable or fails verification."""
+
+
+def archive_name(base, end) -> str:
+    return f"{ARCHIVE_PREFIX}-{base:020d}-{end:020d}{ARCHIVE_SUFFIX}"
+
+
+def post_day(epoch) -> date:
+    """Local calendar day of an epoch timestamp (posts carry local ISO times)."""
+    return datetime.fromtimestamp(epoch).date()
+
+
+class ArchivePartition:
+    """Read-only, memory-mapped view of one archive file."""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            raise ArchiveError(f"{path}: {e}") from e
+        try:
+            if self._map[-len(MAGIC):] != MAGIC:
+                raise ArchiveError(f"{path}: not a feed archive")
+            tail = len(self._map) - len(MAGIC) - 8
+            footer_len = int.from_bytes(self._map[tail:tail + 8], 'little')
+            footer = json.loads(self._map[tail - footer_len:tail])
+        except ValueError as e:
+            raise ArchiveError(f"{path}: {e}") from e
+        if footer.get("version") != FORMAT_VERSION:
+            raise ArchiveError(f"{path}: unsupported archive version {footer.get('version')}")
+        self.base = footer["base"]
+        self.end = footer["end"]
+        self.day = date.fromisoformat(footer["day"]) if footer["day"] else None  # None: no timestamps
+        self.first = footer["first"]
+        self.last = footer["last"]
+        self.posts = footer["posts"]
+        self.crc = footer["crc"]
+        self._ustarts = [u for u, _ in footer["blocks"]]  # relative to base
+        self._cstarts = [c for _, c in footer["blocks"]] + [tail - footer_len]
+        self._blocks = {}
+
+    def info(self) -> dict:
+        return {"day": self.day.isoformat() if self.day else None, "posts": self.posts,
+                "first": self.first, "last": self.last,
+                "bytes": len(self._map), "raw_bytes": self.end - self.base}
+
+    def _block(self, i) -> bytes:
+        data = self._blocks.get(i)
+        if data is None:
+            data = zlib.decompress(self._map[self._cstarts[i]:self._cstarts[i + 1]])
+            if len(self._blocks) >= _CACHED_BLOCKS:
+                self._blocks.pop(next(iter(self._blocks)), None)
+            self._blocks[i] = data
+        return data
+
+    def _find(self, pos):
+        if not self.base <= pos < self.end:
+            raise KeyError(pos)
+        i = bisect.bisect_right(self._ustarts, pos - self.base) - 1
+        return i, pos - self.base - self._ustarts[i]
+
+    def line_at(self, pos) -> bytes:
+        i, rel = self._find(pos)
+        data = self._block(i)
+        return data[rel:data.index(b'\n', rel) + 1]
+
+    def lines(self, start=None):
+        """Yield ``(offset, line)`` from ``start`` (default: the first post) on."""
+        i, rel = self._find(self.base if start is None else start)
+        for i in range(i, len(self._ustarts)):
+            data = self._block(i)
+            pos = self.base + self._ustarts[i]
+            while rel < len(data):
+                nl = data.index(b'\n', rel) + 1
+                yield pos + rel, data[rel:nl]
+                rel = nl
+            rel = 0
+
+    def lines_reverse(self, before=None):
+        """Yield ``(offset, line)`` for the lines ending at or before ``before``, last first."""
+        before = self.end if before is None else before
+        if before <= self.base:
+            return
+        i, _ = self._find(before - 1)
+        stop = before - self.base - self._ustarts[i]
+        for i in range(i, -1, -1):
+            data = self._block(i)
+            pos = self.base + self._ustarts[i]
+            while stop > 0:
+                start = data.rfind(b'\n', 0, stop - 1) + 1
+                yield pos + start, data[start:stop]
+                stop = start
+            if i:
+                stop = len(self._block(i - 1))
+
+    def verify(self) -> list:
+        """Problems found decompressing and decoding every line (an empty list if none)."""
+        crc, size, posts = 0, 0, 0
+        try:
+            for i in range(len(self._ustarts)):
+                data = zlib.decompress(self._map[self._cstarts[i]:self._cstarts[i + 1]])
+                if self._ustarts[i] != size:
+                    return [f"{self.path}: block {i} starts at {self._ustarts[i]}, expected {size}"]
+                if not data.endswith(b'\n'):
+                    return [f"{self.path}: block {i} ends mid-line"]
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                for line in data.splitlines(keepends=True):
+                    decode_post(line)
+                    posts += 1
+        except (zlib.error, ValueError) as e:
+            return [f"{self.path}: {e}"]
+        problems = []
+        if size != self.end - self.base:
+            problems.append(f"{self.path}: holds {size} bytes, its range is {self.end - self.base}")
+        if crc != self.crc:
+            problems.append(f"{self.path}: checksum mismatch")
+        if posts != self.posts:
+            problems.append(f"{self.path}: holds {posts} posts, its footer says {self.posts}")
+        return problems
+
+
+class PartitionWriter:
+    """
+    Stream one day's record lines into a new archive file (``finish`` makes it visible).
+
+    With ``directory=None`` nothing is written; the writer only counts (dry runs).
+    """
+
+    def __init__(self, directory, base, day):
+        self.directory = directory
+        self.base = self.end = base
+        self.day = day
+        self.first = self.last = None
+        self.posts = 0
+        self._crc = 0
+        self._blocks = []
+        self._pending = []
+        self._pending_bytes = 0
+        self.path = None
+        self._tmp = directory and os.path.join(directory, f"{ARCHIVE_PREFIX}-{base:020d}.tmp")
+        self._f = directory and open(self._tmp, 'wb')
+
+    def add(self, line, epoch=None):
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        self.posts += 1
+        if epoch is not None:
+            self.first = epoch if self.first is None else min(self.first, epoch)
+            self.last = epoch if self.last is None else max(self.last, epoch)
+        if self._pending_bytes >= BLOCK_BYTES:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = b''.join(self._pending)
+        if self._f:
+            self._blocks.append((self.end - self.base, self._f.tell()))
+            self._f.write(zlib.compress(data, 6))
+            self._crc = zlib.crc32(data, self._crc)
+        self.end += len(data)
+        self._pending, self._pending_bytes = [], 0
+
+    def finish(self):
+        self._flush()
+        if not self._f:
+            return None
+        footer = json.dumps({"version": FORMAT_VERSION, "base": self.base, "end": self.end,
+                             "day": self.day.isoformat() if self.day else None, "first": self.first, "last": self.last,
+                             "posts": self.posts, "crc": self._crc, "blocks": self._blocks}).encode('utf-8')
+        self._f.write(footer + len(footer).to_bytes(8, 'little') + MAGIC)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+        self.path = os.path.join(self.directory, archive_name(self.base, self.end))
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def info(self) -> dict:
+        return {"day": self.day.isoformat() if self.day else None, "posts": self.posts, "first": self.first,
+                "last": self.last, "bytes": os.path.getsize(self.path) if self.path else None,
+                "raw_bytes": self.end - self.base}
+
+    def abort(self):
+        if not self._f:
+            return
+        self._f.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+
+# -- maintenance command -------------------------------------------------
+
+def _size(n) -> str:
+    return f"{n / 2 ** 20:.1f} MB" if n >= 2 ** 20 else f"{n / 1024:.0f} KB"
+
+
+def list_partitions(store):
+    print(f"{'partition':<12} {'posts':>8} {'on disk':>10} {'raw':>10}  offsets")
+    for part in store.partitions():
+        label = part.get("day", part["kind"])
+        posts = part.get("posts", "")
+        print(f"{label:<12} {posts:>8} {_size(part['bytes']):>10} {_size(part['end'] - part['base']):>10}  "
+              f"{part['base']}-{part['end']}")
+
+
+def main(argv=None):
+    import argparse
+    from config.settings import FEED_HOT_DAYS, FEED_RETENTION_DAYS
+    from feed.store import SegmentedFeedStore, get_feed_store
+    parser = argparse.ArgumentParser(description="Rotate, verify or list the feed's day partitions.")
+    parser.add_argument("command", nargs="?", choices=("rotate", "verify", "list"), default="rotate")
+    parser.add_argument("--hot-days", type=int, default=FEED_HOT_DAYS,
+                        help="days of posts kept uncompressed in the hot partition (default: FEED_HOT_DAYS)")
+    parser.add_argument("--retention-days", type=int, default=FEED_RETENTION_DAYS,
+                        help="delete archived days older than this; 0 keeps them (default: FEED_RETENTION_DAYS)")
+    parser.add_argument("--dry-run", action="store_true", help="rotate: report what would change")
+    args = parser.parse_args(argv)
+    if 0 < args.retention_days < args.hot_days:
+        parser.error("--retention-days must be 0 or at least --hot-days")
+
+    store = get_feed_store()
+    if not isinstance(store, SegmentedFeedStore):
+        sys.exit("❌ Partitions need the segmented store (FEED_BACKEND=segments)")
+
+    if args.command == "list":
+        list_partitions(store)
+    elif args.command == "verify":
+        problems = store.verify()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ {len(store.partitions())} partitions verified")
+    else:
+        today = date.today()
+        archive_before = today - timedelta(days=args.hot_days)
+        drop_before = today - timedelta(days=args.retention_days) if args.retention_days else None
+        result = store.rotate(archive_before, drop_before, dry_run=args.dry_run)
+        verb = "Would archive" if args.dry_run else "Archived"
+        for part in result["archived"]:
+            packed = f" → {_size(part['bytes'])}" if part.get('bytes') is not None else ""
+            print(f"🗜️  {verb} {part['day']}: {part['posts']} posts, {_size(part['raw_bytes'])}{packed}")
+        for part in result["dropped"]:
+            print(f"🗑️  {'Would drop' if args.dry_run else 'Dropped'} {part['day']}: {part['posts']} posts")
+        if not result["archived"] and not result["dropped"]:
+            print(f"✅ Nothing older than {archive_before} left in the hot partition")
+        if result["dropped"] and not args.dry_run:
+            # The indexes still point at the deleted posts
+            from feed.reindex import rebuild_all
+            rebuild_all()
+
+
+if __name__ == "__main__":
+    main()
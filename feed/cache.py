@@ -0,0 +1,110 @@
+"""
+Process-wide cache for parsed feed data, shared by every Streamlit session.
+
+Entries are keyed on the store's file identity (inode, mtime and size of each
+data file), so an unchanged feed is served without touching file contents,
+and any append invalidates everything cached for that store. Memory is
+bounded by an approximate byte budget with least-recently-used eviction.
+"""
+import threading
+from collections import OrderedDict
+
+from feed.post import Post
+
+
+def approx_size(value) -> int:
+    """Rough in-memory footprint of cached feed data, in bytes."""
+    if isinstance(value, dict):
+        return 64 + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(approx_size(v) for v in value)
+    if isinstance(value, str):
+        return 49 + len(value)
+    if isinstance(value, Post):
+        # Authors are interned, so only the text, timestamp and extras count
+        return 72 + approx_size(value.text) + approx_size(value.timestamp) + approx_size(value.extra)
+    return 32
+
+
+class FeedCache:
+    """LRU cache of loader results, invalidated when a store's identity changes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._identities = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, store, key, loader):
+        """
+        Return the cached value for ``key`` on ``store``, calling ``loader()`` on a miss.
+
+        Cached values are shared between callers and must not be mutated.
+        """
+        namespace = id(store)
+        identity = store.identity()
+        with self._lock:
+            if self._identities.get(namespace) != identity:
+                self._drop_namespace(namespace)
+                self._identities[namespace] = identity
+            entry = self._entries.get((namespace, key))
+            if entry is not None:
+                self._entries.move_to_end((namespace, key))
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = loader()
+        size = approx_size(value)
+        with self._lock:
+            if self._identities.get(namespace) != identity or size > self.max_bytes:
+                return value  # the feed changed while loading, or too big to keep
+            previous = self._entries.pop((namespace, key), None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[(namespace, key)] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def _drop_namespace(self, namespace):
+        for cache_key in [k for k in self._entries if k[0] == namespace]:
+            self._bytes -= self._entries.pop(cache_key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._identities.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> FeedCache:
+    """Return the process-wide feed cache sized by ``FEED_CACHE_MAX_BYTES``."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from config.settings import FEED_CACHE_MAX_BYTES
+            _cache = FeedCache(FEED_CACHE_MAX_BYTES)
+        return _cache
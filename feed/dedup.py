@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate post detection: MinHash signatures with LSH banding.
+
+A post is reduced to the set of its words and word pairs (stopwords
+dropped). Its MinHash signature holds, for each of ``NUM_PERM`` hash
+functions, the smallest hash of any element; two posts agree on a signature
+slot with probability equal to the Jaccard similarity of their sets, so the
+fraction of matching slots estimates it. A batch of posts is signed in one
+numpy pass.
+
+Checking a new post doesn't compare it with the whole feed: the signature is
+cut into ``BANDS`` bands of ``ROWS`` slots, each hashed to a band key, and
+only posts sharing a band key with it are compared. With 8 bands of 4 slots,
+a post with similarity 0.8 is a candidate ~98% of the time, one with 0.3
+under 7%, and unrelated posts almost never. Each band is a sorted array of
+``band key << 32 | doc id`` plus a dict of the posts added since the last
+snapshot; only 16 bits per slot are kept to verify candidates.
+
+``FeedWriter`` screens each commit batch before storing it; the policy
+(``FEED_DEDUP_POLICY``) decides what happens to a post at least
+``threshold`` similar to a stored one:
+
+    off     no checking
+    flag    stored, with ``duplicate_of`` (the original's offset) and ``similarity``
+    reject  not stored; its write raises ``DuplicatePost``
+    merge   not stored but recorded as an echo of the original (``merges()``);
+            its write raises ``DuplicatePost``
+
+Persistence follows ``SearchIndex``: a binary snapshot (``dedup.idx``) plus a
+JSON-lines log (``dedup.log``); merges go to ``dedup_merges.jsonl``.
+
+Backfill the existing feed (keeps the oldest post of each group; ``--legacy``
+works on a feed.json instead of the store):
+Usage: python -m feed.dedup [--policy reject|flag|merge] [--threshold 0.7] [--dry-run] [--legacy [feed.json]]
+"""
+import argparse
+import bisect
+import itertools
+import json
+import operator
+import os
+import random
+import shutil
+import sys
+import threading
+import zlib
+from array import array
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feed.lock import FileLock
+from feed.search import STOPWORDS, tokenize
+
+OFF, FLAG, REJECT, MERGE = "off", "flag", "reject", "merge"
+POLICIES = (OFF, FLAG, REJECT, MERGE)
+SNAPSHOT_VERSION = 1
+DEDUP_FIELDS = ("text",)
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+_DOC_MASK = 0xFFFFFFFF
+_params = None
+
+
+class DuplicatePost(Exception):
+    """A post the dedup policy kept out of the feed: a near-duplicate of the post at ``offset``."""
+
+    def __init__(self, offset, similarity, action, author=None):
+        super().__init__(f"near-duplicate of the post at offset {offset} by {author or 'unknown'} "
+                         f"({similarity:.0%} similar); {action}")
+        self.offset = offset
+        self.similarity = similarity
+        self.action = action
+        self.author = author
+
+
+def _features(text) -> set:
+    tokens = tokenize(text)
+    words = [token for token in tokens if token not in STOPWORDS] or tokens
+    features = set(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return features or {text.strip()}  # e.g. emoji only; empty texts all share ""
+
+
+def _hash_params():
+    """numpy and the fixed random multipliers of the permutations and band keys (loaded on first use)."""
+    global _params
+    if _params is None:
+        import numpy as np
+        rng = random.Random(0x5EED)
+        odd = [rng.getrandbits(64) | 1 for _ in range(2 * NUM_PERM)]
+        _params = (np, np.array(odd[:NUM_PERM], dtype=np.uint64),
+                   np.array([rng.getrandbits(64) for _ in range(NUM_PERM)], dtype=np.uint64),
+                   np.array(odd[NUM_PERM:], dtype=np.uint64).reshape(BANDS, ROWS))
+    return _params
+
+
+def signatures(texts) -> list:
+    """
+    ``(band keys, signature)`` of each of ``texts``, computed for the whole batch in one numpy pass.
+
+    Band keys are ``BANDS`` 32-bit ints; the signature is an ``array('H')``
+    of the low 16 bits of every MinHash slot.
+    """
+    if not texts:
+        return []
+    np, mul, add, mix = _hash_params()
+    hashes, starts = [], []
+    for text in texts:
+        starts.append(len(hashes))
+        hashes.extend(zlib.crc32(feature.encode('utf-8')) for feature in _features(str(text)))
+    # crc32 is linear, so scramble it (murmur3's finalizer) before the multiply-shift
+    # permutations, one per slot; the minimum per text is its MinHash
+    x = np.array(hashes, dtype=np.uint64) * np.uint64(0xFF51AFD7ED558CCD)
+    x ^= x >> np.uint64(29)
+    permuted = (x[:, None] * mul + add) >> np.uint64(32)
+    mins = np.minimum.reduceat(permuted, starts, axis=0)
+    keys = (mins.reshape(len(texts), BANDS, ROWS) * mix).sum(axis=2, dtype=np.uint64) >> np.uint64(32)
+    sigs = (mins & np.uint64(0xFFFF)).astype(np.uint16)
+    return [(band_keys, array('H', sig.tobytes())) for band_keys, sig in zip(keys.tolist(), sigs)]
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+
+class _Table:
+    """Signatures by doc id and the LSH band tables that find candidates among them."""
+
+    def __init__(self):
+        self.sigs = array('H')  # NUM_PERM slots per doc
+        self.frozen = [array('Q') for _ in range(BANDS)]  # sorted band key << 32 | doc
+        self.recent = [{} for _ in range(BANDS)]  # band key -> [doc], since the last freeze
+
+    def __len__(self):
+        return len(self.sigs) // NUM_PERM
+
+    def add(self, keys, sig) -> int:
+        doc = len(self)
+        self.sigs.extend(sig)
+        for recent, key in zip(self.recent, keys):
+            recent.setdefault(key, []).append(doc)
+        return doc
+
+    def candidates(self, keys) -> set:
+        docs = set()
+        for frozen, recent, key in zip(self.frozen, self.recent, keys):
+            lo = bisect.bisect_left(frozen, key << 32)
+            hi = bisect.bisect_left(frozen, (key + 1) << 32)
+            docs.update(entry & _DOC_MASK for entry in frozen[lo:hi])
+            docs.update(recent.get(key, ()))
+        return docs
+
+    def nearest(self, keys, sig, threshold):
+        """``(doc, similarity)`` of the most similar (then oldest) doc at ``threshold`` or above, or ``None``."""
+        best = None
+        for doc in self.candidates(keys):
+            score = similarity(sig, self.sigs[doc * NUM_PERM:(doc + 1) * NUM_PERM])
+            if score >= threshold and (best is None or (-score, doc) < best):
+                best = (-score, doc)
+        return None if best is None else (best[1], -best[0])
+
+    def freeze(self):
+        """Fold the recent additions into the sorted arrays (a numpy sort per band)."""
+        np = _hash_params()[0]
+        for band, recent in enumerate(self.recent):
+            entries = [key << 32 | doc for key, docs in recent.items() for doc in docs]
+            merged = np.concatenate([np.frombuffer(self.frozen[band], dtype=np.uint64),
+                                     np.array(entries, dtype=np.uint64)])
+            self.frozen[band] = array('Q', np.sort(merged).tobytes())
+            self.recent[band] = {}
+
+
+class DedupIndex:
+    """Signatures of every post in ``store``, kept in step with its appends, and the policy applied to new ones."""
+
+    def __init__(self, store, path=None, policy=FLAG, threshold=0.7, checkpoint_min=2000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown dedup policy {policy!r}; expected one of {POLICIES}")
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Dedup threshold must be in (0, 1], got {threshold}")
+        self.store = store
+        self.path = path or store.sidecar_path('dedup.idx')
+        self.log_path = os.path.splitext(self.path)[0] + '.log'
+        self.merges_path = os.path.splitext(self.path)[0] + '_merges.jsonl'
+        self.policy = policy
+        self.threshold = threshold
+        self.checkpoint_min = checkpoint_min
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path + '.lock')
+        self._loaded = False
+        self._snapshot_id = None
+        self._pending = {}  # text -> (keys, signature), screened and about to be appended
+        self._reset()
+
+    def _reset(self):
+        self.end = self.store.start_offset()
+        self.doc_offsets = array('Q')
+        self.table = _Table()
+        self._log_pos = 0
+        self._log_entries = 0
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _apply(self, row):
+        offset, next_offset, keys, sig = row
+        if offset < self.end:
+            return  # already signed
+        self.doc_offsets.append(offset)
+        self.table.add(keys, array('H', bytes.fromhex(sig)))
+        self.end = next_offset
+
+    def _file_id(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_snapshot(self):
+        self._reset()
+        self._snapshot_id = self._file_id(self.path)
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get("version") != SNAPSHOT_VERSION or header.get("num_perm") != NUM_PERM:
+                    return  # other layout; the log and a store scan rebuild it
+                n = header["docs"]
+                self.doc_offsets.fromfile(f, n)
+                self.table.sigs.fromfile(f, n * NUM_PERM)
+                for frozen in self.table.frozen:
+                    frozen.fromfile(f, n)
+        except (FileNotFoundError, ValueError, EOFError):
+            self._reset()
+            return
+        self.end = header["end"]
+
+    def _read_log(self):
+        """Apply log entries written since we last looked (by any process)."""
+        if self._file_id(self.path) != self._snapshot_id:
+            self._read_snapshot()  # checkpointed or rebuilt by another process
+        try:
+            with open(self.log_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._log_pos:
+                    self._read_snapshot()
+                f.seek(self._log_pos)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._log_pos += len(line)
+                    self._log_entries += 1
+                    self._apply(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _record(self, entries):
+        """Sign, log and apply ``(offset, next_offset, post)`` triples."""
+        entries = [entry for entry in entries if entry[0] >= self.end]
+        if not entries:
+            return
+        texts = [str(post.get('text', '')) for _, _, post in entries]
+        known = {text: self._pending.pop(text) for text in set(texts) if text in self._pending}
+        missing = list(set(texts).difference(known))
+        known.update(zip(missing, signatures(missing)))
+        rows = [[offset, next_offset, known[text][0], known[text][1].tobytes().hex()]
+                for (offset, next_offset, _), text in zip(entries, texts)]
+        data = ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+        with open(self.log_path, 'ab') as f:
+            f.write(data)
+        self._log_pos += len(data)
+        self._log_entries += len(rows)
+        for row in rows:
+            self._apply(row)
+        if self._log_entries >= max(self.checkpoint_min, len(self.doc_offsets) // 10):
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Write the signatures and sorted band tables as a fresh snapshot and empty the log."""
+        self.table.freeze()
+        header = {"version": SNAPSHOT_VERSION, "end": self.end, "docs": len(self.doc_offsets),
+                  "num_perm": NUM_PERM, "bands": BANDS}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            self.doc_offsets.tofile(f)
+            self.table.sigs.tofile(f)
+            for frozen in self.table.frozen:
+                frozen.tofile(f)
+        os.replace(tmp, self.path)
+        open(self.log_path, 'wb').close()
+        self._snapshot_id = self._file_id(self.path)
+        self._log_pos = 0
+        self._log_entries = 0
+
+    def _scan(self, start=None, batch=1024):
+        """Sign the store's posts from ``start`` on, ``batch`` per numpy pass."""
+        entries = []
+        for entry in self.store.scan(start, fields=DEDUP_FIELDS):
+            entries.append(entry)
+            if len(entries) >= batch:
+                self._record(entries)
+                entries = []
+        self._record(entries)
+
+    def _is_current(self) -> bool:
+        """True if neither the store nor the log changed; costs stats, not reads."""
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            log_size = 0
+        return log_size == self._log_pos and self.store.end_offset() <= self.end
+
+    def sync(self):
+        """Load the signatures on first use and bring them up to date with the store."""
+        if self._loaded and self._is_current():
+            return self
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_snapshot()
+            self._read_log()
+            if self.store.end_offset() > self.end:
+                self._scan(max(self.end, self.store.start_offset()))
+        return self
+
+    def on_append(self, entries):
+        """Store listener: sign freshly committed posts (reusing what ``screen`` computed)."""
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_snapshot()
+            self._read_log()
+            entries = list(entries)
+            if entries and entries[0][0] == self.end:
+                self._record(entries)
+            else:
+                # Another process appended in between; catch up from the store.
+                self._scan(max(self.end, self.store.start_offset()))
+
+    def rebuild(self):
+        """Discard the persisted signatures and sign the whole store again."""
+        with self._lock, self._file_lock:
+            self._reset()
+            self._loaded = True
+            open(self.log_path, 'wb').close()
+            self._scan()
+            self._checkpoint()
+        return self
+
+    # -- screening -----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.doc_offsets)
+
+    def nearest(self, text):
+        """``(offset, similarity)`` of the stored post most similar to ``text`` at ``threshold`` or above, or ``None``."""
+        self.sync()
+        keys, sig = signatures([text])[0]
+        with self._lock:
+            hit = self.table.nearest(keys, sig, self.threshold)
+            return None if hit is None else (self.doc_offsets[hit[0]], hit[1])
+
+    def screen(self, posts) -> list:
+        """
+        Apply the policy to a commit batch (``Post`` objects) before it is stored.
+
+        Returns an outcome per post for a prefix of ``posts``: ``None`` to
+        store it (``flag`` marks near-duplicates in place) or the
+        ``DuplicatePost`` to report instead. The prefix stops before a post
+        that near-duplicates one stored earlier in the same batch: screen the
+        rest once the prefix is appended.
+        """
+        if self.policy == OFF:
+            return [None] * len(posts)
+        self.sync()
+        texts = [str(post.get('text', '')) for post in posts]
+        signed = signatures(texts)
+        outcomes = []
+        with self._lock:
+            if len(self._pending) > 4096:
+                self._pending.clear()  # left behind by failed appends
+            kept = []
+            for post, text, (keys, sig) in zip(posts, texts, signed):
+                if any(similarity(sig, other) >= self.threshold for other in kept):
+                    break  # its original isn't stored yet
+                hit = self.table.nearest(keys, sig, self.threshold)
+                if hit is not None:
+                    offset, score = self.doc_offsets[hit[0]], round(hit[1], 2)
+                    if self.policy == FLAG:
+                        post.extra = dict(post.extra or {}, duplicate_of=offset, similarity=score)
+                    else:
+                        if self.policy == MERGE:
+                            self._record_merge(offset, post, score)
+                        action = "merged" if self.policy == MERGE else "rejected"
+                        outcomes.append(DuplicatePost(offset, score, action, self._author_at(offset)))
+                        continue
+                kept.append(sig)
+                self._pending[text] = (keys, sig)
+                outcomes.append(None)
+        return outcomes
+
+    def _author_at(self, offset):
+        try:
+            return self.store.read_at(offset).get('author')
+        except KeyError:
+            return None
+
+    def _record_merge(self, offset, post, score):
+        row = [offset, post.get('author', 'Unknown'), post.get('timestamp'), score]
+        with open(self.merges_path, 'ab') as f:
+            f.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def merges(self) -> dict:
+        """Original post offset -> ``[(author, timestamp, similarity)]`` of the near-duplicates merged into it."""
+        merged = {}
+        try:
+            with open(self.merges_path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n'):
+                        offset, author, timestamp, score = json.loads(line)
+                        merged.setdefault(offset, []).append((author, timestamp, score))
+        except FileNotFoundError:
+            pass
+        return merged
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_dedup_index(store=None) -> DedupIndex:
+    """Return the process-wide dedup index for ``store`` (default: ``get_feed_store()``)."""
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _indexes_lock:
+        if id(store) not in _indexes:
+            from config.settings import FEED_DEDUP_POLICY, FEED_DEDUP_THRESHOLD
+            _indexes[id(store)] = DedupIndex(store, policy=FEED_DEDUP_POLICY, threshold=FEED_DEDUP_THRESHOLD)
+        return _indexes[id(store)]
+
+
+# -- backfill ----------------------------------------------------------------
+
+def dedupe_posts(posts, policy=REJECT, threshold=0.7, batch=1024):
+    """
+    Deduplicate a feed's list of post dicts, keeping the oldest post of each group.
+
+    Returns ``(posts, duplicates)``: ``reject`` drops near-duplicates,
+    ``merge`` drops them and lists them under the original's ``echoes``, and
+    ``flag`` keeps them with ``duplicate_of`` (the original's index, i.e. its
+    offset in a JSON feed) and ``similarity``.
+    """
+    table = _Table()
+    kept, positions, duplicates = [], [], 0  # positions: doc id -> index in ``kept``
+    for start in range(0, len(posts), batch):
+        chunk = posts[start:start + batch]
+        for post, (keys, sig) in zip(chunk, signatures([post.get('text', '') for post in chunk])):
+            hit = table.nearest(keys, sig, threshold)
+            if hit is not None:
+                duplicates += 1
+                position, score = positions[hit[0]], round(hit[1], 2)
+                if policy == FLAG:
+                    post = dict(post, duplicate_of=position, similarity=score)
+                else:
+                    if policy == MERGE:
+                        kept[position].setdefault('echoes', []).append(
+                            {"author": post.get('author'), "timestamp": post.get('timestamp'), "similarity": score})
+                    continue
+            table.add(keys, sig)
+            positions.append(len(kept))
+            kept.append(post)
+    return kept, duplicates
+
+
+def dedupe_store(store, policy=REJECT, threshold=0.7, dry_run=False, batch=1024):
+    """
+    Deduplicate a ``SegmentedFeedStore`` in place, keeping the oldest post of each group.
+
+    Archived posts are compared against but never rewritten; the hot ones
+    go through ``SegmentedFeedStore.rewrite``. ``reject`` drops
+    near-duplicates, ``merge`` drops them and records them as echoes of the
+    original (``DedupIndex.merges``), and ``flag`` keeps them with
+    ``duplicate_of`` and ``similarity``. Dropping posts moves the offsets of
+    the ones after them, so ``duplicate_of`` values and recorded merges are
+    remapped; the store's indexes must be rebuilt afterwards.
+
+    Returns ``(posts, duplicates, backup)`` with ``backup`` the directory
+    holding the replaced files (``None`` on a dry run).
+    """
+    from feed.archive import ARCHIVE_PREFIX
+    from feed.post import decode_post, encode_post
+    index = DedupIndex(store, policy=policy, threshold=threshold)
+    table, doc_offsets = _Table(), []
+    moved = {}  # old offset -> offset of the post, or of the original it was merged into, after the rewrite
+    echoes = []  # merge rows for ``index.merges_path``
+    counts = {"posts": 0, "duplicates": 0}
+
+    cold_end = max((part["end"] for part in store.partitions() if part["kind"] == ARCHIVE_PREFIX), default=None)
+    if cold_end is not None:
+        entries = []
+        for entry in store.scan(fields=DEDUP_FIELDS):
+            if entry[0] >= cold_end:
+                break
+            entries.append(entry)
+        for start in range(0, len(entries), batch):
+            chunk = entries[start:start + batch]
+            for (offset, _, _), (keys, sig) in zip(chunk, signatures([str(post.get('text', ''))
+                                                                      for _, _, post in chunk])):
+                table.add(keys, sig)
+                doc_offsets.append(offset)
+
+    def transform(lines):
+        pos = None
+        while True:
+            chunk = list(itertools.islice(lines, batch))
+            if not chunk:
+                return
+            posts = [decode_post(line) for _, line in chunk]
+            signed = signatures([str(post.get('text', '')) for post in posts])
+            for (old, line), post, (keys, sig) in zip(chunk, posts, signed):
+                pos = old if pos is None else pos
+                counts["posts"] += 1
+                hit = table.nearest(keys, sig, threshold)
+                if hit is not None:
+                    counts["duplicates"] += 1
+                    original, score = doc_offsets[hit[0]], round(hit[1], 2)
+                    if policy != FLAG:
+                        moved[old] = original
+                        if policy == MERGE:
+                            echoes.append([original, post.get('author', 'Unknown'), post.get('timestamp'), score])
+                        continue
+                    post.extra = dict(post.extra or {}, duplicate_of=original, similarity=score)
+                    line = encode_post(post, store.record_format)
+                elif post.get('duplicate_of') in moved:
+                    post.extra = dict(post.extra, duplicate_of=moved[post.get('duplicate_of')])
+                    line = encode_post(post, store.record_format)
+                moved[old] = pos
+                table.add(keys, sig)
+                doc_offsets.append(pos)
+                pos += len(line)
+                yield line
+
+    backup = store.rewrite(transform, dry_run=dry_run)
+    if backup is None or not (echoes or os.path.exists(index.merges_path)):
+        return counts["posts"], counts["duplicates"], backup
+    rows = [[moved.get(offset, offset), author, timestamp, score]
+            for offset, records in index.merges().items() for author, timestamp, score in records]
+    tmp = index.merges_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        for row in rows + echoes:
+            f.write((json.dumps(row, ensure_ascii=False) + '\n').encode('utf-8'))
+    os.replace(tmp, index.merges_path)
+    return counts["posts"], counts["duplicates"], backup
+
+
+def dedupe_json_feed(path, policy=REJECT, threshold=0.7, dry_run=False):
+    """Deduplicate a legacy ``feed.json`` with ``dedupe_posts``, keeping a ``.bak`` of the original."""
+    with open(path, 'r', encoding='utf-8') as f:
+        feed = json.load(f)
+    posts = feed.get('posts', [])
+    kept, duplicates = dedupe_posts(posts, policy, threshold)
+    print(f"🔁 {duplicates} of {len(posts)} posts are near-duplicates (≥ {threshold:.0%} similar)")
+    if dry_run or not duplicates:
+        return
+    shutil.copy2(path, path + '.bak')
+    feed['posts'] = kept
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(feed, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    print(f"✅ {policy}: {len(kept)} posts left in {path} (backup: {path}.bak)")
+
+
+def main(argv=None):
+    from config.settings import FEED_PATH
+    from feed.store import SegmentedFeedStore, get_feed_store
+    parser = argparse.ArgumentParser(description="Remove near-duplicate posts from the feed.")
+    parser.add_argument("--policy", choices=(REJECT, FLAG, MERGE), default=REJECT,
+                        help="drop duplicates, mark them, or fold them into the original's echoes")
+    parser.add_argument("--threshold", type=float, default=0.7,
+                        help="estimated Jaccard similarity from which posts count as near-duplicates")
+    parser.add_argument("--dry-run", action="store_true", help="report duplicates without rewriting the feed")
+    parser.add_argument("--legacy", nargs="?", const=FEED_PATH, metavar="FEED_JSON",
+                        help="deduplicate a legacy feed.json instead of the feed store (default: FEED_PATH)")
+    args = parser.parse_args(argv)
+
+    store = None if args.legacy else get_feed_store()
+    if not isinstance(store, SegmentedFeedStore):
+        dedupe_json_feed(args.legacy or FEED_PATH, args.policy, args.threshold, args.dry_run)
+        return
+    posts, duplicates, backup = dedupe_store(store, args.policy, args.threshold, args.dry_run)
+    print(f"🔁 {duplicates} of {posts} hot posts are near-duplicates (≥ {args.threshold:.0%} similar)")
+    if backup is None:
+        return
+    left = posts if args.policy == FLAG else posts - duplicates
+    print(f"✅ {args.policy}: {left} hot posts left in {store.directory} (replaced files: {backup})")
+    # Offsets moved; every index over the store is stale
+    from feed.reindex import rebuild_all
+    rebuild_all()
+
+
+if __name__ == "__main__":
+    main()
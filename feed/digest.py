@@ -0,0 +1,182 @@
+"""
+Compact, token-bounded digest of recent feed activity for the agents.
+
+The digest keeps the last few posts per author (text clipped) and keyword
+counts over a sliding window of recent posts. It is built from the newest
+``window`` posts only, read backwards, then updated incrementally from the
+store's append listener, and the rendered text is cached until the next
+append. A read therefore costs one ``end_offset()`` check, not a feed parse,
+and the text never grows past ``max_chars`` however large the feed gets: authors
+are listed most recently active first, and what doesn't fit is dropped a whole
+line at a time from the end, i.e. from the authors who posted longest ago.
+"""
+import re
+import threading
+from collections import Counter, deque
+
+from feed.index import get_feed_index
+
+_WORD_RE = re.compile(r"#?[a-z][a-z0-9'-]{2,}")
+_STOPWORDS = frozenset("""
+    the and for are but not you all any can had her was one our out has have his how its may new now
+    see two who did get got let say she too use this that with from they will just like what when your
+    been were them than then there their these those into only over such very more most some much
+    about after again also being could would should which while where here even every because each
+    post posts posted complete terminate workflow_complete post_complete
+""".split())
+
+
+def keywords(text) -> list:
+    """Lower-cased words and hashtags of ``text``, minus stopwords."""
+    return [w for w in _WORD_RE.findall(text.lower()) if w.lstrip('#') not in _STOPWORDS]
+
+
+class FeedDigest:
+    """
+    Rolling per-author / keyword summary of the newest posts in ``store``.
+
+    per_author:  posts kept per author
+    text_chars:  characters kept of each post's text
+    window:      recent posts the keyword counts cover (and the initial load reads)
+    top_keywords: keywords listed in the digest
+    max_chars:   hard cap on the rendered digest
+    """
+
+    def __init__(self, store, per_author=3, text_chars=140, window=200, top_keywords=8, max_chars=1600):
+        self.store = store
+        self.per_author = per_author
+        self.text_chars = text_chars
+        self.window = window
+        self.top_keywords = top_keywords
+        self.max_chars = max_chars
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._recent = {}
+        self._window = deque()
+        self._counts = Counter()
+        self._rendered = None
+        self.end = 0
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _apply(self, offset, next_offset, post):
+        if offset < self.end:
+            return
+        author = post.get('author', 'Unknown')
+        text = ' '.join(str(post.get('text', '')).split())
+        if len(text) > self.text_chars:
+            text = text[:self.text_chars - 1].rstrip() + '…'
+        # Re-inserted so ``_recent`` is ordered by each author's latest post
+        recent = self._recent.pop(author, None)
+        if recent is None:
+            recent = deque(maxlen=self.per_author)
+        self._recent[author] = recent
+        recent.append((post.get('timestamp', ''), text))
+
+        words = keywords(str(post.get('text', '')))
+        self._window.append(words)
+        self._counts.update(words)
+        if len(self._window) > self.window:
+            for word in self._window.popleft():
+                self._counts[word] -= 1
+                if not self._counts[word]:
+                    del self._counts[word]
+        self.end = next_offset
+        self._rendered = None
+
+    def _load(self):
+        """Initial build from the newest ``window`` posts, read backwards."""
+        end = self.store.end_offset()
+        newest = []
+        for entry in self.store.scan_reverse(before=end):
+            newest.append(entry)
+            if len(newest) >= self.window:
+                break
+        self.end = newest[-1][0] if newest else end
+        for offset, next_offset, post in reversed(newest):
+            self._apply(offset, next_offset, post)
+        self.end = max(self.end, end)
+        self._loaded = True
+
+    def sync(self):
+        """Catch up with posts other processes appended; a stat when nothing changed."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            elif self.store.end_offset() > self.end:
+                for entry in self.store.scan(max(self.end, self.store.start_offset())):
+                    self._apply(*entry)
+        return self
+
+    def on_append(self, entries):
+        """Store listener: fold freshly committed posts into the digest."""
+        with self._lock:
+            if not self._loaded:
+                return  # built lazily on first read
+            entries = list(entries)
+            if entries and entries[0][0] == self.end:
+                for entry in entries:
+                    self._apply(*entry)
+            else:
+                self.sync()
+
+    # -- reading -------------------------------------------------------------
+
+    def trending(self, n=None) -> list:
+        self.sync()
+        n = self.top_keywords if n is None else n
+        return [word for word, _ in self._counts.most_common(n)]
+
+    def _render(self, per_author):
+        counts = get_feed_index(self.store).authors()
+        lines = [f"Feed has {sum(counts.values())} posts."]
+        trending = self.trending()
+        if trending:
+            lines.append("Trending: " + ', '.join(trending))
+        for author, recent in reversed(self._recent.items()):  # most recently active first
+            lines.append(f"{author} ({counts.get(author, len(recent))} posts), latest:")
+            for stamp, text in list(recent)[-per_author:][::-1]:
+                lines.append(f"- [{stamp[11:16]}] {text}" if len(stamp) >= 16 else f"- {text}")
+        return lines
+
+    def _fit(self, lines) -> str:
+        """As many whole lines as fit in ``max_chars``, without a trailing author heading."""
+        kept, size = [], -1
+        for line in lines:
+            size += len(line) + 1
+            if size > self.max_chars:
+                break
+            kept.append(line)
+        if len(kept) < len(lines) and kept[-1].endswith(', latest:'):
+            kept.pop()  # an author heading whose posts didn't fit
+        return '\n'.join(kept)
+
+    def text(self) -> str:
+        """The digest, at most ``max_chars`` long; cached until the feed changes."""
+        with self._lock:
+            self.sync()
+            if self._rendered is None:
+                for per_author in range(self.per_author, 0, -1):
+                    lines = self._render(per_author)
+                    if sum(len(line) + 1 for line in lines) - 1 <= self.max_chars:
+                        break
+                self._rendered = self._fit(lines)
+            return self._rendered
+
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def get_feed_digest(store=None) -> FeedDigest:
+    """Return the process-wide digest for ``store`` (default: ``get_feed_store()``)."""
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _digests_lock:
+        if id(store) not in _digests:
+            from config.settings import FEED_DIGEST_POSTS_PER_AUTHOR, FEED_DIGEST_TEXT_CHARS, FEED_DIGEST_MAX_TOKENS
+            _digests[id(store)] = FeedDigest(store, per_author=FEED_DIGEST_POSTS_PER_AUTHOR,
+                                             text_chars=FEED_DIGEST_TEXT_CHARS,
+                                             max_chars=FEED_DIGEST_MAX_TOKENS * 4)
+        return _digests[id(store)]
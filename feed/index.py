@@ -0,0 +1,245 @@
+"""
+Secondary indexes over the feed: author -> offsets and hour bucket -> offsets.
+
+The index is persisted as an append-only JSON-lines sidecar next to the feed
+(one ``[offset, next_offset, author, epoch]`` entry per post), so it can be
+brought up to date by scanning only the posts appended since its high-water
+mark, and rebuilt from scratch at any time with ``rebuild()`` or
+``python -m feed.reindex``.
+"""
+import bisect
+import json
+import os
+import threading
+from datetime import datetime
+
+from feed.lock import FileLock
+
+BUCKET_SECONDS = 3600
+INDEXED_FIELDS = ("author", "timestamp")
+
+
+def post_epoch(post):
+    """Return the post's timestamp as epoch seconds, or None if it has none."""
+    stamp = post.get('timestamp')
+    if not stamp:
+        return None
+    try:
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+class FeedIndex:
+    """
+    In-memory author and time-bucket indexes backed by a sidecar log.
+
+    Query methods return store offsets, newest first; ``read`` turns offsets
+    into posts. Every query first catches up with posts other processes may
+    have appended, which costs one directory listing when nothing changed.
+    """
+
+    def __init__(self, store, path=None):
+        self.store = store
+        self.path = path or store.sidecar_path('index.jsonl')
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path + '.lock')
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.offsets = []
+        self.by_author_offsets = {}
+        self.buckets = {}
+        self.end = self.store.start_offset()
+        self._sidecar_pos = 0
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _apply(self, entry):
+        offset, next_offset, author, epoch = entry
+        if offset < self.end:
+            return  # already indexed (duplicate or pre-retention entry)
+        self.offsets.append(offset)
+        self.by_author_offsets.setdefault(author, []).append(offset)
+        if epoch is not None:
+            self.buckets.setdefault(int(epoch // BUCKET_SECONDS), []).append((epoch, offset))
+        self.end = next_offset
+
+    def _read_sidecar(self):
+        """Apply sidecar entries written since we last looked (by any process)."""
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._sidecar_pos:
+                    self._reset()  # rebuilt by another process; start over
+                f.seek(self._sidecar_pos)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._sidecar_pos += len(line)
+                    self._apply(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _index_entries(self, entries):
+        """Persist and apply ``(offset, next_offset, post)`` triples."""
+        rows = [[offset, next_offset, post.get('author', 'Unknown'), post_epoch(post)]
+                for offset, next_offset, post in entries]
+        if not rows:
+            return
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self._sidecar_pos += len(data)
+        for row in rows:
+            self._apply(row)
+
+    def _scan(self, start=None):
+        # The index needs neither the text nor extra fields; v2 records skip decoding them
+        return self.store.scan(start, fields=INDEXED_FIELDS)
+
+    def _is_current(self) -> bool:
+        """True if neither the store nor the sidecar grew; costs stats, not reads."""
+        try:
+            sidecar_size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            sidecar_size = 0
+        return sidecar_size == self._sidecar_pos and self.store.end_offset() <= self.end
+
+    def sync(self):
+        """Bring the index up to date with the store."""
+        if self._loaded and self._is_current():
+            return self
+        with self._lock, self._file_lock:
+            self._loaded = True
+            self._read_sidecar()
+            if self.store.end_offset() > self.end:
+                self._index_entries(self._scan(max(self.end, self.store.start_offset())))
+        return self
+
+    def on_append(self, entries):
+        """Store listener: index freshly committed posts without rescanning."""
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_sidecar()
+            entries = list(entries)
+            if entries and entries[0][0] == self.end:
+                self._index_entries(entries)
+            else:
+                # Another process appended in between; catch up from the store.
+                self._read_sidecar()
+                self._index_entries(self._scan(max(self.end, self.store.start_offset())))
+
+    def rebuild(self):
+        """Discard the sidecar and index the whole store again."""
+        with self._lock, self._file_lock:
+            tmp = self.path + '.tmp'
+            open(tmp, 'wb').close()
+            os.replace(tmp, self.path)
+            self._reset()
+            self._loaded = True
+            self._index_entries(self._scan())
+        return self
+
+    # -- queries -------------------------------------------------------------
+
+    def count(self, author=None) -> int:
+        self.sync()
+        if author is None:
+            return len(self.offsets)
+        return len(self.by_author_offsets.get(author, []))
+
+    def authors(self) -> dict:
+        """Post count per author."""
+        self.sync()
+        return {author: len(offsets) for author, offsets in self.by_author_offsets.items()}
+
+    def latest(self, n) -> list:
+        """Offsets of the newest ``n`` posts."""
+        self.sync()
+        return self.offsets[:-n - 1:-1] if n > 0 else []
+
+    def by_author(self, author, limit=None, before=None) -> list:
+        """Offsets of ``author``'s posts older than ``before``, newest first."""
+        self.sync()
+        offsets = self.by_author_offsets.get(author, [])
+        stop = len(offsets) if before is None else bisect.bisect_left(offsets, before)
+        start = 0 if limit is None else max(0, stop - limit)
+        return offsets[start:stop][::-1]
+
+    def position(self, offset) -> int:
+        """Zero-based position of the post at ``offset`` in the feed."""
+        self.sync()
+        return bisect.bisect_left(self.offsets, offset)
+
+    def cursor_at(self, t):
+        """
+        Offset of the first post timestamped at or after ``t``.
+
+        Paging backwards from this cursor starts with the newest post older
+        than ``t``; ``None`` means no post is that recent.
+        """
+        self.sync()
+        lo = _epoch(t)
+        buckets = sorted(self.buckets)
+        for bucket in buckets[bisect.bisect_left(buckets, int(lo // BUCKET_SECONDS)):]:
+            hits = [offset for epoch, offset in self.buckets[bucket] if epoch >= lo]
+            if hits:
+                return min(hits)
+        return None
+
+    def between(self, t0=None, t1=None, author=None, limit=None) -> list:
+        """
+        Offsets of posts timestamped in ``[t0, t1)``, newest first.
+
+        Bounds may be datetimes, ISO strings or epoch seconds; ``None`` leaves
+        that side open. Posts without a timestamp never match.
+        """
+        self.sync()
+        lo, hi = _epoch(t0), _epoch(t1)
+        buckets = sorted(self.buckets)
+        first = 0 if lo is None else bisect.bisect_left(buckets, int(lo // BUCKET_SECONDS))
+        last = len(buckets) if hi is None else bisect.bisect_right(buckets, int(hi // BUCKET_SECONDS))
+        wanted = None if author is None else set(self.by_author_offsets.get(author, []))
+        result = []
+        for bucket in reversed(buckets[first:last]):
+            for epoch, offset in sorted(self.buckets[bucket], reverse=True):
+                if (lo is not None and epoch < lo) or (hi is not None and epoch >= hi):
+                    continue
+                if wanted is not None and offset not in wanted:
+                    continue
+                result.append(offset)
+                if limit is not None and len(result) >= limit:
+                    return result
+        return result
+
+    def read(self, offsets) -> list:
+        """Fetch the posts stored at ``offsets``."""
+        return self.store.read_many(offsets)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_feed_index(store=None) -> FeedIndex:
+    """Return the process-wide index for ``store`` (default: ``get_feed_store()``)."""
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _indexes_lock:
+        if id(store) not in _indexes:
+            _indexes[id(store)] = FeedIndex(store)
+        return _indexes[id(store)]
+
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+One-shot migration of a legacy site/feed.json into the segmented feed store.
+Usage: python -m feed.migrate [path/to/feed.json]
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# noinspection PyUnresolvedReferences
+from config.settings import FEED_PATH, FEED_STORE_DIR, FEED_SEGMENT_MAX_BYTES, FEED_COMPACT_SEGMENTS
+from feed.store import SegmentedFeedStore, migrate_json_feed
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else FEED_PATH
+    store = SegmentedFeedStore(FEED_STORE_DIR, FEED_SEGMENT_MAX_BYTES, FEED_COMPACT_SEGMENTS)
+    migrated = migrate_json_feed(source, store)
+    if migrated:
+        print(f"✅ Migrated {migrated} posts from {source} into {FEED_STORE_DIR}")
+    else:
+        print(f"ℹ️  Nothing migrated: {FEED_STORE_DIR} already has posts or {source} is empty")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Typed feed records and their on-disk codec.
+
+A ``Post`` is a slotted record (author, text, timestamp, plus any extra keys
+in a dict) with interned author strings; it answers ``post['text']`` and
+``post.get('author', 'Unknown')`` like the plain dicts it replaces, so readers
+written against dicts keep working.
+
+Every stored line says which format it is in, so one feed can mix them and
+files written before the format existed keep loading:
+
+    v1  ``{...}\\n``  one compact JSON object (the original format)
+    v2  ``\\x02<timestamp>\\x1f<author>\\x1f<extra>\\x1f<text>\\n``
+
+v2 fields are UTF-8 with ``\\``, newline and ``\\x1f`` backslash-escaped;
+``extra`` is empty or a JSON object of keys other than the three above. The
+text comes last, so readers that only need the author and timestamp (e.g.
+the index) split off the first fields and never decode the text.
+"""
+import json
+import sys
+
+V1 = "v1"
+V2 = "v2"
+RECORD_FORMATS = (V1, V2)
+FIELDS = ("author", "text", "timestamp")
+_FIELD_SET = frozenset(FIELDS)
+
+_V2_TAG = b'\x02'
+_SEP = b'\x1f'
+_MAX_AUTHORS = 4096
+_authors = {}  # encoded author -> interned name
+_new_post = object.__new__
+
+
+def _decode_author(raw: bytes):
+    """Decoded, interned author name; every post by one author shares one string."""
+    if not raw:
+        return None
+    author = sys.intern(_unescape(raw))
+    if len(_authors) < _MAX_AUTHORS:
+        _authors[raw] = author
+    return author
+
+
+class Post:
+    """
+    One feed post. Missing fields are ``None``; ``get`` then returns the default.
+    """
+
+    __slots__ = ("author", "text", "timestamp", "extra")
+
+    def __init__(self, author=None, text=None, timestamp=None, extra=None):
+        self.author = sys.intern(author) if isinstance(author, str) else author
+        self.text = text
+        self.timestamp = timestamp
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Post":
+        post = _new_post(cls)
+        author = data.get('author')
+        post.author = sys.intern(author) if type(author) is str else author
+        post.text = data.get('text')
+        post.timestamp = data.get('timestamp')
+        post.extra = None if data.keys() <= _FIELD_SET else {k: v for k, v in data.items() if k not in _FIELD_SET}
+        return post
+
+    def to_dict(self) -> dict:
+        data = {k: getattr(self, k) for k in FIELDS if getattr(self, k) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    # -- dict-style access -----------------------------------------------------
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __eq__(self, other):
+        if isinstance(other, Post):
+            other = other.to_dict()
+        return self.to_dict() == other if isinstance(other, dict) else NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Post({self.to_dict()!r})"
+
+
+def as_post(post) -> Post:
+    return post if isinstance(post, Post) else Post.from_dict(post)
+
+
+def _escape(value: str) -> bytes:
+    raw = value.encode('utf-8')
+    if b'\\' in raw or b'\n' in raw or _SEP in raw:
+        raw = raw.replace(b'\\', b'\\\\').replace(b'\n', b'\\n').replace(_SEP, b'\\x')
+    return raw
+
+
+def _unescape(raw: bytes) -> str:
+    if b'\\' in raw:
+        # Escapes are two bytes and never overlap, so splitting on the escaped
+        # backslash first leaves only \n and \x sequences in each part
+        parts = raw.split(b'\\\\')
+        raw = b'\\'.join(part.replace(b'\\n', b'\n').replace(b'\\x', _SEP) for part in parts)
+    return raw.decode('utf-8')
+
+
+def encode_post(post, record_format=V2) -> bytes:
+    """Encode a post (``Post`` or dict) as one newline-terminated line."""
+    if record_format == V1:
+        data = post.to_dict() if isinstance(post, Post) else post
+        return (json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+    if record_format != V2:
+        raise ValueError(f"Unknown feed record format {record_format!r}; expected one of {RECORD_FORMATS}")
+    post = as_post(post)
+    stamp, author, text = post.timestamp, post.author, post.text
+    # Absent fields are stored empty, so only non-empty strings round-trip through v2
+    if not (_v2_safe(stamp) and _v2_safe(author) and _v2_safe(text)):
+        return encode_post(post, V1)
+    extra = json.dumps(post.extra, ensure_ascii=False, separators=(',', ':')) if post.extra else ''
+    return b''.join((_V2_TAG, _escape(stamp) if stamp else b'', _SEP, _escape(author) if author else b'', _SEP,
+                     _escape(extra), _SEP, _escape(text) if text else b'', b'\n'))
+
+
+def _v2_safe(value) -> bool:
+    return value is None or (type(value) is str and value != '')
+
+
+def decode_post(line: bytes, fields=None) -> Post:
+    """
+    Decode one line produced by ``encode_post`` in any format.
+
+    ``fields`` (e.g. ``("author", "timestamp")``) limits which fields are
+    kept; the others are left ``None``. v2 records skip decoding them.
+    """
+    if line[:1] != _V2_TAG:
+        if line[:1] == b'{':
+            post = Post.from_dict(json.loads(line))
+            if fields is not None:
+                # JSON can't skip fields while parsing, but needn't keep them
+                for field in _FIELD_SET.difference(fields):
+                    setattr(post, field, None)
+            return post
+        raise ValueError(f"Unsupported feed record version: {line[:1]!r}")
+    parts = line.split(_SEP, 3)
+    if len(parts) != 4:
+        raise ValueError(f"Corrupt v2 feed record: {line[:80]!r}")
+    stamp, author, extra, text = parts
+    stamp = stamp[1:]
+    if text[-1:] == b'\n':
+        text = text[:-1]
+    post = _new_post(Post)
+    post.extra = None
+    if fields is None:
+        post.timestamp = _unescape(stamp) if stamp else None
+        post.author = _authors.get(author) or _decode_author(author)
+        post.text = _unescape(text) if text else None
+        if extra:
+            post.extra = json.loads(_unescape(extra))
+        return post
+    post.timestamp = _unescape(stamp) if stamp and 'timestamp' in fields else None
+    post.author = (_authors.get(author) or _decode_author(author)) if 'author' in fields else None
+    post.text = _unescape(text) if text and 'text' in fields else None
+    if extra and any(f not in FIELDS for f in fields):
+        post.extra = json.loads(_unescape(extra))
+    return post
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Rebuild the feed's sidecar index, stats, search and dedup indexes from scratch and print posts per author.
+Usage: python -m feed.reindex [--check]
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# noinspection PyUnresolvedReferences
+from config.settings import FEED_DEDUP_POLICY
+from feed import get_feed_index, get_feed_stats, get_search_index, get_dedup_index
+
+
+def rebuild_all():
+    """Rebuild every sidecar from the store, printing a line per sidecar."""
+    index = get_feed_index().rebuild()
+    print(f"✅ Rebuilt index: {len(index.offsets)} posts → {index.path}")
+    stats = get_feed_stats().rebuild()
+    print(f"✅ Rebuilt stats: {stats.posts} posts → {stats.path}")
+    search = get_search_index().rebuild()
+    print(f"✅ Rebuilt search index: {len(search)} posts, {len(search.postings)} terms → {search.path}")
+    if FEED_DEDUP_POLICY != "off":
+        dedup = get_dedup_index().rebuild()
+        print(f"✅ Rebuilt dedup index: {len(dedup)} posts → {dedup.path}")
+    return index
+
+
+def main():
+    if '--check' in sys.argv[1:]:
+        index = get_feed_index()
+        print(f"📇 {index.count()} posts indexed in {index.path}")
+        stats = get_feed_stats()
+        print(f"📊 {stats.summary()['posts']} posts counted in {stats.path}")
+        search = get_search_index()
+        print(f"🔎 {len(search.sync())} posts searchable in {search.path}")
+        if FEED_DEDUP_POLICY != "off":
+            dedup = get_dedup_index()
+            print(f"🔁 {len(dedup.sync())} posts signed in {dedup.path}")
+    else:
+        index = rebuild_all()
+    for author, count in sorted(index.authors().items(), key=lambda item: -item[1]):
+        print(f"   {author}: {count}")
+
+
+if __name__ == "__main__":
+    main()
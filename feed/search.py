@@ -0,0 +1,477 @@
+"""
+Full-text search over the feed: an inverted index ranked with BM25.
+
+Post texts are tokenized into lower-cased words; every word that is not a
+stopword maps to a posting list of (doc id, term frequency) pairs, kept in
+two ``array``s per term. Doc ids are assigned in append order, so posting
+lists are sorted and newest-last, and ``doc_offsets`` maps a doc id back to
+the post's store offset.
+
+Queries match posts containing every query term (AND) and rank them with
+BM25. ``"quoted phrases"`` must also appear word for word: candidates are
+ranked first and then checked against their stored text, best first, until
+enough have matched. To keep a query within a few milliseconds however
+common its terms are, only the newest ``max_candidates`` matches are scored;
+``SearchResults.truncated`` says when that happened, or when phrase checking
+stopped before every candidate was read.
+
+Persistence follows ``FeedStats``: a binary snapshot (``search.idx``: one
+JSON header line, then the arrays) plus a JSON-lines log of posts indexed
+since (``search.log``). Appends only add log lines; a process that has not
+loaded the index (e.g. the agents' writer) never reads the snapshot, and
+logs nothing until some search has built the index once. Once
+the log holds more than ``checkpoint_min`` posts and a tenth of the index,
+the process that has the index loaded rewrites the snapshot and empties the
+log. ``rebuild()`` / ``python -m feed.reindex`` index the whole store again.
+"""
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import NamedTuple
+
+from feed.lock import FileLock
+from feed.store import _lines_backwards
+
+SNAPSHOT_VERSION = 2
+SEARCH_FIELDS = ("author", "text")
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+STOPWORDS = frozenset("""
+    a an and are as at be been but by for from had has have he her his i if in into is it its me my
+    no not of on or our she so than that the their them then there these they this those to too
+    us was we were what when which who will with you your
+""".split())
+
+
+def tokenize(text) -> list:
+    """Lower-cased words of ``text`` (stopwords included)."""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def index_terms(tokens) -> Counter:
+    """Term frequencies of the indexed (non-stopword) ``tokens``."""
+    return Counter(token for token in tokens if token not in STOPWORDS)
+
+
+class SearchResults(NamedTuple):
+    hits: list  # [(offset, score)], best first
+    matched: int  # posts that matched every term (and, for phrase queries, were verified to hold the phrases)
+    truncated: bool  # more posts may match: the candidate cap was hit or phrase checks stopped early
+    elapsed_ms: float
+
+    @property
+    def offsets(self) -> list:
+        return [offset for offset, _ in self.hits]
+
+
+class _Postings:
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self, docs=None, tfs=None):
+        self.docs = docs if docs is not None else array('I')
+        self.tfs = tfs if tfs is not None else array('B')
+
+
+class SearchIndex:
+    """
+    BM25-ranked inverted index over ``store``, kept in step with its appends.
+
+    max_candidates: newest matching posts scored per query
+    k1, b:          BM25 term-frequency saturation and length normalization
+    """
+
+    def __init__(self, store, path=None, max_candidates=5000, k1=1.2, b=0.75, checkpoint_min=2000):
+        self.store = store
+        self.path = path or store.sidecar_path('search.idx')
+        self.log_path = os.path.splitext(self.path)[0] + '.log'
+        self.max_candidates = max_candidates
+        self.k1 = k1
+        self.b = b
+        self.checkpoint_min = checkpoint_min
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path + '.lock')
+        self._loaded = False
+        self._snapshot_id = None
+        self._reset()
+
+    def _reset(self):
+        self.end = self.store.start_offset()
+        self.doc_offsets = array('Q')
+        self.doc_lens = array('H')
+        self.doc_authors = array('I')  # more than 65535 authors is plausible over a feed's life
+        self.authors = []
+        self.author_ids = {}
+        self.author_docs = []  # author id -> doc ids, for author filters
+        self.postings = {}
+        self.total_len = 0
+        self._log_pos = 0
+        self._log_entries = 0
+
+    # -- maintenance ---------------------------------------------------------
+
+    @staticmethod
+    def _row(offset, next_offset, post):
+        tokens = tokenize(post.get('text', ''))
+        return [offset, next_offset, post.get('author', 'Unknown'), len(tokens), index_terms(tokens)]
+
+    def _apply(self, row):
+        offset, next_offset, author, length, tfs = row
+        if offset < self.end:
+            return  # already indexed
+        doc = len(self.doc_offsets)
+        author_id = self.author_ids.get(author)
+        if author_id is None:
+            author_id = self.author_ids[author] = len(self.authors)
+            self.authors.append(author)
+            self.author_docs.append(array('I'))
+        self.doc_offsets.append(offset)
+        self.doc_lens.append(min(length, 0xFFFF))
+        self.doc_authors.append(author_id)
+        self.author_docs[author_id].append(doc)
+        self.total_len += min(length, 0xFFFF)
+        for term, tf in tfs.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = _Postings()
+            postings.docs.append(doc)
+            postings.tfs.append(min(tf, 0xFF))
+        self.end = next_offset
+
+    def _file_id(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_header(self, f):
+        header = json.loads(f.readline())
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported search index version {header.get('version')!r}")
+        return header
+
+    def _read_snapshot(self):
+        self._reset()
+        self._snapshot_id = self._file_id(self.path)
+        try:
+            with open(self.path, 'rb') as f:
+                header = self._read_header(f)
+                n, total = header["docs"], header["postings"]
+                self.doc_offsets.fromfile(f, n)
+                self.doc_lens.fromfile(f, n)
+                self.doc_authors.fromfile(f, n)
+                docs, tfs = array('I'), array('B')
+                docs.fromfile(f, total)
+                tfs.fromfile(f, total)
+        except FileNotFoundError:
+            self._reset()
+            return
+        except (ValueError, EOFError):
+            # Unreadable or an older format: its log continues a snapshot we don't have, so
+            # skip it too and let ``sync`` index the store from the start
+            self._reset()
+            try:
+                self._log_pos = os.path.getsize(self.log_path)
+            except FileNotFoundError:
+                pass
+            return
+        self.end = header["end"]
+        self.total_len = header["total_len"]
+        self.authors = header["authors"]
+        self.author_ids = {author: i for i, author in enumerate(self.authors)}
+        self.author_docs = [array('I') for _ in self.authors]
+        for doc, author_id in enumerate(self.doc_authors):
+            self.author_docs[author_id].append(doc)
+        pos = 0
+        for term, count in header["terms"]:
+            self.postings[term] = _Postings(docs[pos:pos + count], tfs[pos:pos + count])
+            pos += count
+
+    def _read_log(self):
+        """Apply log entries written since we last looked (by any process)."""
+        if self._file_id(self.path) != self._snapshot_id:
+            self._read_snapshot()  # checkpointed or rebuilt by another process
+        try:
+            with open(self.log_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._log_pos:
+                    self._read_snapshot()
+                f.seek(self._log_pos)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._log_pos += len(line)
+                    self._log_entries += 1
+                    self._apply(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _log(self, rows):
+        if not rows:
+            return 0
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        with open(self.log_path, 'ab') as f:
+            f.write(data)
+        return len(data)
+
+    def _logged_end(self):
+        """Store offset the snapshot plus log cover up to, without loading either; ``None`` if never built."""
+        try:
+            with open(self.log_path, 'rb') as f:
+                for _, line in _lines_backwards(f, os.fstat(f.fileno()).st_size):
+                    return json.loads(line)[1]
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.path, 'rb') as f:
+                return self._read_header(f)["end"]
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _index(self, entries):
+        """Log and apply ``(offset, next_offset, post)`` triples."""
+        rows = [self._row(*entry) for entry in entries if entry[0] >= self.end]
+        self._log_pos += self._log(rows)
+        self._log_entries += len(rows)
+        for row in rows:
+            self._apply(row)
+        if self._log_entries >= max(self.checkpoint_min, len(self.doc_offsets) // 10):
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Write the whole index as a fresh snapshot and empty the log."""
+        terms = [(term, len(postings.docs)) for term, postings in self.postings.items()]
+        header = {
+            "version": SNAPSHOT_VERSION, "end": self.end, "docs": len(self.doc_offsets),
+            "postings": sum(count for _, count in terms), "total_len": self.total_len,
+            "authors": self.authors, "terms": terms,
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+            self.doc_offsets.tofile(f)
+            self.doc_lens.tofile(f)
+            self.doc_authors.tofile(f)
+            for postings in self.postings.values():
+                postings.docs.tofile(f)
+            for postings in self.postings.values():
+                postings.tfs.tofile(f)
+        os.replace(tmp, self.path)
+        open(self.log_path, 'wb').close()
+        self._snapshot_id = self._file_id(self.path)
+        self._log_pos = 0
+        self._log_entries = 0
+
+    def _is_current(self) -> bool:
+        """True if neither the store nor the log changed; costs stats, not reads."""
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            log_size = 0
+        return log_size == self._log_pos and self.store.end_offset() <= self.end
+
+    def sync(self):
+        """Load the index on first use and bring it up to date with the store."""
+        if self._loaded and self._is_current():
+            return self
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_snapshot()
+            self._read_log()
+            if self.store.end_offset() > self.end:
+                self._index(self.store.scan(max(self.end, self.store.start_offset()), fields=SEARCH_FIELDS))
+        return self
+
+    def on_append(self, entries):
+        """Store listener: index freshly committed posts."""
+        with self._lock, self._file_lock:
+            entries = list(entries)
+            if not entries:
+                return
+            if self._loaded:
+                self._read_log()
+                end = self.end
+            else:
+                # Just extend the log; whoever searches loads and applies it
+                end = self._logged_end()
+                if end is None:
+                    return  # never built: the first search indexes the whole store
+            if entries[0][0] != end:
+                # Another process appended in between; fill the gap from the store.
+                entries = self.store.scan(max(end, self.store.start_offset()), fields=SEARCH_FIELDS)
+            if self._loaded:
+                self._index(entries)
+            else:
+                self._log([self._row(*entry) for entry in entries if entry[0] >= end])
+
+    def rebuild(self):
+        """Discard the persisted index and index the whole store again."""
+        with self._lock, self._file_lock:
+            self._reset()
+            self._loaded = True
+            open(self.log_path, 'wb').close()
+            for entry in self.store.scan(fields=SEARCH_FIELDS):
+                self._apply(self._row(*entry))
+            self._checkpoint()
+        return self
+
+    # -- queries -------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.doc_offsets)
+
+    def _matches(self, lists, author_id=None) -> tuple:
+        """
+        Doc ids in every sorted doc-id array of ``lists`` (shortest first) and by ``author_id``,
+        newest first, and whether more were left out.
+
+        The shortest array is walked backwards in chunks sized by the match
+        rate so far; each chunk is intersected with the same doc-id range of
+        the others, so the work follows the matches collected rather than the
+        arrays' lengths.
+        """
+        first, rest = lists[0], lists[1:]
+        cap = self.max_candidates
+        doc_authors = self.doc_authors
+        matches = []
+        hi, step = len(first), cap
+        while hi > 0 and len(matches) <= cap:
+            lo = max(0, hi - step)
+            chunk = first[lo:hi]
+            candidates = set(chunk) if rest else chunk
+            for docs in rest:
+                a, b = bisect.bisect_left(docs, chunk[0]), bisect.bisect_right(docs, chunk[-1])
+                if b - a > 16 * len(candidates):
+                    # Much denser than the candidates: probe rather than copy the range
+                    candidates = {doc for doc in candidates
+                                  if (j := bisect.bisect_left(docs, doc, a, b)) < b and docs[j] == doc}
+                else:
+                    candidates = candidates.intersection(docs[a:b])
+                if not candidates:
+                    break
+            if author_id is not None:
+                candidates = [doc for doc in candidates if doc_authors[doc] == author_id]
+            matches.extend(sorted(candidates, reverse=True))
+            hi = lo
+            rate = len(matches) / (len(first) - hi)
+            step = int((cap + 1 - len(matches)) * 1.25 / max(rate, 1 / 64)) + 64
+        return matches[:cap], len(matches) > cap
+
+    @staticmethod
+    def _tfs(postings, docs) -> list:
+        """Term frequencies in ``postings`` of ``docs`` (all present, newest first)."""
+        ids, tfs = postings.docs, postings.tfs
+        a, b = bisect.bisect_left(ids, docs[-1]), bisect.bisect_right(ids, docs[0])
+        if b - a > 16 * len(docs):
+            return [tfs[bisect.bisect_left(ids, doc, a, b)] for doc in docs]
+        lookup = dict(zip(ids[a:b], tfs[a:b]))
+        return [lookup[doc] for doc in docs]
+
+    def search(self, query, author=None, limit=20) -> SearchResults:
+        """
+        Posts matching every word of ``query`` (and its ``"quoted phrases"``), best first.
+
+        ``author`` restricts matches to one author. Stopwords are ignored
+        outside phrases, so a query of stopwords alone matches nothing.
+        """
+        started = time.perf_counter()
+        self.sync()
+        phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+        phrases = [p for p in phrases if len(p) > 1]
+        terms = list(index_terms(tokenize(query)))
+        with self._lock:
+            author_id = None if author is None else self.author_ids.get(author, -1)
+            if not terms or author_id == -1 or any(term not in self.postings for term in terms):
+                return SearchResults([], 0, False, (time.perf_counter() - started) * 1000)
+            lists = [self.postings[term] for term in terms]
+            if len(lists) == 1 and author_id is None:
+                # Every post in the list matches: take the newest straight from the arrays
+                docs = lists[0].docs[-self.max_candidates:][::-1]
+                tf_lists = [lists[0].tfs[-self.max_candidates:][::-1]]
+                truncated = len(lists[0].docs) > len(docs)
+            else:
+                doc_lists = sorted((p.docs for p in lists), key=len)
+                if author_id is not None and len(self.author_docs[author_id]) < len(doc_lists[0]):
+                    # The author posted less than the rarest term appears: walk their posts instead
+                    doc_lists.insert(0, self.author_docs[author_id])
+                    author_id = None
+                docs, truncated = self._matches(doc_lists, author_id)
+                tf_lists = [self._tfs(postings, docs) if docs else [] for postings in lists]
+
+            # BM25: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)), summed over terms
+            n = len(self.doc_offsets)
+            k1, doc_lens = self.k1, self.doc_lens
+            scale = k1 * self.b * n / self.total_len if self.total_len else 0.0
+            base = k1 * (1 - self.b)
+            norms = [base + scale * doc_lens[doc] for doc in docs]
+            scores = [0.0] * len(docs)
+            for postings, tfs in zip(lists, tf_lists):
+                df = len(postings.docs)
+                weight = math.log(1 + (n - df + 0.5) / (df + 0.5)) * (k1 + 1)
+                scores = [score + weight * tf / (tf + norm) for score, tf, norm in zip(scores, tfs, norms)]
+            # Ties go to the newer post; phrases need spare candidates to verify
+            wanted = self._phrase_reads(limit) if phrases else limit
+            doc_offsets = self.doc_offsets
+            ranked = [(doc_offsets[doc], score) for score, doc in heapq.nlargest(wanted, zip(scores, docs))]
+
+        matched = len(docs)
+        if phrases:
+            ranked, checked = self._verify_phrases(ranked, phrases, limit)
+            # Only verified posts count; the candidates left unchecked may or may not hold the phrase
+            matched = len(ranked)
+            truncated = truncated or checked < len(docs)
+        return SearchResults(ranked[:limit], matched, truncated, (time.perf_counter() - started) * 1000)
+
+    def read(self, offsets) -> list:
+        """Fetch the posts stored at ``offsets``."""
+        return self.store.read_many(offsets)
+
+    @staticmethod
+    def _phrase_reads(limit) -> int:
+        """Best-ranked candidates whose text a phrase query reads, at most."""
+        return max(100, 10 * limit)
+
+    def _verify_phrases(self, ranked, phrases, limit, batch=50):
+        """
+        Keep the ranked hits whose stored text contains every phrase, best first.
+
+        Returns ``(verified, checked)``: checking stops once ``limit`` hits
+        are verified, so ``checked`` may be less than ``len(ranked)``.
+        """
+        patterns = [re.compile(r"(?<![^\W_])" + r"[\W_]+".join(map(re.escape, phrase)) + r"(?![^\W_])")
+                    for phrase in phrases]
+        verified, checked = [], 0
+        for i in range(0, len(ranked), batch):
+            hits = ranked[i:i + batch]
+            for hit, post in zip(hits, self.read([offset for offset, _ in hits])):
+                checked += 1
+                text = str(post.get('text', '')).lower()
+                if all(pattern.search(text) for pattern in patterns):
+                    verified.append(hit)
+                    if len(verified) >= limit:
+                        return verified, checked
+        return verified, checked
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(store=None) -> SearchIndex:
+    """Return the process-wide search index for ``store`` (default: ``get_feed_store()``)."""
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _indexes_lock:
+        if id(store) not in _indexes:
+            from config.settings import FEED_SEARCH_MAX_CANDIDATES
+            _indexes[id(store)] = SearchIndex(store, max_candidates=FEED_SEARCH_MAX_CANDIDATES)
+        return _indexes[id(store)]
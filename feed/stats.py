@@ -0,0 +1,245 @@
+"""
+Materialized feed analytics: posts, text length and activity per author and hour.
+
+``FeedStats`` keeps running totals that each append updates in O(1): posts
+and characters overall and per author, first/last post time, and posts per
+hour bucket. Nothing here scans the feed on a read.
+
+The totals are persisted next to the feed as a snapshot (``stats.json``)
+plus an append-only delta log (``stats.log``, one ``[offset, next_offset,
+author, epoch, chars]`` line per post). Appends only add log lines; every
+``checkpoint_every`` entries the snapshot is rewritten and the log emptied.
+Other processes catch up by reading the log lines added since they last
+looked, and ``rebuild()`` / ``python -m feed.reindex`` recompute everything
+from the store.
+"""
+import json
+import os
+import threading
+import time
+
+from feed.index import BUCKET_SECONDS, post_epoch
+from feed.lock import FileLock
+
+STATS_FIELDS = ("author", "text", "timestamp")
+SNAPSHOT_VERSION = 1
+
+
+class FeedStats:
+    """Running totals over every post in ``store``, kept in step with its appends."""
+
+    def __init__(self, store, path=None, checkpoint_every=1000):
+        self.store = store
+        self.path = path or store.sidecar_path('stats.json')
+        self.log_path = os.path.splitext(self.path)[0] + '.log'
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path + '.lock')
+        self._loaded = False
+        self._snapshot_id = None
+        self._reset()
+
+    def _reset(self):
+        self.end = self.store.start_offset()
+        self.posts = 0
+        self.chars = 0
+        self.first = None
+        self.last = None
+        self.authors = {}  # author -> [posts, chars, last epoch]
+        self.hours = {}  # hour bucket -> posts
+        self._log_pos = 0
+        self._log_entries = 0
+
+    # -- maintenance ---------------------------------------------------------
+
+    def _apply(self, entry):
+        offset, next_offset, author, epoch, chars = entry
+        if offset < self.end:
+            return  # already counted
+        self.posts += 1
+        self.chars += chars
+        totals = self.authors.get(author)
+        if totals is None:
+            totals = self.authors[author] = [0, 0, None]
+        totals[0] += 1
+        totals[1] += chars
+        if epoch is not None:
+            totals[2] = epoch if totals[2] is None else max(totals[2], epoch)
+            self.first = epoch if self.first is None else min(self.first, epoch)
+            self.last = epoch if self.last is None else max(self.last, epoch)
+            bucket = int(epoch // BUCKET_SECONDS)
+            self.hours[bucket] = self.hours.get(bucket, 0) + 1
+        self.end = next_offset
+
+    def _file_id(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_snapshot(self):
+        self._reset()
+        self._snapshot_id = self._file_id(self.path)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") != SNAPSHOT_VERSION:
+            return  # unknown layout; the log and a store scan rebuild it
+        self.end = data["end"]
+        self.posts = data["posts"]
+        self.chars = data["chars"]
+        self.first = data["first"]
+        self.last = data["last"]
+        self.authors = {author: list(totals) for author, totals in data["authors"].items()}
+        self.hours = {int(bucket): count for bucket, count in data["hours"].items()}
+
+    def _read_log(self):
+        """Apply log entries written since we last looked (by any process)."""
+        if self._file_id(self.path) != self._snapshot_id:
+            self._read_snapshot()  # checkpointed or rebuilt by another process
+        try:
+            with open(self.log_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self._log_pos:
+                    self._read_snapshot()
+                f.seek(self._log_pos)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._log_pos += len(line)
+                    self._log_entries += 1
+                    self._apply(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def _record(self, entries):
+        """Log and apply ``(offset, next_offset, post)`` triples."""
+        rows = [[offset, next_offset, post.get('author', 'Unknown'), post_epoch(post),
+                 len(str(post.get('text', '')))]
+                for offset, next_offset, post in entries if offset >= self.end]
+        if not rows:
+            return
+        data = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        with open(self.log_path, 'ab') as f:
+            f.write(data)
+        self._log_pos += len(data)
+        self._log_entries += len(rows)
+        for row in rows:
+            self._apply(row)
+        if self._log_entries >= self.checkpoint_every:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        """Fold the log into a fresh snapshot and empty it."""
+        data = {
+            "version": SNAPSHOT_VERSION, "end": self.end, "posts": self.posts, "chars": self.chars,
+            "first": self.first, "last": self.last, "authors": self.authors,
+            "hours": {str(bucket): count for bucket, count in self.hours.items()},
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        open(self.log_path, 'wb').close()
+        self._snapshot_id = self._file_id(self.path)
+        self._log_pos = 0
+        self._log_entries = 0
+
+    def _is_current(self) -> bool:
+        """True if neither the store nor the log changed; costs stats, not reads."""
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            log_size = 0
+        return log_size == self._log_pos and self.store.end_offset() <= self.end
+
+    def sync(self):
+        """Bring the totals up to date with the store."""
+        if self._loaded and self._is_current():
+            return self
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_snapshot()
+            self._read_log()
+            if self.store.end_offset() > self.end:
+                self._record(self.store.scan(max(self.end, self.store.start_offset()), fields=STATS_FIELDS))
+        return self
+
+    def on_append(self, entries):
+        """Store listener: count freshly committed posts without rescanning."""
+        with self._lock, self._file_lock:
+            if not self._loaded:
+                self._loaded = True
+                self._read_snapshot()
+            self._read_log()
+            entries = list(entries)
+            if entries and entries[0][0] == self.end:
+                self._record(entries)
+            else:
+                # Another process appended in between; catch up from the store.
+                self._record(self.store.scan(max(self.end, self.store.start_offset()), fields=STATS_FIELDS))
+
+    def rebuild(self):
+        """Discard the persisted totals and count the whole store again."""
+        with self._lock, self._file_lock:
+            self._reset()
+            self._loaded = True
+            open(self.log_path, 'wb').close()
+            self._record(self.store.scan(fields=STATS_FIELDS))
+            self._checkpoint()
+        return self
+
+    # -- queries -------------------------------------------------------------
+
+    def summary(self) -> dict:
+        """Totals overall and per author (busiest first)."""
+        self.sync()
+        with self._lock:
+            authors = [{
+                "author": author,
+                "posts": posts,
+                "share": posts / self.posts if self.posts else 0.0,
+                "avg_chars": chars / posts if posts else 0.0,
+                "last": last,
+            } for author, (posts, chars, last) in self.authors.items()]
+            return {
+                "posts": self.posts,
+                "authors": sorted(authors, key=lambda row: -row["posts"]),
+                "avg_chars": self.chars / self.posts if self.posts else 0.0,
+                "first": self.first,
+                "last": self.last,
+                "busiest_hour": max(((bucket * BUCKET_SECONDS, n) for bucket, n in self.hours.items()),
+                                    key=lambda item: item[1], default=None),
+            }
+
+    def per_hour(self, hours=24, now=None) -> list:
+        """``(hour start epoch, posts)`` for the last ``hours`` hours, oldest first."""
+        self.sync()
+        current = int((time.time() if now is None else now) // BUCKET_SECONDS)
+        with self._lock:
+            return [(bucket * BUCKET_SECONDS, self.hours.get(bucket, 0))
+                    for bucket in range(current - hours + 1, current + 1)]
+
+    def activity(self, hours=24, now=None) -> tuple:
+        """Posts per hour over the last ``hours`` hours and over the ``hours`` before."""
+        series = self.per_hour(2 * hours, now)
+        previous, recent = series[:hours], series[hours:]
+        return sum(n for _, n in recent) / hours, sum(n for _, n in previous) / hours
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_feed_stats(store=None) -> FeedStats:
+    """Return the process-wide stats for ``store`` (default: ``get_feed_store()``)."""
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _stats_lock:
+        if id(store) not in _stats:
+            _stats[id(store)] = FeedStats(store)
+        return _stats[id(store)]
@@ -0,0 +1,804 @@
+"""
+Storage backends for the social feed.
+
+``SegmentedFeedStore`` keeps the feed as an append-only log of JSON-lines
+segment files. Every post lives at a stable *logical offset* (its byte position
+since the start of the log), and each file is named after the offset it starts
+at. Compaction concatenates sealed segments into a snapshot byte-for-byte, so
+offsets handed out before a compaction remain valid afterwards. ``rotate``
+moves days that have gone cold from the snapshot into compressed archive
+partitions (see ``feed.archive``) over the same offsets, and may drop the
+oldest of those under a retention policy.
+
+``JsonFeedStore`` is the legacy single ``feed.json`` document, kept for setups
+that still want one human-editable file. Its offsets are list positions.
+
+Both hand out ``Post`` records (see ``feed.post``); segment lines are written
+in ``record_format`` and read back in whatever format each line is in.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date
+
+from feed.archive import ARCHIVE_PREFIX, ArchiveError, ArchivePartition, PartitionWriter, post_day
+from feed.lock import FileLock
+from feed.post import V2, Post, as_post, decode_post, encode_post
+
+SEGMENT_PREFIX = "seg"
+SNAPSHOT_PREFIX = "snap"
+_FILE_RE = re.compile(r'^(seg|snap)-(\d{20})\.jsonl$')
+_ARCHIVE_RE = re.compile(r'^arc-(\d{20})-(\d{20})\.jsonl\.z$')
+_ROTATE_FIELDS = ("timestamp",)
+
+logger = logging.getLogger(__name__)
+
+
+class FeedStore:
+    """Interface shared by the feed storage backends."""
+
+    listeners = ()
+
+    def add_listener(self, callback):
+        """Call ``callback(entries)`` after every append with ``(offset, next_offset, post)`` triples."""
+        self.listeners = self.listeners + (callback,)
+
+    def _notify(self, entries):
+        for callback in self.listeners:
+            try:
+                callback(entries)
+            except Exception:
+                # The posts are already durable; sidecars catch up on their next sync.
+                logger.exception("Feed listener %r failed", callback)
+
+    def sidecar_path(self, name) -> str:
+        """Path for an auxiliary file (index, stats, ...) kept next to the feed."""
+        raise NotImplementedError
+
+    def identity(self) -> tuple:
+        """Fingerprint of the stored data that changes on every write; stats only, no reads."""
+        raise NotImplementedError
+
+    def append(self, post) -> int:
+        """Append one post and return its offset."""
+        return self.append_many([post])[0]
+
+    def append_many(self, posts) -> list:
+        """Append posts in order and return their offsets."""
+        raise NotImplementedError
+
+    def scan(self, start=None, fields=None):
+        """
+        Yield ``(offset, next_offset, post)`` for every post from ``start`` on.
+
+        ``fields`` names the post fields the caller needs; backends may leave
+        the others unset.
+        """
+        raise NotImplementedError
+
+    def scan_reverse(self, before=None):
+        """Yield ``(offset, next_offset, post)`` newest first, for posts before ``before``."""
+        entries = list(self.scan())
+        for entry in reversed(entries):
+            if before is None or entry[0] < before:
+                yield entry
+
+    def read_at(self, offset) -> Post:
+        """Return the post stored at ``offset``."""
+        raise NotImplementedError
+
+    def read_many(self, offsets) -> list:
+        """Return the posts stored at ``offsets``, in that order."""
+        return [self.read_at(offset) for offset in offsets]
+
+    def start_offset(self) -> int:
+        """Offset of the oldest post still stored."""
+        return 0
+
+    def end_offset(self) -> int:
+        """Offset the next appended post will get."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        return sum(1 for _ in self.scan())
+
+    def is_empty(self) -> bool:
+        return self.end_offset() <= self.start_offset()
+
+    def iter_posts(self):
+        for _, _, post in self.scan():
+            yield post
+
+    def load(self) -> dict:
+        """Return the whole feed in the legacy ``{"posts": [...]}`` shape."""
+        return {"posts": list(self.iter_posts())}
+
+
+class JsonFeedStore(FeedStore):
+    """The original ``feed.json`` document, rewritten in full on every append."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = FileLock(path + '.lock')
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"posts": []}
+
+    def append_many(self, posts) -> list:
+        posts = [as_post(post) for post in posts]
+        with self._lock:
+            feed = self._read()
+            existing = feed.setdefault('posts', [])
+            first = len(existing)
+            existing.extend(post.to_dict() for post in posts)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(feed, f, ensure_ascii=False, indent=2)
+        offsets = list(range(first, first + len(posts)))
+        self._notify([(offset, offset + 1, post) for offset, post in zip(offsets, posts)])
+        return offsets
+
+    def sidecar_path(self, name) -> str:
+        return f"{self.path}.{name}"
+
+    def identity(self) -> tuple:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return ()
+        return ((st.st_ino, st.st_mtime_ns, st.st_size),)
+
+    def scan(self, start=None, fields=None):
+        posts = self._read().get('posts', [])
+        for idx in range(start or 0, len(posts)):
+            yield idx, idx + 1, Post.from_dict(posts[idx])
+
+    def scan_reverse(self, before=None):
+        posts = self._read().get('posts', [])
+        stop = len(posts) if before is None else min(before, len(posts))
+        for idx in range(stop - 1, -1, -1):
+            yield idx, idx + 1, Post.from_dict(posts[idx])
+
+    def read_at(self, offset) -> Post:
+        posts = self._read().get('posts', [])
+        if not 0 <= offset < len(posts):
+            raise KeyError(offset)
+        return Post.from_dict(posts[offset])
+
+    def read_many(self, offsets) -> list:
+        posts = self._read().get('posts', [])
+        for offset in offsets:
+            if not 0 <= offset < len(posts):
+                raise KeyError(offset)
+        return [Post.from_dict(posts[offset]) for offset in offsets]
+
+    def end_offset(self) -> int:
+        return len(self._read().get('posts', []))
+
+    def count(self) -> int:
+        return self.end_offset()
+
+
+class SegmentedFeedStore(FeedStore):
+    """
+    Append-only JSON-lines log split into size-bounded segment files.
+
+    Appends only ever touch the newest ("active") segment, so they cost the
+    size of the post rather than the size of the feed. Once the active segment
+    grows past ``segment_max_bytes`` a new one is started; when
+    ``compact_after`` sealed segments have piled up they are folded into the
+    snapshot on a background thread.
+
+    Writers in any process serialize on the ``LOCK`` file in the store
+    directory; readers never lock. New lines are written in
+    ``record_format`` ("v1" JSON or "v2", see ``feed.post``).
+
+    ``rotate`` (run by ``python -m feed.archive``) keeps only recent days in
+    the snapshot; older ones live in per-day archive partitions that are
+    mapped and decompressed only when a read falls in their offset range.
+    """
+
+    def __init__(self, directory, segment_max_bytes=4 * 1024 * 1024, compact_after=8, record_format=V2):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_after = compact_after
+        self.record_format = record_format
+        os.makedirs(directory, exist_ok=True)
+        self.lock = FileLock(os.path.join(directory, 'LOCK'))
+        self._compact_lock = FileLock(os.path.join(directory, 'COMPACT.LOCK'))
+        self._compactor = None
+        self._archives = {}  # path -> ArchivePartition, opened on first read
+
+    # -- file layout -------------------------------------------------------
+
+    def sidecar_path(self, name) -> str:
+        return os.path.join(self.directory, name)
+
+    def identity(self) -> tuple:
+        identity = []
+        for name in sorted(os.listdir(self.directory)):
+            if _FILE_RE.match(name) or _ARCHIVE_RE.match(name):
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                identity.append((name, st.st_ino, st.st_mtime_ns, st.st_size))
+        return tuple(identity)
+
+    def _path(self, prefix, base):
+        return os.path.join(self.directory, f"{prefix}-{base:020d}.jsonl")
+
+    def _files(self):
+        """Return ``[(base, end, kind, path)]`` ordered by base offset."""
+        files = []
+        for name in os.listdir(self.directory):
+            match = _FILE_RE.match(name)
+            if not match:
+                match = _ARCHIVE_RE.match(name)
+                if match:
+                    files.append((int(match.group(1)), int(match.group(2)), ARCHIVE_PREFIX,
+                                  os.path.join(self.directory, name)))
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue  # removed by a concurrent compaction
+            base = int(match.group(2))
+            files.append((base, base + size, match.group(1), path))
+        # At equal bases prefer segments: they are never older than a snapshot.
+        files.sort(key=lambda f: (f[0], f[2] == SEGMENT_PREFIX))
+        return files
+
+    @staticmethod
+    def _locate(pos, files):
+        for base, end, _, path in reversed(files):
+            if base <= pos < end:
+                return base, end, path
+        return None
+
+    def _archive(self, path) -> ArchivePartition:
+        """The (cached) mapped view of an archive file; archives never change once written."""
+        archive = self._archives.get(path)
+        if archive is None:
+            if len(self._archives) >= 256:
+                self._archives.clear()  # views still in use stay mapped until released
+            archive = self._archives[path] = ArchivePartition(path)
+        return archive
+
+    @staticmethod
+    def _is_archive(path) -> bool:
+        return os.path.basename(path).startswith(ARCHIVE_PREFIX + '-')
+
+    def _active_segment(self, files):
+        """Return ``(base, end, path)`` of the segment appends go to."""
+        segments = [f for f in files if f[2] == SEGMENT_PREFIX]
+        if not segments:
+            end = max((f[1] for f in files), default=0)
+            path = self._path(SEGMENT_PREFIX, end)
+            open(path, 'ab').close()
+            return end, end, path
+        base, end, _, path = segments[-1]
+        return base, self._repair_tail(path, base, end), path
+
+    @staticmethod
+    def _repair_tail(path, base, end):
+        """Drop a torn, newline-less last line left behind by a crashed writer."""
+        if end == base:
+            return end
+        with open(path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b'\n':
+                return end
+            f.seek(0)
+            keep = f.read().rfind(b'\n') + 1
+            f.truncate(keep)
+        return base + keep
+
+    # -- reads ---------------------------------------------------------------
+
+    def start_offset(self) -> int:
+        files = self._files()
+        return files[0][0] if files else 0
+
+    def end_offset(self) -> int:
+        return max((f[1] for f in self._files()), default=0)
+
+    def _iter_lines(self, start=None):
+        pos = self.start_offset() if start is None else start
+        while True:
+            hit = self._locate(pos, self._files())
+            if hit is None:
+                return
+            base, end, path = hit
+            try:
+                if self._is_archive(path):
+                    yield from self._archive(path).lines(pos)
+                    pos = end
+                    continue
+                with open(path, 'rb') as f:
+                    f.seek(pos - base)
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            return  # a write still in flight
+                        yield pos, line
+                        pos += len(line)
+            except FileNotFoundError:
+                continue  # compacted away under us; relocate by offset
+
+    def scan(self, start=None, fields=None):
+        for pos, line in self._iter_lines(start):
+            yield pos, pos + len(line), decode_post(line, fields)
+
+    def _iter_lines_reverse(self, before=None):
+        pos = self.end_offset() if before is None else before
+        while True:
+            hit = self._locate(pos - 1, self._files())
+            if hit is None:
+                return
+            base, _, path = hit
+            try:
+                if self._is_archive(path):
+                    yield from self._archive(path).lines_reverse(pos)
+                    pos = base
+                    continue
+                with open(path, 'rb') as f:
+                    for start, line in _lines_backwards(f, pos - base):
+                        pos = base + start
+                        yield pos, line
+                    pos = base
+            except FileNotFoundError:
+                continue  # compacted away under us; relocate by offset
+
+    def scan_reverse(self, before=None):
+        """Read the log backwards block by block; cost depends on how far you go."""
+        for pos, line in self._iter_lines_reverse(before):
+            yield pos, pos + len(line), decode_post(line)
+
+    def read_at(self, offset) -> Post:
+        hit = self._locate(offset, self._files())
+        if hit is None:
+            raise KeyError(offset)
+        base, _, path = hit
+        if self._is_archive(path):
+            return decode_post(self._archive(path).line_at(offset))
+        with open(path, 'rb') as f:
+            f.seek(offset - base)
+            return decode_post(f.readline())
+
+    def read_many(self, offsets) -> list:
+        """Like ``read_at`` per offset, but lists the segments once and keeps each file open."""
+        files = self._files()
+        handles = {}
+        posts = []
+        try:
+            for offset in offsets:
+                hit = self._locate(offset, files)
+                if hit is None:
+                    raise KeyError(offset)
+                base, _, path = hit
+                if self._is_archive(path):
+                    posts.append(decode_post(self._archive(path).line_at(offset)))
+                    continue
+                f = handles.get(path)
+                try:
+                    if f is None:
+                        f = handles[path] = open(path, 'rb')
+                except FileNotFoundError:
+                    posts.append(self.read_at(offset))  # compacted away under us; relocate by offset
+                    files = self._files()
+                    continue
+                f.seek(offset - base)
+                posts.append(decode_post(f.readline()))
+        finally:
+            for f in handles.values():
+                f.close()
+        return posts
+
+    def count(self) -> int:
+        return sum(1 for _ in self._iter_lines())
+
+    # -- writes --------------------------------------------------------------
+
+    def append_many(self, posts) -> list:
+        posts = [as_post(post) for post in posts]
+        lines = [encode_post(post, self.record_format) for post in posts]
+        size = sum(len(line) for line in lines)
+        with self.lock:
+            files = self._files()
+            base, end, path = self._active_segment(files)
+            rolled = end > base and end - base + size > self.segment_max_bytes
+            if rolled:
+                path = self._path(SEGMENT_PREFIX, end)
+            offsets = []
+            pos = end
+            for line in lines:
+                offsets.append(pos)
+                pos += len(line)
+            with open(path, 'ab') as f:
+                f.write(b''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+        if rolled and self._sealed_count(files) + 1 >= self.compact_after:
+            self.compact_in_background()
+        self._notify([(offset, offset + len(line), post) for offset, line, post in zip(offsets, lines, posts)])
+        return offsets
+
+    @staticmethod
+    def _sealed_count(files):
+        return max(0, sum(1 for f in files if f[2] == SEGMENT_PREFIX) - 1)
+
+    # -- compaction ----------------------------------------------------------
+
+    def compact(self) -> bool:
+        """Fold sealed segments into the snapshot. Returns True if files changed."""
+        if not self._compact_lock.acquire(blocking=False):
+            return False  # another thread or process is already compacting
+        try:
+            return self._compact()
+        finally:
+            self._compact_lock.release()
+
+    def _compact(self) -> bool:
+        files = self._files()
+        segments = [f for f in files if f[2] == SEGMENT_PREFIX][:-1]
+        snapshots = [f for f in files if f[2] == SNAPSHOT_PREFIX]
+        snapshot = snapshots[-1] if snapshots else None
+
+        # Segments a previous, interrupted compaction already copied.
+        covered = [s for s in segments if snapshot and s[1] <= snapshot[1]]
+        sealed = [s for s in segments if s not in covered]
+        if not sealed:
+            self._remove(covered)
+            return bool(covered)
+
+        parts = sealed
+        if snapshot and snapshot[1] == sealed[0][0]:
+            parts = [snapshot] + sealed
+        target = self._path(SNAPSHOT_PREFIX, parts[0][0])
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as out:
+            for base, end, _, path in parts:
+                with open(path, 'rb') as src:
+                    _copy_exact(src, out, end - base)
+            out.flush()
+            os.fsync(out.fileno())
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            os.remove(tmp)  # e.g. the snapshot is held open on Windows
+            return False
+        self._remove([p for p in parts if p[3] != target] + covered)
+        return True
+
+    def compact_in_background(self):
+        """Start ``compact`` on a daemon thread unless one is already running."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return self._compactor
+        self._compactor = threading.Thread(target=self.compact, name="feed-compactor", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    # -- archival ------------------------------------------------------------
+
+    def partitions(self) -> list:
+        """
+        Every file of the store, oldest first, as ``{"kind", "base", "end", "path", "bytes"}``.
+
+        Archives add their ``day``, ``posts``, ``first``/``last`` epochs and
+        ``raw_bytes`` (uncompressed).
+        """
+        parts = []
+        for base, end, kind, path in self._files():
+            part = {"kind": kind, "base": base, "end": end, "path": path}
+            if kind == ARCHIVE_PREFIX:
+                part.update(self._archive(path).info())
+            else:
+                part["bytes"] = end - base
+            parts.append(part)
+        return parts
+
+    def rotate(self, archive_before: date, drop_before: date = None, dry_run=False) -> dict:
+        """
+        Move the days before ``archive_before`` out of the snapshot into archive partitions.
+
+        A day ends where the running maximum of the post timestamps crosses
+        midnight, so each partition is a contiguous offset range. Only sealed
+        data is archived; the active segment always stays hot. With
+        ``drop_before``, archived days before it are then deleted, oldest
+        first (indexes over the store must be rebuilt afterwards). Returns
+        ``{"archived": [...], "dropped": [...]}`` partition infos.
+        """
+        with self._compact_lock:
+            archived = self._archive_days(archive_before, dry_run)
+            dropped = self._drop_archives(drop_before, dry_run) if drop_before else []
+        return {"archived": archived, "dropped": dropped}
+
+    def _archive_days(self, archive_before, dry_run):
+        from feed.index import post_epoch
+        with self.lock:
+            files = self._files()
+            segments = [f for f in files if f[2] == SEGMENT_PREFIX]
+            # A quiet feed may never fill its active segment: seal it if it holds cold days
+            active = segments[-1] if segments and segments[-1][1] > segments[-1][0] else None
+            first = post_epoch(self.read_at(active[0])) if active else None
+            seal = first is not None and post_day(first) < archive_before
+            if seal and not dry_run:
+                _, end, _ = self._active_segment(files)
+                open(self._path(SEGMENT_PREFIX, end), 'ab').close()
+                files = self._files()
+        archives = [f for f in files if f[2] == ARCHIVE_PREFIX]
+        segments = [f for f in files if f[2] == SEGMENT_PREFIX]
+        cold = [f for f in files if f[2] == SNAPSHOT_PREFIX] + (segments if seal and dry_run else segments[:-1])
+        if not cold:
+            return []
+        start = archives[-1][1] if archives else min(f[0] for f in cold)
+        limit = max(f[1] for f in cold)
+
+        directory = None if dry_run else self.directory
+        done, writer, day, stop = [], None, None, start
+        try:
+            for pos, line in self._iter_lines(start):
+                if pos >= limit:
+                    break
+                epoch = post_epoch(decode_post(line, _ROTATE_FIELDS))
+                if epoch is not None:
+                    day = post_day(epoch) if day is None else max(day, post_day(epoch))
+                if day is not None and day >= archive_before:
+                    break
+                if writer is not None and writer.day not in (None, day):
+                    writer.finish()
+                    done.append(writer)
+                    writer = None
+                if writer is None:
+                    writer = PartitionWriter(directory, pos, day)
+                writer.day = writer.day or day
+                writer.add(line, epoch)
+                stop = pos + len(line)
+            if writer is not None:
+                writer.finish()
+                done.append(writer)
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        if dry_run or not done:
+            return [writer.info() for writer in done]
+
+        # The archives now serve [start, stop); keep the rest of the cold data as the snapshot
+        if stop < limit:
+            target = self._path(SNAPSHOT_PREFIX, stop)
+            tmp = target + '.tmp'
+            with open(tmp, 'wb') as out:
+                pos = stop
+                while pos < limit:
+                    base, end, path = self._locate(pos, cold)
+                    with open(path, 'rb') as src:
+                        src.seek(pos - base)
+                        _copy_exact(src, out, min(end, limit) - pos)
+                    pos = min(end, limit)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, target)
+            cold = [f for f in cold if f[3] != target]
+        self._remove(cold)
+        return [writer.info() for writer in done]
+
+    def _drop_archives(self, drop_before, dry_run):
+        dropped = []
+        for base, end, kind, path in self._files():
+            if kind != ARCHIVE_PREFIX:
+                break
+            archive = self._archive(path)
+            if archive.day is not None and archive.day >= drop_before:
+                break
+            dropped.append(archive.info())
+            if not dry_run:
+                os.remove(path)
+                self._archives.pop(path, None)
+        return dropped
+
+    def verify(self) -> list:
+        """
+        Problems found checking the store (an empty list if none).
+
+        The files must cover the offsets from ``start_offset`` to
+        ``end_offset`` without gaps, every archive must decompress, match its
+        checksum and file name, and every hot record must decode.
+        """
+        problems = []
+        files = self._files()
+        covered = None
+        hot_start = None
+        for base, end, kind, path in files:
+            if covered is not None and base > covered:
+                problems.append(f"no file holds offsets {covered}-{base}")
+            covered = end if covered is None else max(covered, end)
+            if kind != ARCHIVE_PREFIX:
+                hot_start = base if hot_start is None else hot_start
+                continue
+            try:
+                archive = self._archive(path)
+            except ArchiveError as e:
+                problems.append(str(e))
+                continue
+            if (archive.base, archive.end) != (base, end):
+                problems.append(f"{path}: footer covers {archive.base}-{archive.end}")
+            problems.extend(archive.verify())
+        if hot_start is not None:
+            start = max([f[1] for f in files if f[2] == ARCHIVE_PREFIX] + [hot_start])
+            for pos, line in self._iter_lines(start):
+                try:
+                    decode_post(line)
+                except ValueError as e:
+                    problems.append(f"offset {pos}: {e}")
+        return problems
+
+    # -- rewrite -------------------------------------------------------------
+
+    def rewrite(self, transform, dry_run=False):
+        """
+        Replace the hot (unarchived) posts with what ``transform`` makes of them.
+
+        ``transform`` gets an iterator of ``(offset, line)`` over the hot
+        posts and yields the record lines to keep; they are written as one
+        snapshot from the same start offset. Unlike compaction this moves
+        offsets, so every index over the store must be rebuilt afterwards.
+        Appends, compactions and rotations wait until it is done. The
+        replaced files are moved into a ``rewrite-<end offset>`` directory,
+        whose path is returned (``None`` if there were no hot posts). With
+        ``dry_run`` the lines are only counted; nothing changes.
+        """
+        with self._compact_lock, self.lock:
+            files = self._files()
+            _, end, _ = self._active_segment(files)
+            files = self._files()
+            hot = [f for f in files if f[2] != ARCHIVE_PREFIX]
+            start = max([f[1] for f in files if f[2] == ARCHIVE_PREFIX] + [hot[0][0]])
+            if start >= end:
+                return None
+            if dry_run:
+                for _ in transform((pos, line) for pos, line in self._iter_lines(start) if pos < end):
+                    pass
+                return None
+            target = self._path(SNAPSHOT_PREFIX, start)
+            tmp = target + '.tmp'
+            try:
+                with open(tmp, 'wb') as out:
+                    lines = ((pos, line) for pos, line in self._iter_lines(start) if pos < end)
+                    for line in transform(lines):
+                        out.write(line)
+                    out.flush()
+                    os.fsync(out.fileno())
+            except BaseException:
+                os.remove(tmp)
+                raise
+            backup = os.path.join(self.directory, f"rewrite-{end:020d}")
+            os.makedirs(backup, exist_ok=True)
+            for _, _, _, path in hot:
+                os.replace(path, os.path.join(backup, os.path.basename(path)))
+            if os.path.getsize(tmp):
+                os.replace(tmp, target)
+            else:
+                os.remove(tmp)
+        return backup
+
+    @staticmethod
+    def _remove(files):
+        for _, _, _, path in files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # still open by a reader; the next compaction retries
+
+
+def _lines_backwards(f, end, block_size=64 * 1024):
+    """
+    Yield ``(start, line)`` for the complete lines of ``f[:end]``, last first.
+
+    A torn, newline-less tail is skipped. Only one block plus the line being
+    assembled is held in memory at a time.
+    """
+    pos = end
+    buf = b''
+    torn_tail = True
+    while pos > 0:
+        size = min(block_size, pos)
+        pos -= size
+        f.seek(pos)
+        buf = f.read(size) + buf
+        if torn_tail:
+            cut = buf.rfind(b'\n')
+            if cut < 0:
+                buf = b''
+                continue
+            buf = buf[:cut + 1]
+            torn_tail = False
+        stop = len(buf)
+        while True:
+            nl = buf.rfind(b'\n', 0, stop - 1)
+            if nl < 0:
+                break
+            yield pos + nl + 1, buf[nl + 1:stop]
+            stop = nl + 1
+        buf = buf[:stop]
+    if buf:
+        yield 0, buf
+
+
+def _copy_exact(src, dst, length):
+    """Copy exactly ``length`` bytes, ignoring anything appended meanwhile."""
+    while length > 0:
+        chunk = src.read(min(length, 1024 * 1024))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def migrate_json_feed(json_path, store) -> int:
+    """Copy the posts of a legacy ``feed.json`` into an empty store once."""
+    if not store.is_empty():
+        return 0
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            posts = json.load(f).get('posts', [])
+    except FileNotFoundError:
+        return 0
+    if posts:
+        store.append_many(posts)
+    return len(posts)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_feed_store(directory=None) -> FeedStore:
+    """
+    Return the process-wide store selected by ``config.settings``.
+
+    Passing ``directory`` opens a separate segmented feed there instead (e.g.
+    one per squad), with the same segment and compaction settings.
+    """
+    from config.settings import (FEED_BACKEND, FEED_PATH, FEED_STORE_DIR, FEED_SEGMENT_MAX_BYTES,
+                                 FEED_COMPACT_SEGMENTS, FEED_RECORD_FORMAT)
+    backend = FEED_BACKEND if directory is None else "segments"
+    directory = directory or FEED_STORE_DIR
+    key = (backend, directory)
+    with _stores_lock:
+        if key not in _stores:
+            if backend == "json":
+                _stores[key] = JsonFeedStore(FEED_PATH)
+            elif backend == "segments":
+                fresh = not os.path.isdir(directory)
+                store = SegmentedFeedStore(directory, FEED_SEGMENT_MAX_BYTES, FEED_COMPACT_SEGMENTS,
+                                           FEED_RECORD_FORMAT)
+                if fresh and directory == FEED_STORE_DIR:
+                    migrate_json_feed(FEED_PATH, store)
+                _stores[key] = store
+            else:
+                raise ValueError(f"Unknown FEED_BACKEND: {backend!r}")
+            _attach_sidecars(_stores[key])
+        return _stores[key]
+
+
+def _attach_sidecars(store):
+    """Keep the persisted sidecars and in-memory digest of ``store`` current on every append."""
+    from feed.index import get_feed_index
+    from feed.digest import get_feed_digest
+    from feed.stats import get_feed_stats
+    from feed.search import get_search_index
+    from config.settings import FEED_DEDUP_POLICY
+    store.add_listener(get_feed_index(store).on_append)
+    store.add_listener(get_feed_digest(store).on_append)
+    store.add_listener(get_feed_stats(store).on_append)
+    store.add_listener(get_search_index(store).on_append)
+    if FEED_DEDUP_POLICY != "off":
+        from feed.dedup import get_dedup_index
+        store.add_listener(get_dedup_index(store).on_append)
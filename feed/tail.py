@@ -0,0 +1,42 @@
+"""
+Tail-following reader: returns only the posts appended since the last poll.
+"""
+import time
+
+
+class FeedTail:
+    """
+    Remembers the offset it has read up to and parses only what follows it.
+
+    A poll costs one directory listing plus reading the new posts, however
+    large the feed already is. By default the tail starts at the current end
+    of the feed, i.e. it only reports posts appended after it was created.
+    """
+
+    def __init__(self, store, offset=None):
+        self.store = store
+        self.offset = store.end_offset() if offset is None else offset
+
+    def poll(self, limit=None) -> list:
+        """Return up to ``limit`` new ``(offset, post)`` pairs, oldest first."""
+        start = self.store.start_offset()
+        if self.offset < start:
+            self.offset = start  # older posts were archived or dropped
+        if self.store.end_offset() <= self.offset:
+            return []
+        new = []
+        for offset, next_offset, post in self.store.scan(self.offset):
+            new.append((offset, post))
+            self.offset = next_offset
+            if limit is not None and len(new) >= limit:
+                break
+        return new
+
+    def follow(self, interval=1.0, stop=None):
+        """Yield ``(offset, post)`` pairs forever (or until ``stop()`` is true), like ``tail -f``."""
+        while stop is None or not stop():
+            new = self.poll()
+            for entry in new:
+                yield entry
+            if not new:
+                time.sleep(interval)
@@ -0,0 +1,232 @@
+"""
+Group-commit writer for the feed.
+
+Every post submitted within one commit window is written to the store in a
+single ``append_many`` call, i.e. one write and one fsync for the whole batch,
+instead of one per post. The writer owns an asyncio event loop on a background
+thread so it can be fed from synchronous tool calls and from coroutines alike.
+"""
+import asyncio
+import atexit
+import threading
+import time
+from collections import deque
+
+from feed.dedup import DuplicatePost
+from feed.post import as_post
+
+
+class FeedWriter:
+    """
+    Single writer that drains an asyncio queue of posts into a ``FeedStore``.
+
+    ``window`` is how long (seconds) to keep collecting after the first post of
+    a batch arrives; ``max_batch`` caps the number of posts per commit.
+    ``dedup`` (a ``DedupIndex``) screens each batch for near-duplicates first.
+    """
+
+    def __init__(self, store, window=0.005, max_batch=512, history=1024, dedup=None):
+        self.store = store
+        self.dedup = dedup
+        self.window = window
+        self.max_batch = max_batch
+        self.batch_sizes = deque(maxlen=history)
+        self.commit_latencies = deque(maxlen=history)
+        self.total_batches = 0
+        self.total_posts = 0
+        self.total_duplicates = 0
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self):
+        """Start the writer thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._thread_main, name="feed-writer", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Flush everything already submitted and stop the writer thread."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            # Queued the way ``submit`` queues posts, so it lands behind every post already submitted
+            asyncio.run_coroutine_threadsafe(self._queue.put(None), self._loop)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+
+    # -- submission ----------------------------------------------------------
+
+    def submit(self, post: dict):
+        """Queue ``post`` from any thread; returns a future resolving to its offset."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._enqueue(post), self._loop)
+
+    def write(self, post: dict, timeout=None) -> int:
+        """
+        Queue ``post`` and block until its batch is durable.
+
+        Raises ``DuplicatePost`` if the dedup policy kept it out of the feed.
+        """
+        return self.submit(post).result(timeout)
+
+    async def write_async(self, post: dict) -> int:
+        """Awaitable ``write`` for coroutines running on any event loop."""
+        return await asyncio.wrap_future(self.submit(post))
+
+    async def write_many_async(self, posts) -> list:
+        """
+        Queue ``posts`` back to back, so they land in this order, and await them all.
+
+        Posts the dedup policy kept out come back as their ``DuplicatePost``
+        instead of an offset.
+        """
+        futures = [self.submit(post) for post in posts]
+        results = []
+        for future in futures:
+            try:
+                results.append(await asyncio.wrap_future(future))
+            except DuplicatePost as e:
+                results.append(e)
+        return results
+
+    async def _enqueue(self, post):
+        done = self._loop.create_future()
+        await self._queue.put((post, done))
+        return await done
+
+    # -- commit loop ---------------------------------------------------------
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - self._loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit(batch)
+        while not self._queue.empty():  # submitted after stop()
+            item = self._queue.get_nowait()
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("feed writer stopped"))
+        # Let the ``submit`` futures of the last batch receive their results before the loop closes
+        await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not asyncio.current_task()),
+                             return_exceptions=True)
+
+    async def _commit(self, batch):
+        posts = [post for post, _ in batch]
+        started = time.perf_counter()
+        try:
+            # The fsync blocks, so keep it off the loop that is collecting the next batch.
+            results = await self._loop.run_in_executor(None, self._append, posts)
+        except Exception as e:
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(e)
+            return
+        stored = sum(1 for result in results if not isinstance(result, DuplicatePost))
+        self.commit_latencies.append(time.perf_counter() - started)
+        self.batch_sizes.append(stored)
+        self.total_batches += 1
+        self.total_posts += stored
+        for (_, done), result in zip(batch, results):
+            if isinstance(result, DuplicatePost):
+                self.total_duplicates += 1
+                if not done.done():
+                    done.set_exception(result)
+            elif not done.done():
+                done.set_result(result)
+
+    def _append(self, posts) -> list:
+        """Store ``posts`` (screened by ``dedup``); returns an offset or ``DuplicatePost`` per post."""
+        if self.dedup is None:
+            return self.store.append_many(posts)
+        posts = [as_post(post) for post in posts]
+        results = []
+        while posts:
+            # Each round stores a prefix; a post echoing an earlier one of the batch waits for the next
+            outcomes = self.dedup.screen(posts)
+            stored = [post for post, outcome in zip(posts, outcomes) if outcome is None]
+            offsets = iter(self.store.append_many(stored) if stored else ())
+            results.extend(next(offsets) if outcome is None else outcome for outcome in outcomes)
+            posts = posts[len(outcomes):]
+        return results
+
+    # -- reporting -----------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Batch size and commit latency summary over the recent history."""
+        sizes = sorted(self.batch_sizes)
+        latencies = sorted(self.commit_latencies)
+        return {
+            "batches": self.total_batches,
+            "posts": self.total_posts,
+            "avg_batch": round(self.total_posts / self.total_batches, 2) if self.total_batches else 0.0,
+            "max_batch": sizes[-1] if sizes else 0,
+            "duplicates": self.total_duplicates,
+            "commit_p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+            "commit_p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        }
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_feed_writer(store=None) -> FeedWriter:
+    """Return the process-wide writer for ``store`` (default: ``get_feed_store()``)."""
+    from config.settings import FEED_COMMIT_WINDOW_MS, FEED_MAX_BATCH, FEED_DEDUP_POLICY
+    if store is None:
+        from feed.store import get_feed_store
+        store = get_feed_store()
+    with _writers_lock:
+        if id(store) not in _writers:
+            dedup = None
+            if FEED_DEDUP_POLICY != "off":
+                from feed.dedup import get_dedup_index
+                dedup = get_dedup_index(store)
+            writer = FeedWriter(store, FEED_COMMIT_WINDOW_MS / 1000, FEED_MAX_BATCH, dedup=dedup)
+            atexit.register(writer.stop)
+            _writers[id(store)] = writer
+        return _writers[id(store)]
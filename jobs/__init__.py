@@ -0,0 +1,3 @@
+from jobs.runner import Job, JobRunner, DuplicateJobError, get_job_runner
+
+__all__ = ["Job", "JobRunner", "DuplicateJobError", "get_job_runner"]
@@ -0,0 +1,237 @@
+"""
+Background job runner for work started from the UI.
+
+A Streamlit script thread must not block on a multi-agent workflow: the page
+freezes, a rerun interrupts it and every session would run its own copy. The
+``JobRunner`` owns an asyncio event loop on a background thread (like the
+feed writer) and runs submitted coroutines there, at most ``workers`` at a
+time; the rest wait in FIFO order. Sessions only submit, poll and cancel.
+
+A job is identified by its kind and parameters. Submitting a job while an
+identical one is still queued or running raises ``DuplicateJobError``, so two
+users clicking "Run" at once get one workflow, not two writing the same feed.
+"""
+import asyncio
+import atexit
+import hashlib
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class DuplicateJobError(RuntimeError):
+    """An identical job is already queued or running; ``job`` is that job."""
+
+    def __init__(self, job):
+        super().__init__(f"Job {job.id} ({job.kind}) is already {job.status}")
+        self.job = job
+
+
+def job_key(kind, params) -> str:
+    blob = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
+class Job:
+    """
+    One unit of background work and its observable state.
+
+    The job coroutine reports through ``update`` (progress 0..1, a status
+    message) and ``details`` (free-form, e.g. per-agent drafts); readers on
+    other threads take a consistent copy with ``snapshot``.
+    """
+
+    def __init__(self, job_id, kind, params):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.key = job_key(kind, params)
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.details = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._task = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATES
+
+    def update(self, progress=None, message=None, **details):
+        with self._lock:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            if message is not None:
+                self.message = message
+            self.details.update(details)
+
+    def _finish(self, status, message, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.message = message
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            if status == SUCCEEDED:
+                self.progress = 1.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id, "kind": self.kind, "params": dict(self.params), "status": self.status,
+                "progress": self.progress, "message": self.message, "details": dict(self.details),
+                "result": self.result, "error": self.error, "created_at": self.created_at,
+                "started_at": self.started_at, "finished_at": self.finished_at,
+            }
+
+
+class JobRunner:
+    """
+    Runs job coroutines on a background event loop, ``workers`` at a time.
+
+    ``history`` finished jobs are kept for the UI to show; older ones are
+    forgotten.
+    """
+
+    def __init__(self, workers=1, history=50):
+        self.workers = workers
+        self.history = history
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._slots = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self):
+        """Start the runner thread (idempotent)."""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._thread_main, name="job-runner", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Cancel every active job and stop the runner thread."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            for job in self.jobs(active_only=True):
+                self.cancel(job.id)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    # -- submission ----------------------------------------------------------
+
+    def submit(self, kind, fn, **params) -> Job:
+        """
+        Queue ``fn(job, **params)`` (a coroutine function) and return its ``Job``.
+
+        Raises ``DuplicateJobError`` if a job of the same ``kind`` and
+        ``params`` is still queued or running.
+        """
+        self.start()
+        with self._lock:
+            key = job_key(kind, params)
+            for job in self._jobs.values():
+                if job.key == key and job.active:
+                    raise DuplicateJobError(job)
+            job = Job(next(self._ids), kind, params)
+            self._jobs[job.id] = job
+            self._forget_finished()
+        # Create the task on the runner's loop; it waits there for a worker slot.
+        ready = threading.Event()
+
+        def schedule():
+            job._task = self._loop.create_task(self._run(job, fn))
+            ready.set()
+        self._loop.call_soon_threadsafe(schedule)
+        ready.wait()
+        return job
+
+    async def _run(self, job, fn):
+        try:
+            async with self._slots:
+                with job._lock:
+                    job.status = RUNNING
+                    job.message = "Starting"
+                    job.started_at = time.time()
+                result = await fn(job, **job.params)
+        except asyncio.CancelledError:
+            job._finish(CANCELLED, "Cancelled")
+        except Exception as e:
+            job._finish(FAILED, f"Failed: {e}", error=repr(e))
+        else:
+            job._finish(SUCCEEDED, "Done", result=result)
+
+    def cancel(self, job_id) -> bool:
+        """Request cancellation; returns False if the job is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None or not job.active or job._task is None:
+            return False
+        self._loop.call_soon_threadsafe(job._task.cancel)
+        return True
+
+    # -- inspection ----------------------------------------------------------
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, active_only=False) -> list:
+        """Known jobs, oldest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if job.active] if active_only else jobs
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide runner, shared by every Streamlit session."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            from config.settings import JOB_WORKERS, JOB_HISTORY
+            _runner = JobRunner(JOB_WORKERS, JOB_HISTORY)
+            atexit.register(_runner.stop)
+        return _runner
@@ -0,0 +1,91 @@
+"""
+The multi-agent workflow as a background job (see ``jobs.runner``).
+"""
+import asyncio
+import json
+
+DEFAULT_UI_MISSION = "Create engaging social media posts. Each agent posts once, then say WORKFLOW_COMPLETE."
+
+
+def _draft_text(arguments):
+    """Post text from a (possibly partial) ``post_to_site`` arguments JSON string."""
+    try:
+        return json.loads(arguments).get("text", "")
+    except (json.JSONDecodeError, AttributeError):
+        return arguments
+
+
+async def agent_workflow(job, mission=DEFAULT_UI_MISSION, max_turns=9):
+    """
+    Run one squad on the site feed, built like the CLI's (``main.build_team``:
+    ``TEAM_MODE``, ``AGENT_CONTEXT_POLICY``).
+
+    Reports progress by turns and, in ``job.details["drafts"]``, each agent's
+    streamed text (or the post it is about to make) until its turn ends.
+    """
+    from autogen_agentchat.messages import (BaseChatMessage, ModelClientStreamingChunkEvent,
+                                            ToolCallExecutionEvent, ToolCallRequestEvent)
+    from autogen_core import CancellationToken
+    from config.settings import RUN_METRICS_PATH, TEAM_CYCLES
+    from agents import get_agent_registry
+    from main import build_team
+    from telemetry import RunRecorder, new_run_id, open_trace, write_prometheus
+
+    job.update(0.05, "Setting up AI agents...")
+    # The runner's loop lives as long as the process, so the client, its
+    # connection pool and the agents carry over from one job to the next
+    registry = get_agent_registry()
+    client = registry.client()
+    run_id = new_run_id()
+    trace = open_trace(run_id)
+    recorder = RunRecorder(run_id, trace)
+    squad, participants = build_team(None, client, max_messages=max_turns, cycles=TEAM_CYCLES, recorder=recorder)
+    names = [agent.name for agent in participants]
+    # A fan-out team runs a fixed number of cycles instead of stopping at max_turns
+    total_turns = TEAM_CYCLES * len(names) if hasattr(squad, 'cycles') else max_turns
+
+    drafts = {name: "" for name in names}
+    counts = {"turns": 0, "posts": 0}
+    token = CancellationToken()
+
+    async def consume():
+        async for event in squad.run_stream(task=mission, cancellation_token=token):
+            recorder.observe(event)
+            source = getattr(event, 'source', None)
+            if source not in drafts:
+                continue
+            if isinstance(event, ModelClientStreamingChunkEvent):
+                drafts[source] += event.content
+            elif isinstance(event, ToolCallRequestEvent):
+                drafts[source] = "\n\n".join(
+                    _draft_text(call.arguments) for call in event.content if call.name == "post_to_site")
+            elif isinstance(event, ToolCallExecutionEvent):
+                counts["posts"] += sum(1 for r in event.content if r.name == "post_to_site" and not r.is_error)
+            elif isinstance(event, BaseChatMessage):
+                drafts[source] = ""
+                counts["turns"] += 1
+                job.update(0.1 + 0.9 * min(1.0, counts["turns"] / total_turns),
+                           f"{source} answered ({counts['turns']}/{total_turns} turns)")
+            job.update(drafts=dict(drafts), posts=counts["posts"])
+
+    job.update(0.1, "Agents are generating content...", drafts=dict(drafts), run_id=run_id, posts=0)
+    run = asyncio.create_task(consume())
+    try:
+        # Shielded: a cancelled run_stream can hang shutting its runtime down,
+        # so on cancel the token stops the in-flight calls and the job ends
+        # without waiting for that cleanup.
+        await asyncio.shield(run)
+    except asyncio.CancelledError:
+        token.cancel()
+        run.cancel()
+        raise
+    finally:
+        if run.done():
+            await registry.release(participants)
+        else:
+            # A cancelled run may still be unwinding; its agents are dropped, not reused
+            registry.discard(participants)
+        recorder.close()
+        trace.close()
+        write_prometheus(RUN_METRICS_PATH, recorder.turns)
+    return {"run_id": run_id, **counts}
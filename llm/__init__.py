@@ -0,0 +1,33 @@
+"""
+Model clients and their wrappers (cache, scheduler, bounded contexts).
+
+Exports are resolved on first access (PEP 562): most of them subclass
+autogen types, and importing autogen dominates the startup of anything that
+only needs, say, ``CACHE_MODES``.
+"""
+import importlib
+
+_EXPORTS = {
+    "ChatCompletionClientWrapper": "llm.wrapper",
+    "CachedChatCompletionClient": "llm.cache", "CacheMissError": "llm.cache", "CACHE_MODES": "llm.modes",
+    "ModelScheduler": "llm.ratelimit", "RateLimitedChatCompletionClient": "llm.ratelimit",
+    "TokenBucket": "llm.ratelimit", "get_model_scheduler": "llm.ratelimit",
+    "create_model_client": "llm.client",
+    "FakeChatCompletionClient": "llm.fake",
+    "CONTEXT_POLICIES": "llm.modes", "WindowContext": "llm.context", "TokenBudgetContext": "llm.context",
+    "RollingSummaryContext": "llm.context", "create_model_context": "llm.context",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
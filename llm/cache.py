@@ -0,0 +1,182 @@
+"""
+Disk-backed cache of model responses with record / replay / pass-through modes.
+
+A request is keyed on a SHA-256 of everything that determines the answer:
+model, messages (system message included), tools, tool choice, JSON mode and
+extra create args. Responses are stored one JSON file per key and evicted
+least-recently-used once the directory grows past ``max_bytes``.
+
+Modes:
+    off     - pass-through, the cache is neither read nor written
+    record  - serve hits from disk, call the model on misses and store them
+    replay  - strict: serve hits only and raise ``CacheMissError`` otherwise,
+              so a recorded workflow reruns offline and deterministically
+"""
+import hashlib
+import json
+import os
+import threading
+
+from autogen_core.models import CreateResult
+
+from llm.modes import CACHE_MODES
+from llm.wrapper import ChatCompletionClientWrapper
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _jsonable(value):
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    if isinstance(value, type) and hasattr(value, 'model_json_schema'):
+        return value.model_json_schema()
+    if hasattr(value, 'schema'):
+        return value.schema  # autogen Tool
+    return str(value)
+
+
+def request_key(model, messages, tools=(), tool_choice="auto", json_output=None, extra_create_args=None) -> str:
+    """Stable hash of a chat completion request."""
+    payload = {
+        "model": model,
+        "messages": [_jsonable(m) for m in messages],
+        "tools": [_jsonable(t) if not isinstance(t, dict) else t for t in tools],
+        "tool_choice": tool_choice if isinstance(tool_choice, str) else _jsonable(tool_choice),
+        "json_output": json_output if json_output is None or isinstance(json_output, bool) else _jsonable(json_output),
+        "extra_create_args": extra_create_args or {},
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResponseStore:
+    """One JSON file per key under ``directory``, LRU-evicted by file mtime."""
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def _load_sizes(self):
+        if self._sizes is None:
+            self._sizes = {}
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    if name.endswith('.json'):
+                        self._sizes[name[:-5]] = os.path.getsize(os.path.join(root, name))
+        return self._sizes
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        encoded = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"  # unique per writer, so os.replace is atomic
+        with open(tmp, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp, path)
+        with self._lock:
+            sizes = self._load_sizes()
+            sizes[key] = len(encoded)
+            if sum(sizes.values()) > self.max_bytes:
+                self._evict(sizes)
+
+    def _evict(self, sizes):
+        """Drop least recently used entries until 90% of the budget is free."""
+        entries = []
+        for key in sizes:
+            try:
+                entries.append((os.path.getmtime(self._path(key)), key))
+            except FileNotFoundError:
+                entries.append((0, key))
+        total = sum(sizes.values())
+        for _, key in sorted(entries):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            total -= sizes.pop(key)
+
+
+class CachedChatCompletionClient(ChatCompletionClientWrapper):
+    """Wraps a model client with a ``ResponseStore`` according to ``mode``."""
+
+    def __init__(self, inner, cache_dir, mode="record", max_bytes=256 * 1024 * 1024, model=None):
+        super().__init__(inner)
+        self.model = model or inner.model_info.get('family', '')
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}; expected one of {CACHE_MODES}")
+        self.mode = mode
+        self.store = ResponseStore(cache_dir, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, messages, tools, tool_choice, json_output, extra_create_args):
+        return request_key(self.model, messages, tools, tool_choice, json_output, extra_create_args)
+
+    def _lookup(self, key):
+        if self.mode == "off":
+            return None
+        data = self.store.get(key)
+        if data is not None:
+            self.hits += 1
+            result = CreateResult.model_validate(data)
+            result.cached = True
+            return result
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"No recorded response for request {key[:12]}… (LLM cache is in replay mode)")
+        return None
+
+    def _record(self, key, result):
+        if self.mode == "record" and isinstance(result, CreateResult):
+            self.store.put(key, result.model_dump(mode='json'))
+
+    async def create(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                     extra_create_args={}, cancellation_token=None):
+        key = self._key(messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        result = await super().create(messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+                                      extra_create_args=extra_create_args, cancellation_token=cancellation_token)
+        self._record(key, result)
+        return result
+
+    async def create_stream(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                            extra_create_args={}, cancellation_token=None):
+        key = self._key(messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._lookup(key)
+        if cached is not None:
+            if isinstance(cached.content, str) and cached.content:
+                yield cached.content
+            yield cached
+            return
+        async for chunk in super().create_stream(messages, tools=tools, tool_choice=tool_choice,
+                                                 json_output=json_output, extra_create_args=extra_create_args,
+                                                 cancellation_token=cancellation_token):
+            self._record(key, chunk)
+            yield chunk
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
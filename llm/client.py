@@ -0,0 +1,38 @@
+"""
+Builds the model client used by the agents, wrapped as configured.
+"""
+from llm.cache import CachedChatCompletionClient
+from llm.ratelimit import RateLimitedChatCompletionClient, get_model_scheduler
+
+
+def create_model_client(cache_mode=None, provider=None):
+    """
+    Return the chat client, behind the shared request scheduler and the
+    response cache unless they are off.
+
+    ``provider`` overrides ``LLM_PROVIDER`` ("openai", or "fake" for the local
+    stand-in) and ``cache_mode`` overrides ``LLM_CACHE_MODE`` ("off",
+    "record" or "replay").
+    """
+    from config.settings import (api_key, model_name, LLM_PROVIDER, LLM_FAKE_LATENCY_MS, LLM_SCHEDULER,
+                                 LLM_CACHE_MODE, LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES)
+
+    provider = provider or LLM_PROVIDER
+    scheduled = LLM_SCHEDULER == "on"
+    if provider == "fake":
+        from llm.fake import FakeChatCompletionClient
+        client = FakeChatCompletionClient(latency=LLM_FAKE_LATENCY_MS / 1000)
+    elif provider == "openai":
+        from autogen_ext.models.openai import OpenAIChatCompletionClient
+        # With the scheduler on, it owns retries; the SDK's own would bypass the rate limits
+        extra = {"max_retries": 0} if scheduled else {}
+        client = OpenAIChatCompletionClient(model=model_name, api_key=api_key, **extra)
+    else:
+        raise ValueError(f"Unknown LLM_PROVIDER: {provider!r}")
+    if scheduled:
+        client = RateLimitedChatCompletionClient(client, get_model_scheduler())
+    # The cache sits outside the scheduler so hits never spend rate-limit budget
+    mode = cache_mode or LLM_CACHE_MODE
+    if mode != "off":
+        client = CachedChatCompletionClient(client, LLM_CACHE_DIR, mode, LLM_CACHE_MAX_BYTES, model=model_name)
+    return client
@@ -0,0 +1,167 @@
+"""
+Bounded model contexts for the agents.
+
+By default an ``AssistantAgent`` resends the whole group-chat history on every
+call, so prompt tokens grow with each turn. These contexts keep the first
+message (the mission) plus a bounded tail of recent messages:
+
+    full     - unbounded, autogen's default
+    window   - the last ``window`` messages
+    tokens   - as many recent messages as fit in ``max_tokens`` (estimated)
+    summary  - the last ``window`` messages, with older ones folded into a
+               rolling extractive summary of at most ``summary_chars``
+
+A tail never starts with a tool result whose tool call was cut off, which
+the OpenAI API would reject. Token counts are estimated once per message
+and the summary is extended incrementally, so ``get_messages`` stays linear
+in the size of the tail, not of the history.
+"""
+import json
+
+from autogen_core.model_context import ChatCompletionContext, UnboundedChatCompletionContext
+from autogen_core.models import FunctionExecutionResultMessage, UserMessage
+
+from llm.modes import CONTEXT_POLICIES
+
+
+def approx_tokens(text) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def message_text(message) -> str:
+    content = getattr(message, 'content', '')
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=lambda c: getattr(c, 'model_dump', lambda: str(c))(), ensure_ascii=False)
+
+
+def _trim_tail(messages):
+    while messages and isinstance(messages[0], FunctionExecutionResultMessage):
+        messages = messages[1:]
+    return messages
+
+
+class _BoundedContext(ChatCompletionContext):
+    """Keeps the first ``head`` messages and lets subclasses pick the tail."""
+
+    def __init__(self, head=1, initial_messages=None):
+        super().__init__(initial_messages)
+        self.head = head
+
+    async def get_messages(self):
+        head = self._messages[:self.head]
+        return head + self._tail(self.head)
+
+    def _tail(self, start):
+        raise NotImplementedError
+
+
+class WindowContext(_BoundedContext):
+    """The mission plus the last ``window`` messages."""
+
+    def __init__(self, window=12, head=1, initial_messages=None):
+        super().__init__(head, initial_messages)
+        self.window = window
+
+    def _tail(self, start):
+        return _trim_tail(self._messages[max(start, len(self._messages) - self.window):])
+
+
+class TokenBudgetContext(_BoundedContext):
+    """The mission plus as many recent messages as fit in ``max_tokens``."""
+
+    def __init__(self, max_tokens=2000, head=1, initial_messages=None):
+        super().__init__(head, initial_messages)
+        self.max_tokens = max_tokens
+        self._tokens = []
+
+    def _sync_tokens(self):
+        if len(self._tokens) > len(self._messages):
+            self._tokens = []
+        for message in self._messages[len(self._tokens):]:
+            self._tokens.append(approx_tokens(message_text(message)))
+
+    def _tail(self, start):
+        self._sync_tokens()
+        budget = self.max_tokens - sum(self._tokens[:start])
+        first = len(self._messages)
+        # Always keep the newest message, even if it alone is over budget
+        while first > start and (first == len(self._messages) or self._tokens[first - 1] <= budget):
+            first -= 1
+            budget -= self._tokens[first]
+        return _trim_tail(self._messages[first:])
+
+    async def clear(self):
+        await super().clear()
+        self._tokens = []
+
+    async def load_state(self, state):
+        await super().load_state(state)
+        self._tokens = []
+
+
+class RollingSummaryContext(_BoundedContext):
+    """
+    The mission, a summary of older messages and the last ``window`` messages.
+
+    The summary is extractive (one clipped line per folded message, oldest
+    lines dropped beyond ``summary_chars``) so it costs no model calls.
+    """
+
+    def __init__(self, window=8, summary_chars=1200, line_chars=160, head=1, initial_messages=None):
+        super().__init__(head, initial_messages)
+        self.window = window
+        self.summary_chars = summary_chars
+        self.line_chars = line_chars
+        self._lines = []
+        self._folded = 0
+
+    def _fold(self, upto):
+        if self._folded > upto:
+            self._lines, self._folded = [], 0
+        for message in self._messages[max(self.head, self._folded):upto]:
+            text = ' '.join(message_text(message).split())
+            source = getattr(message, 'source', None) or type(message).__name__.replace('Message', '')
+            self._lines.append(f"- {source}: {text[:self.line_chars]}")
+        self._folded = max(self._folded, upto)
+        while len(self._lines) > 1 and sum(len(line) + 1 for line in self._lines) > self.summary_chars:
+            self._lines.pop(0)
+
+    def _tail(self, start):
+        split = max(start, len(self._messages) - self.window)
+        self._fold(split)
+        tail = _trim_tail(self._messages[split:])
+        if not self._lines:
+            return tail
+        summary = UserMessage(content="Summary of earlier messages:\n" + '\n'.join(self._lines), source="summary")
+        return [summary] + tail
+
+    async def clear(self):
+        await super().clear()
+        self._lines, self._folded = [], 0
+
+    async def load_state(self, state):
+        await super().load_state(state)
+        self._lines, self._folded = [], 0
+
+
+def create_model_context(policy=None):
+    """
+    Return a fresh model context for one agent (contexts hold state, never share one).
+
+    ``policy`` overrides ``AGENT_CONTEXT_POLICY``; sizes come from settings.
+    """
+    from config.settings import (AGENT_CONTEXT_POLICY, AGENT_CONTEXT_WINDOW, AGENT_CONTEXT_MAX_TOKENS,
+                                 AGENT_CONTEXT_SUMMARY_CHARS)
+
+    policy = policy or AGENT_CONTEXT_POLICY
+    if policy == "full":
+        return UnboundedChatCompletionContext()
+    if policy == "window":
+        return WindowContext(AGENT_CONTEXT_WINDOW)
+    if policy == "tokens":
+        return TokenBudgetContext(AGENT_CONTEXT_MAX_TOKENS)
+    if policy == "summary":
+        return RollingSummaryContext(AGENT_CONTEXT_WINDOW, AGENT_CONTEXT_SUMMARY_CHARS)
+    raise ValueError(f"Unknown AGENT_CONTEXT_POLICY {policy!r}; expected one of {CONTEXT_POLICIES}")
@@ -0,0 +1,172 @@
+"""
+Local stand-in for the OpenAI chat client, for benchmarks and offline runs.
+
+``FakeChatCompletionClient`` never touches the network. Each call sleeps for
+a configurable latency and answers with a ``post_to_site`` tool call (or an
+occasional ``read_site_feed`` call), so the real agents, tools and team
+orchestration run unchanged while the model's cost is fixed and known.
+"""
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+from collections import deque
+
+from autogen_core import FunctionCall
+from autogen_core.models import ChatCompletionClient, CreateResult, RequestUsage
+
+from llm.context import approx_tokens, message_text
+
+FAKE_MODEL_INFO = {
+    "vision": False,
+    "function_calling": True,
+    "json_output": False,
+    "family": "fake",
+    "structured_output": False,
+}
+
+_ROLE_RE = re.compile(r'ROLE:\s*([^\n(]+)')
+_WORDS = ("agents", "feed", "signal", "loop", "token", "prompt", "context", "latency", "squad", "post")
+
+
+class FakeRateLimitError(RuntimeError):
+    """What the fake endpoint raises over its limit; shaped like ``openai.RateLimitError``."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests (fake endpoint)")
+        self.retry_after = retry_after
+
+
+class FakeChatCompletionClient(ChatCompletionClient):
+    """
+    Deterministic fake model client.
+
+    latency:           seconds slept per call (plus up to ``jitter`` extra)
+    response_chars:    length of the generated post text
+    completion_tokens: reported completion tokens per call (default: estimated)
+    read_every:        every Nth call reads the feed instead of posting (0 = never)
+    stream_chunks:     number of chunks ``create_stream`` splits text into
+    stream_delay:      seconds between streamed chunks (``latency`` is then the time to the first one)
+    rpm_limit:         reject calls beyond this many per ``rate_window`` seconds with a 429 (0 = no limit)
+    error_rate:        probability of a spurious 429 on any call
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, response_chars=200, completion_tokens=None,
+                 read_every=0, stream_chunks=8, stream_delay=0.0, rpm_limit=0, rate_window=60.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.response_chars = response_chars
+        self.completion_tokens = completion_tokens
+        self.read_every = read_every
+        self.stream_chunks = stream_chunks
+        self.stream_delay = stream_delay
+        self.rpm_limit = rpm_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.calls = 0
+        self.rejected = 0
+        self._accepted = deque()
+        self.model_seconds = 0.0
+        self._random = random.Random(seed)
+        self._ids = itertools.count()
+        self._last_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+        self._total_usage = RequestUsage(prompt_tokens=0, completion_tokens=0)
+
+    def _author(self, messages) -> str:
+        for message in messages:
+            if type(message).__name__ == 'SystemMessage':
+                match = _ROLE_RE.search(message.content)
+                if match:
+                    return match.group(1).strip()
+        return "FakeAgent"
+
+    def _text(self) -> str:
+        words = []
+        while sum(len(w) + 1 for w in words) < self.response_chars:
+            words.append(self._random.choice(_WORDS))
+        return ' '.join(words)[:self.response_chars]
+
+    def _admit(self):
+        """Server-side view of the limit: a rolling window of accepted calls."""
+        now = time.monotonic()
+        while self._accepted and self._accepted[0] <= now - self.rate_window:
+            self._accepted.popleft()
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.rejected += 1
+            raise FakeRateLimitError()
+        if self.rpm_limit and len(self._accepted) >= self.rpm_limit:
+            self.rejected += 1
+            raise FakeRateLimitError(retry_after=self._accepted[0] + self.rate_window - now)
+        self._accepted.append(now)
+
+    async def _respond(self, messages, tools):
+        self._admit()
+        self.calls += 1
+        delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        self.model_seconds += delay
+
+        tool_names = {getattr(t, 'name', None) or t.get('name') for t in tools}
+        if self.read_every and self.calls % self.read_every == 0 and "read_site_feed" in tool_names:
+            content = [FunctionCall(id=f"call_{next(self._ids)}", name="read_site_feed", arguments="{}")]
+            text = ""
+        elif "post_to_site" in tool_names:
+            text = self._text()
+            arguments = json.dumps({"author": self._author(messages), "text": text})
+            content = [FunctionCall(id=f"call_{next(self._ids)}", name="post_to_site", arguments=arguments)]
+        else:
+            text = self._text() + " POST_COMPLETE"
+            content = text
+
+        prompt_tokens = sum(approx_tokens(message_text(m)) for m in messages)
+        completion_tokens = self.completion_tokens or approx_tokens(text or "{}")
+        usage = RequestUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self._last_usage = usage
+        self._total_usage = RequestUsage(prompt_tokens=self._total_usage.prompt_tokens + prompt_tokens,
+                                         completion_tokens=self._total_usage.completion_tokens + completion_tokens)
+        finish_reason = "stop" if isinstance(content, str) else "function_calls"
+        return CreateResult(finish_reason=finish_reason, content=content, usage=usage, cached=False)
+
+    async def create(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                     extra_create_args={}, cancellation_token=None):
+        return await self._respond(messages, tools)
+
+    async def create_stream(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                            extra_create_args={}, cancellation_token=None):
+        result = await self._respond(messages, tools)
+        if isinstance(result.content, str):
+            size = max(1, len(result.content) // self.stream_chunks)
+            for i in range(0, len(result.content), size):
+                if i and self.stream_delay:
+                    await asyncio.sleep(self.stream_delay)
+                    self.model_seconds += self.stream_delay
+                yield result.content[i:i + size]
+        yield result
+
+    async def close(self):
+        pass
+
+    def actual_usage(self):
+        return self._last_usage
+
+    def total_usage(self):
+        return self._total_usage
+
+    def count_tokens(self, messages, *, tools=[]):
+        return sum(approx_tokens(message_text(m)) for m in messages)
+
+    def remaining_tokens(self, messages, *, tools=[]):
+        return 128000 - self.count_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):
+        return FAKE_MODEL_INFO
+
+    @property
+    def model_info(self):
+        return FAKE_MODEL_INFO
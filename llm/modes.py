@@ -0,0 +1,9 @@
+"""
+Names of the configurable modes, importable without autogen (e.g. for CLI choices).
+"""
+
+# LLM_CACHE_MODE, see llm.cache
+CACHE_MODES = ("off", "record", "replay")
+
+# AGENT_CONTEXT_POLICY, see llm.context
+CONTEXT_POLICIES = ("full", "window", "tokens", "summary")
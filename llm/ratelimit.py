@@ -0,0 +1,313 @@
+"""
+Client-side rate limiting and adaptive concurrency for model calls.
+
+One ``ModelScheduler`` is shared by every agent in the process. Before a
+request goes out it must:
+
+    1. reach the head of the wait queue - requests from turns already in
+       progress (the conversation has replies in it) go ahead of the first
+       call of a new run, FIFO within a priority;
+    2. get a concurrency slot - the limit adapts to observed latency, growing
+       by one slot per window of fast responses and shrinking when latency
+       climbs past ``latency_tolerance`` x the best seen, and halving on 429;
+    3. take one request from the requests-per-minute bucket and its estimated
+       tokens from the tokens-per-minute bucket (corrected with the actual
+       usage once the response arrives).
+
+Rate-limit (429), overload (5xx) and connection errors are retried up to
+``max_retries`` times with full-jitter exponential backoff, honouring a
+``Retry-After`` header when the server sends one.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+import weakref
+
+from autogen_core.models import CreateResult, SystemMessage
+
+from llm.context import approx_tokens, message_text
+from llm.wrapper import ChatCompletionClientWrapper
+
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW_RUN = 1
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+RETRYABLE_ERRORS = frozenset({"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError"})
+
+
+class TokenBucket:
+    """Continuously refilling bucket of ``per_minute`` units, holding at most ``burst``."""
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount) -> float:
+        """Seconds until ``amount`` units are available (requests above capacity wait for a full bucket)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= amount  # may go negative; later requests wait for the debt to refill
+
+    def drain(self):
+        """Empty the bucket, e.g. after the server said we are over its limit."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+def is_retryable(error) -> bool:
+    status = getattr(error, 'status_code', None)
+    return status in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after(error):
+    """Seconds from the error's ``Retry-After`` header (or attribute), if any."""
+    value = getattr(error, 'retry_after', None)
+    response = getattr(error, 'response', None)
+    if value is None and response is not None:
+        value = getattr(response, 'headers', {}).get('retry-after')
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _LoopQueue:
+    """Wait queue and in-flight count of one event loop."""
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.heap = []
+        self.in_flight = 0
+
+
+class ModelScheduler:
+    """Process-wide admission control for model requests; see the module docstring."""
+
+    def __init__(self, rpm=0, tpm=0, max_concurrency=16, min_concurrency=1, max_retries=6,
+                 retry_base=0.5, retry_max=30.0, latency_tolerance=2.0, completion_estimate=256, rpm_burst=None):
+        self.rpm = TokenBucket(rpm, rpm_burst) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.latency_tolerance = latency_tolerance
+        self.completion_estimate = completion_estimate
+        self.limit = float(max(min_concurrency, min(max_concurrency, 4)))
+        self.best_latency = None
+        self.avg_latency = None
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+        self._buckets_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._loops = weakref.WeakKeyDictionary()  # event loop -> _LoopQueue
+        self._loops_lock = threading.Lock()
+
+    # -- admission -----------------------------------------------------------
+
+    def _bind(self) -> _LoopQueue:
+        """
+        The running event loop's queue state.
+
+        asyncio primitives belong to one loop, so each loop sharing the
+        scheduler (the job runner's, a squad's ``asyncio.run``) queues and
+        counts its own slots against ``limit``; the buckets and latency stats
+        are shared by all of them.
+        """
+        loop = asyncio.get_running_loop()
+        with self._loops_lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = _LoopQueue()
+            return state
+
+    def _bucket_delay(self, tokens) -> float:
+        with self._buckets_lock:
+            delays = [0.0]
+            if self.rpm is not None:
+                delays.append(self.rpm.delay(1))
+            if self.tpm is not None:
+                delays.append(self.tpm.delay(tokens))
+            if max(delays) <= 0:
+                if self.rpm is not None:
+                    self.rpm.take(1)
+                if self.tpm is not None:
+                    self.tpm.take(tokens)
+            return max(delays)
+
+    async def acquire(self, priority, tokens):
+        """Wait for this request's turn, a concurrency slot and budget in both buckets."""
+        state = self._bind()
+        condition = state.condition
+        entry = [priority, next(self._seq)]
+        started = time.monotonic()
+        async with condition:
+            heapq.heappush(state.heap, entry)
+            try:
+                while True:
+                    if state.heap[0] is entry and state.in_flight < int(self.limit):
+                        delay = self._bucket_delay(tokens)
+                        if delay <= 0:
+                            break
+                        try:
+                            await asyncio.wait_for(condition.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await condition.wait()
+            except BaseException:
+                state.heap.remove(entry)
+                heapq.heapify(state.heap)
+                condition.notify_all()
+                raise
+            heapq.heappop(state.heap)
+            state.in_flight += 1
+            condition.notify_all()
+        self.wait_seconds += time.monotonic() - started
+
+    async def release(self):
+        state = self._bind()
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+
+    # -- feedback ------------------------------------------------------------
+
+    def record_success(self, latency, estimated_tokens, usage=None):
+        self.requests += 1
+        if usage is not None and self.tpm is not None:
+            with self._buckets_lock:
+                self.tpm.take(usage.prompt_tokens + usage.completion_tokens - estimated_tokens)
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+        # Latencies under 50ms are treated alike so jitter on fast paths doesn't shrink the limit
+        if self.avg_latency > max(self.best_latency, 0.05) * self.latency_tolerance:
+            self.limit = max(self.min_concurrency, self.limit * 0.9)
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def record_failure(self, error, attempt) -> float:
+        """Adapt to a retryable error and return how long to back off before the next attempt."""
+        self.retries += 1
+        if getattr(error, 'status_code', None) == 429 or type(error).__name__ == "RateLimitError":
+            self.rate_limited += 1
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            with self._buckets_lock:
+                for bucket in (self.rpm, self.tpm):
+                    if bucket is not None:
+                        bucket.drain()
+        backoff = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+        return max(backoff, retry_after(error) or 0.0)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "concurrency": int(self.limit),
+            "avg_latency_ms": round((self.avg_latency or 0.0) * 1000, 1),
+            "wait_s": round(self.wait_seconds, 3),
+        }
+
+
+def request_priority(messages) -> int:
+    """In-progress turns (anything beyond system prompt + task) outrank new runs."""
+    conversation = [m for m in messages if not isinstance(m, SystemMessage)]
+    return PRIORITY_IN_PROGRESS if len(conversation) > 1 else PRIORITY_NEW_RUN
+
+
+class RateLimitedChatCompletionClient(ChatCompletionClientWrapper):
+    """Sends every request through ``scheduler`` and retries retryable failures."""
+
+    def __init__(self, inner, scheduler):
+        super().__init__(inner)
+        self.scheduler = scheduler
+
+    def _estimate(self, messages) -> int:
+        return sum(approx_tokens(message_text(m)) for m in messages) + self.scheduler.completion_estimate
+
+    async def create(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                     extra_create_args={}, cancellation_token=None):
+        priority, estimate = request_priority(messages), self._estimate(messages)
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority, estimate)
+            started = time.monotonic()
+            try:
+                result = await super().create(messages, tools=tools, tool_choice=tool_choice,
+                                              json_output=json_output, extra_create_args=extra_create_args,
+                                              cancellation_token=cancellation_token)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.scheduler.max_retries:
+                    raise
+                backoff = self.scheduler.record_failure(e, attempt)
+            else:
+                self.scheduler.record_success(time.monotonic() - started, estimate, result.usage)
+                return result
+            finally:
+                await self.scheduler.release()
+            attempt += 1
+            priority = PRIORITY_IN_PROGRESS  # a retry has already waited its turn once
+            await asyncio.sleep(backoff)
+
+    async def create_stream(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                            extra_create_args={}, cancellation_token=None):
+        priority, estimate = request_priority(messages), self._estimate(messages)
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority, estimate)
+            started = time.monotonic()
+            streamed = False
+            try:
+                async for chunk in super().create_stream(messages, tools=tools, tool_choice=tool_choice,
+                                                         json_output=json_output,
+                                                         extra_create_args=extra_create_args,
+                                                         cancellation_token=cancellation_token):
+                    streamed = True
+                    if isinstance(chunk, CreateResult):
+                        self.scheduler.record_success(time.monotonic() - started, estimate, chunk.usage)
+                    yield chunk
+            except Exception as e:
+                # Once chunks went out a retry would duplicate them
+                if streamed or not is_retryable(e) or attempt >= self.scheduler.max_retries:
+                    raise
+                backoff = self.scheduler.record_failure(e, attempt)
+            else:
+                return
+            finally:
+                await self.scheduler.release()
+            attempt += 1
+            priority = PRIORITY_IN_PROGRESS
+            await asyncio.sleep(backoff)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_model_scheduler() -> ModelScheduler:
+    """Return the process-wide scheduler configured from settings."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from config.settings import (LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_MIN_CONCURRENCY,
+                                         LLM_MAX_RETRIES, LLM_RETRY_BASE_MS, LLM_RETRY_MAX_MS)
+            _scheduler = ModelScheduler(LLM_RPM, LLM_TPM, LLM_MAX_CONCURRENCY, LLM_MIN_CONCURRENCY,
+                                        LLM_MAX_RETRIES, LLM_RETRY_BASE_MS / 1000, LLM_RETRY_MAX_MS / 1000)
+        return _scheduler
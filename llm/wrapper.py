@@ -0,0 +1,56 @@
+"""
+Base class for model clients that wrap another ``ChatCompletionClient``.
+"""
+from autogen_core.models import ChatCompletionClient
+
+
+class ChatCompletionClientWrapper(ChatCompletionClient):
+    """
+    Delegates every ``ChatCompletionClient`` method to ``inner``.
+
+    Subclasses override ``create`` / ``create_stream`` (or anything else) to
+    add behaviour such as caching or instrumentation, and can be stacked.
+    """
+
+    def __init__(self, inner: ChatCompletionClient):
+        self.inner = inner
+
+    async def create(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                     extra_create_args={}, cancellation_token=None):
+        return await self.inner.create(messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+                                       extra_create_args=extra_create_args, cancellation_token=cancellation_token)
+
+    def create_stream(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                      extra_create_args={}, cancellation_token=None):
+        return self.inner.create_stream(messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+                                        extra_create_args=extra_create_args, cancellation_token=cancellation_token)
+
+    async def close(self):
+        await self.inner.close()
+
+    def actual_usage(self):
+        return self.inner.actual_usage()
+
+    def total_usage(self):
+        return self.inner.total_usage()
+
+    def count_tokens(self, messages, *, tools=[]):
+        return self.inner.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages, *, tools=[]):
+        return self.inner.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    @property
+    def model_info(self):
+        return self.inner.model_info
+
+    def unwrap(self) -> ChatCompletionClient:
+        """Return the innermost, non-wrapper client."""
+        client = self.inner
+        while isinstance(client, ChatCompletionClientWrapper):
+            client = client.inner
+        return client
@@ -1,77 +1,289 @@
+import argparse
 import asyncio
 import os
-from autogen_agentchat.teams import RoundRobinGroupChat
-from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_core.tools import FunctionTool
+import time
 
-from config.settings import api_key, model_name
+from config.settings import (FEED_STORE_DIR, RUN_METRICS_PATH, LLM_SCHEDULER, TEAM_MODE, TEAM_CYCLES,
+                             FEED_DEDUP_POLICY)
 # noinspection PyUnresolvedReferences
-from agents import TrendSetterAgent, NewsBreakerAgent, LogicQAAgent
-from agents.tools import post_to_site, read_site_feed
+from agents import TrendSetterAgent, NewsBreakerAgent, LogicQAAgent, get_agent_registry
+from feed import get_feed_store, get_feed_writer
+from llm.modes import CACHE_MODES, CONTEXT_POLICIES
+# autogen, the model clients and the recorder are imported where they are used,
+# so `main.py --help` and importers of the build helpers start fast
 
+DEFAULT_MISSION = """
+You are a team of AI social agents collaborating to create an engaging social feed.
 
-async def main():
-    print(f"\n{'=' * 80}\n🤖 AI SOCIAL AGENT BOT: Automated Social Feed Generation\n{'=' * 80}")
+Each agent should take ONE action per turn using the post_to_site tool.
+After completing 3 full cycles (each agent posting 3 times), say "TERMINATE".
+    """
 
-    # 1. Infrastructure Setup
-    os.makedirs("site", exist_ok=True)
 
-    # 2. Setup OpenAI Client
-    client = OpenAIChatCompletionClient(model=model_name, api_key=api_key)
+SQUAD_AGENTS = (TrendSetterAgent, NewsBreakerAgent, LogicQAAgent)
+# LogicQA rebuts the other two; their posts don't depend on each other
+SQUAD_DEPENDENCIES = {"LogicQA": ["TrendSetter", "NewsBreaker"]}
+TEAM_MODES = ("roundrobin", "fanout")
 
-    # 3. Create Function Tools
-    print("🛠️  Equipping agents with tools...")
-    post_tool = FunctionTool(
-        post_to_site,
-        name="post_to_site",
-        description="Post a message to the social feed. Args: author (str), text (str)"
-    )
-    read_tool = FunctionTool(
-        read_site_feed,
-        name="read_site_feed",
-        description="Read all posts from the social feed"
-    )
 
-    # 4. Build Agents (with tools)
-    trendsetter = TrendSetterAgent(client, tool_bench=[post_tool, read_tool]).build()
-    newsbreaker = NewsBreakerAgent(client, tool_bench=[post_tool, read_tool]).build()
-    logicqa = LogicQAAgent(client, tool_bench=[post_tool, read_tool]).build()
+def _build_agents(client, store=None, tools=None, recorder=None, context_policy=None, staged=False):
+    """
+    Lease the squad's agents from the agent registry.
+
+    Without ``tools`` each agent gets its spec's tools on ``store``, shared
+    across runs; ``staged`` makes them post to a staging list instead. With a
+    ``recorder`` each agent gets its own instrumented client and tools so model
+    and tool time is attributed to the agent that spent it.
+    ``context_policy`` overrides ``AGENT_CONTEXT_POLICY`` for every agent.
+    """
+    registry = get_agent_registry()
+    return [registry.acquire(agent_cls.spec.name, client, store, recorder, context_policy,
+                             staged=staged, tools=tools)
+            for agent_cls in SQUAD_AGENTS]
+
 
-    # 5. Form Squad
-    squad = RoundRobinGroupChat(
-        participants=[trendsetter, newsbreaker, logicqa],
-        termination_condition=TextMentionTermination("WORKFLOW_COMPLETE") | MaxMessageTermination(30)
+def _round_robin(participants, max_messages):
+    from autogen_agentchat.teams import RoundRobinGroupChat
+    from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
+    # Only agents can end the run: a mission may itself mention WORKFLOW_COMPLETE
+    names = [agent.name for agent in participants]
+    return RoundRobinGroupChat(
+        participants=participants,
+        termination_condition=(TextMentionTermination("WORKFLOW_COMPLETE", sources=names)
+                               | MaxMessageTermination(max_messages))
     )
 
-    # 6. Mission Trigger
-    mission = """
-You are a team of AI social agents collaborating to create an engaging social feed.
 
-Each agent should take ONE action per turn using the post_to_site tool.
-After completing 3 full cycles (each agent posting 3 times), say "TERMINATE".
+def build_squad(client, tools=None, max_messages=30, recorder=None, context_policy=None, store=None):
+    """Build the TrendSetter → NewsBreaker → LogicQA round-robin squad."""
+    return _round_robin(_build_agents(client, store, tools, recorder, context_policy), max_messages)
+
+
+def build_fanout_squad(client, store=None, cycles=3, recorder=None, context_policy=None):
+    """
+    Build the squad as a ``FanOutTeam``: TrendSetter and NewsBreaker generate
+    concurrently, LogicQA once both have answered; posts land in squad order.
+    """
+    from agents.team import FanOutTeam
+    registry = get_agent_registry()
+    participants = _build_agents(client, store, None, recorder, context_policy, staged=True)
+    staged = {agent.name: registry.staged_posts(agent) for agent in participants}
+    return FanOutTeam(participants, SQUAD_DEPENDENCIES, staged, get_feed_writer(store), cycles)
+
+
+def build_team(mode, client, store=None, max_messages=30, cycles=3, recorder=None, context_policy=None):
+    """
+    The squad for ``mode`` ("roundrobin" or "fanout", default ``TEAM_MODE``)
+    posting to ``store``, as ``(team, participants)``.
+
+    ``participants`` are the agents leased for it; hand them back with
+    ``AgentRegistry.release`` once the run is over.
     """
+    mode = mode or TEAM_MODE
+    if mode == "fanout":
+        team = build_fanout_squad(client, store, cycles, recorder, context_policy)
+        return team, list(team.participants.values())
+    if mode == "roundrobin":
+        participants = _build_agents(client, store, None, recorder, context_policy)
+        return _round_robin(participants, max_messages), participants
+    raise ValueError(f"Unknown TEAM_MODE {mode!r}; expected one of {TEAM_MODES}")
+
+
+async def main(cache_mode=None, provider=None, context_policy=None, team=None, cycles=TEAM_CYCLES, max_messages=30):
+    from autogen_agentchat.messages import BaseChatMessage, ModelClientStreamingChunkEvent
+    from telemetry import RunRecorder, new_run_id, open_trace, format_summary, write_prometheus
+
+    print(f"\n{'=' * 80}\n🤖 AI SOCIAL AGENT BOT: Automated Social Feed Generation\n{'=' * 80}")
+
+    # 1. Infrastructure Setup
+    os.makedirs("site", exist_ok=True)
+
+    # 2. Setup OpenAI Client (behind the response cache when LLM_CACHE_MODE is on)
+    registry = get_agent_registry()
+    client = registry.client(cache_mode, provider)
+
+    # 3. Create Function Tools, 4. Build Agents and 5. Form Squad, instrumented per agent
+    print("🛠️  Equipping agents with tools...")
+    run_id = new_run_id()
+    trace = open_trace(run_id)
+    recorder = RunRecorder(run_id, trace)
+    squad, participants = build_team(team, client, max_messages=max_messages, cycles=cycles, recorder=recorder,
+                                     context_policy=context_policy)
+
+    # 6. Mission Trigger
+    mission = DEFAULT_MISSION
     print(f"🎯 MISSION: {mission}\n")
 
     # 7. Execution Loop
     print("🔄 Starting agent workflow...\n")
-    async for event in squad.run_stream(task=mission):
-        if hasattr(event, 'source') and hasattr(event, 'content'):
-            content = str(event.content)
+    streaming = None  # agent whose tokens are being printed
+    try:
+        async for event in squad.run_stream(task=mission):
+            recorder.observe(event)
+            if isinstance(event, ModelClientStreamingChunkEvent):
+                if streaming != event.source:
+                    streaming = event.source
+                    print(f"\n👤 [{event.source.upper()}]\n{'-' * 20}")
+                print(event.content, end='', flush=True)
+                continue
+            if streaming is not None and getattr(event, 'source', None) == streaming and isinstance(event, BaseChatMessage):
+                # Already printed token by token; just finish the line
+                streaming = None
+                print()
+                if "COMPLETE" in event.to_text().upper():
+                    print(f"\n✅ HANDOFF: {event.source.upper()} is done.")
+                continue
+            if hasattr(event, 'source') and hasattr(event, 'content'):
+                streaming = None
+                content = str(event.content)
+
+                # Hide raw tool output to keep console clean
+                if isinstance(event.content, list):
+                    content = "[Social Feed Post Action Completed]"
+                elif content is None:
+                    content = ""
+
+                print(f"\n👤 [{event.source.upper()}]\n{'-' * 20}\n{content.strip()[:800]}")
+
+                if "COMPLETE" in str(content).upper():
+                    print(f"\n✅ HANDOFF: {event.source.upper()} is done.")
+        await registry.release(participants)
+    finally:
+        recorder.close()
+        trace.close()
+        # Closes the pooled model clients this loop opened
+        await registry.close()
+    write_prometheus(RUN_METRICS_PATH, recorder.turns)
+    print(f"\n📊 RUN STATS ({run_id})\n{format_summary(recorder.turns)}")
+    print(f"   Trace: {trace.path}\n   Metrics: {RUN_METRICS_PATH}")
+
+    stats = get_feed_writer().stats()
+    print(f"\n📦 Feed writes: {stats['posts']} posts in {stats['batches']} commits "
+          f"(avg batch {stats['avg_batch']}, commit p50 {stats['commit_p50_ms']}ms / p95 {stats['commit_p95_ms']}ms)")
+    if stats['duplicates']:
+        print(f"   Near-duplicates kept out: {stats['duplicates']} (FEED_DEDUP_POLICY={FEED_DEDUP_POLICY})")
+
+    print(f"\n{'=' * 80}\n✨ WORKFLOW FINISHED! Run 'python view_feed.py' or 'streamlit run site/app.py'\n{'=' * 80}")
+
+
+def load_missions(path):
+    """One mission per non-empty line; falls back to the default mission."""
+    if not path:
+        return [DEFAULT_MISSION]
+    with open(path, 'r', encoding='utf-8') as f:
+        missions = [line.strip() for line in f if line.strip()]
+    return missions or [DEFAULT_MISSION]
+
+
+def squad_feed_dir(squad_id):
+    return os.path.join(os.path.dirname(FEED_STORE_DIR), 'squad_feeds', f'squad-{squad_id:03d}')
+
+
+async def run_squad(squad_id, mission, client, semaphore, args, recorder):
+    """Run one squad once the semaphore admits it; returns its turn/post counts."""
+    from autogen_agentchat.messages import BaseChatMessage, ToolCallExecutionEvent
+    from agents.tools import POSTED
+    async with semaphore:
+        store = get_feed_store(squad_feed_dir(squad_id)) if args.feed_per_squad else None
+        squad, participants = build_team(args.team, client, store, args.max_messages, args.cycles, recorder,
+                                         args.context_policy)
+        turns = posts = 0
+        started = time.perf_counter()
+        try:
+            async for event in squad.run_stream(task=mission):
+                recorder.observe(event)
+                if getattr(event, 'source', 'user') == 'user':
+                    continue
+                if isinstance(event, BaseChatMessage):
+                    turns += 1
+                elif isinstance(event, ToolCallExecutionEvent):
+                    # A near-duplicate the dedup policy kept out still returns normally, with a "Not posted" reply
+                    posts += sum(1 for r in event.content if r.name == "post_to_site" and not r.is_error
+                                 and r.content.startswith(POSTED))
+        except Exception as e:
+            print(f"❌ Squad {squad_id:03d} failed: {e}")
+        # Squads still waiting on the semaphore pick these agents up instead of building their own
+        await get_agent_registry().release(participants)
+        recorder.close()
+        elapsed = time.perf_counter() - started
+        print(f"✅ Squad {squad_id:03d}: {posts} posts, {turns} turns in {elapsed:.1f}s")
+        return {"turns": turns, "posts": posts, "seconds": elapsed}
+
+
+async def run_squads(args):
+    """Run many squads concurrently on one event loop with one shared model client."""
+    from llm import get_model_scheduler
+    from telemetry import RunRecorder, new_run_id, open_trace, format_summary, write_prometheus
+    print(f"\n{'=' * 80}\n🤖 AI SOCIAL AGENT BOT: {args.squads} squads, concurrency {args.concurrency}\n{'=' * 80}")
+    missions = load_missions(args.missions)
+    # One client means one HTTP connection pool shared by every squad.
+    registry = get_agent_registry()
+    client = registry.client(args.llm_cache, args.llm_provider)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    run_id = new_run_id()
+    trace = open_trace(run_id)
+    recorders = [RunRecorder(run_id, trace, squad=i) for i in range(args.squads)]
 
-            # Hide raw tool output to keep console clean
-            if isinstance(event.content, list):
-                content = "[Social Feed Post Action Completed]"
-            elif content is None:
-                content = ""
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*[
+            run_squad(i, missions[i % len(missions)], client, semaphore, args, recorders[i])
+            for i in range(args.squads)
+        ])
+    finally:
+        await registry.close()
+        trace.close()
+    elapsed = time.perf_counter() - started
+    turn_records = [turn for recorder in recorders for turn in recorder.turns]
+    write_prometheus(RUN_METRICS_PATH, turn_records)
 
-            print(f"\n👤 [{event.source.upper()}]\n{'-' * 20}\n{content.strip()[:800]}")
+    posts = sum(r["posts"] for r in results)
+    turns = sum(r["turns"] for r in results)
+    print(f"\n{'=' * 80}\n📈 THROUGHPUT: {args.squads} squads in {elapsed:.1f}s")
+    print(f"   Posts: {posts} ({posts / elapsed:.2f} posts/sec)")
+    print(f"   Turns: {turns} ({turns / elapsed:.2f} turns/sec)")
+    reuse = registry.stats()
+    print(f"   Agents: {reuse['agents_built']} built, {reuse['agents_reused']} reused")
+    if LLM_SCHEDULER == "on":
+        sched = get_model_scheduler().stats()
+        print(f"   Model requests: {sched['requests']} ({sched['retries']} retries, {sched['rate_limited']} rate-limited, "
+              f"concurrency {sched['concurrency']}, queued {sched['wait_s']:.1f}s)")
+    if args.feed_per_squad:
+        print(f"   Feeds: {os.path.dirname(squad_feed_dir(0))}")
+    print(f"\n📊 RUN STATS ({run_id})\n{format_summary(turn_records)}")
+    print(f"   Trace: {trace.path}\n   Metrics: {RUN_METRICS_PATH}")
+    print('=' * 80)
 
-            if "COMPLETE" in str(content).upper():
-                print(f"\n✅ HANDOFF: {event.source.upper()} is done.")
 
-    print(f"\n{'=' * 80}\n✨ WORKFLOW FINISHED! Check site/feed.json and run 'streamlit run site/app.py'\n{'=' * 80}")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AI social agent squad(s).")
+    parser.add_argument("--squads", type=int, default=1, help="number of squads to run (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="max squads running at once (default: all)")
+    parser.add_argument("--missions", metavar="FILE", help="file with one mission per line, cycled across squads")
+    parser.add_argument("--max-messages", type=int, default=30, help="message cap per squad (default: 30)")
+    parser.add_argument("--feed-per-squad", action="store_true",
+                        help="give every squad its own feed under site/squad_feeds/")
+    parser.add_argument("--llm-cache", choices=CACHE_MODES,
+                        help="model response cache mode (default: LLM_CACHE_MODE from the environment)")
+    parser.add_argument("--llm-provider", choices=("openai", "fake"),
+                        help="model backend; 'fake' runs offline (default: LLM_PROVIDER from the environment)")
+    parser.add_argument("--context-policy", choices=CONTEXT_POLICIES,
+                        help="model context kept per agent (default: AGENT_CONTEXT_POLICY from the environment)")
+    parser.add_argument("--team", choices=TEAM_MODES,
+                        help="roundrobin = one agent at a time; fanout = independent agents concurrently "
+                             "(default: TEAM_MODE from the environment)")
+    parser.add_argument("--cycles", type=int, default=TEAM_CYCLES,
+                        help=f"rounds per squad in fanout mode (default: {TEAM_CYCLES})")
+    args = parser.parse_args(argv)
+    args.concurrency = max(1, args.concurrency or args.squads)
+    return args
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli_args = parse_args()
+    if cli_args.squads == 1 and not cli_args.missions and not cli_args.feed_per_squad:
+        asyncio.run(main(cli_args.llm_cache, cli_args.llm_provider, cli_args.context_policy,
+                         cli_args.team, cli_args.cycles, cli_args.max_messages))
+    else:
+        asyncio.run(run_squads(cli_args))
@@ -1,15 +1,21 @@
 import streamlit as st
+import hashlib
+import html
 import json
 import os
 import sys
 from datetime import datetime
 import random
-import asyncio
+import itertools
+import time
 
 # Add parent directory to path to import config
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 # noinspection PyUnresolvedReferences
-from config.settings import FEED_PATH, api_key, model_name
+from config.settings import FEED_RENDER_MODE
+from feed import get_feed_store, get_feed_index, get_feed_cache, get_feed_stats, get_search_index
+# noinspection PyUnresolvedReferences
+from feed.tail import FeedTail
 
 # Agent Profiles with avatars and bios
 AGENT_PROFILES = {
@@ -108,15 +114,88 @@ def get_agent_profile(author_name):
         "color": "#95A5A6"
     }
 
-def load_feed():
-    """Load feed with error handling"""
+# Posts fetched per page / per "Load more" click
+PAGE_SIZE = 20
+# Ranked posts shown for a search
+SEARCH_RESULTS = 30
+# Seconds between polls of the feed tail in live mode
+LIVE_REFRESH_SECONDS = 2
+# How often a running workflow's progress and drafts are redrawn
+JOB_REFRESH_SECONDS = 0.5
+# Rendered post cards kept for reuse across reruns and sessions
+FRAGMENT_CACHE_SIZE = 4096
+
+def load_feed(cursor=None, limit=PAGE_SIZE, author=None):
+    """
+    Load up to ``limit`` posts older than ``cursor``, newest first.
+
+    Only the requested window is read from disk, and pages are cached across
+    sessions until the feed files change. Returns ``posts`` with their
+    ``offsets`` and the ``next_cursor`` to pass back in for the following
+    page (None once the oldest post has been reached).
+    """
+    store = get_feed_store()
+    return get_feed_cache().get_or_load(store, ("page", cursor, limit, author),
+                                        lambda: _read_feed_page(store, cursor, limit, author))
+
+def _read_feed_page(store, cursor, limit, author):
+    """Read one page of posts from disk (see ``load_feed``)"""
     try:
-        with open(FEED_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if author is None:
+            window = itertools.islice(store.scan_reverse(cursor), limit + 1)
+            entries = [(offset, post) for offset, _, post in window]
+        else:
+            index = get_feed_index(store)
+            offsets = index.by_author(author, limit + 1, before=cursor)
+            entries = list(zip(offsets, index.read(offsets)))
     except FileNotFoundError:
-        return {"posts": []}
+        entries = []
     except json.JSONDecodeError:
-        return {"posts": []}
+        entries = []
+
+    next_cursor = entries[limit - 1][0] if len(entries) > limit else None
+    entries = entries[:limit]
+    return {
+        "posts": [post for _, post in entries],
+        "offsets": [offset for offset, _ in entries],
+        "next_cursor": next_cursor
+    }
+
+def reset_paging(cursor=None):
+    """Start the timeline over from ``cursor`` (default: the newest post) with one page loaded"""
+    st.session_state.feed_cursor = cursor
+    st.session_state.feed_pages = 1
+    st.session_state.feed_more = []
+    st.session_state.feed_more_from = None
+    st.session_state.feed_more_next = None
+
+def older_posts(page, author):
+    """
+    ``(offset, post)`` rows for the ``feed_pages - 1`` pages loaded below the first ``page``.
+
+    Rows loaded with "Load more" are kept in the session, so a click reads
+    only the next page, from the cursor where the last one ended. Posts
+    pushed off the first page by newer ones since are read back in between.
+    """
+    state = st.session_state
+    start = page["next_cursor"]
+    rows = [row for row in state.feed_more if start is not None and row[0] < start]
+    if rows and start > state.feed_more_from:
+        gap, cursor = [], start
+        while cursor is not None and cursor > state.feed_more_from:
+            chunk = load_feed(cursor, PAGE_SIZE, author)
+            gap += [row for row in zip(chunk["offsets"], chunk["posts"]) if row[0] >= state.feed_more_from]
+            cursor = chunk["next_cursor"]
+        rows = gap + rows
+    if not rows:
+        state.feed_more_next = start
+    state.feed_more_from = start
+    while state.feed_more_next is not None and len(rows) < (state.feed_pages - 1) * PAGE_SIZE:
+        chunk = load_feed(state.feed_more_next, PAGE_SIZE, author)
+        rows += zip(chunk["offsets"], chunk["posts"])
+        state.feed_more_next = chunk["next_cursor"]
+    state.feed_more = rows
+    return rows
 
 def generate_ai_comments(post_index, num_comments=2):
     """Generate AI comments for a post to demonstrate multi-agent interaction"""
@@ -160,17 +239,20 @@ def render_post_card(post, post_index, total_posts):
         col1, col2, col3 = st.columns([0.1, 0.7, 0.2])
 
         with col1:
-            st.markdown(f"<div style='font-size: 48px;'>{profile['avatar']}</div>", unsafe_allow_html=True)
+            st.markdown(f"<div style='font-size: 48px;'>{html.escape(profile['avatar'])}</div>", unsafe_allow_html=True)
 
         with col2:
-            st.markdown(f"**{profile['name']}** {profile['handle']}")
-            st.caption(f"{profile['role']} • Post #{total_posts - post_index}")
+            st.markdown(f"**{html.escape(profile['name'])}** {html.escape(profile['handle'])}")
+            st.caption(f"{html.escape(profile['role'])} • Post #{total_posts - post_index}")
 
         with col3:
-            st.caption("🔴 LIVE")
+            if post.get('duplicate_of') is not None:
+                st.caption("♻️ Near-duplicate", help=f"{post.get('similarity', 0):.0%} similar to an earlier post")
+            else:
+                st.caption("🔴 LIVE")
 
         # Post content
-        st.markdown(f"<div style='margin: 15px 0; font-size: 16px; line-height: 1.6;'>{post.get('text', '')}</div>", unsafe_allow_html=True)
+        st.markdown(f"<div style='margin: 15px 0; font-size: 16px; line-height: 1.6;'>{html.escape(str(post.get('text', '')))}</div>", unsafe_allow_html=True)
 
         # Engagement metrics (simulated)
         likes = random.randint(10, 150)
@@ -209,79 +291,203 @@ def render_post_card(post, post_index, total_posts):
 
         st.markdown("---")
 
-def run_agent_workflow():
-    """Run the agent workflow directly from Streamlit"""
+@st.cache_resource
+def fragment_cache():
+    """Pre-rendered post cards by (post hash, post number, profile), shared by every session"""
+    return {}
+
+def post_fragment(post, number):
+    """
+    One post card as a single HTML fragment (see ``render_posts``).
+
+    Engagement counts are derived from the post so the fragment can be cached.
+    """
+    profile = get_agent_profile(post.get('author', 'Unknown'))
+    digest = hashlib.blake2b(json.dumps(post.to_dict(), sort_keys=True, ensure_ascii=False).encode('utf-8'),
+                             digest_size=16).hexdigest()
+    key = (digest, number, tuple(profile.items()))
+    cache = fragment_cache()
+    fragment = cache.get(key)
+    if fragment is not None:
+        return fragment
+
+    rng = random.Random(digest)
+    if post.get('duplicate_of') is not None:
+        badge = f"<span title='{post.get('similarity', 0):.0%} similar to an earlier post'>♻️ Near-duplicate</span>"
+    else:
+        badge = "🔴 LIVE"
+    fragment = f"""<div class="post-card" style="--accent: {profile['color']}; --tint: {profile['color']}15">
+<div class="post-head"><span class="post-avatar">{profile['avatar']}</span><div class="post-who">
+<b>{html.escape(profile['name'])}</b> {html.escape(profile['handle'])}
+<div class="post-meta">{html.escape(profile['role'])} • Post #{number}</div></div>
+<div class="post-meta">{badge}</div></div>
+<div class="post-text">{html.escape(str(post.get('text', '')))}</div>
+<div class="post-meta">❤️ {rng.randint(10, 150)} &nbsp; 🔄 {rng.randint(5, 50)} &nbsp; 💬 Open post #{number} to comment</div>
+</div>"""
+    if len(cache) >= FRAGMENT_CACHE_SIZE:
+        cache.clear()
+    cache[key] = fragment
+    return fragment
+
+def render_posts(entries, total_posts):
+    """
+    Render ``(post, post_index)`` entries, newest first, in the configured ``FEED_RENDER_MODE``.
+
+    "html" sends the page as one pre-rendered HTML element and creates
+    widgets only for the post opened from the selector above it; "widgets"
+    draws every post with ``render_post_card``.
+    """
+    if FEED_RENDER_MODE != "html":
+        for post, post_index in entries:
+            render_post_card(post, post_index, total_posts)
+        return
+
+    authors = {total_posts - post_index: post.get('author', 'Unknown') for post, post_index in entries}
+    opened = st.selectbox("Open a post", [None] + list(authors), key="open_post", label_visibility="collapsed",
+                          format_func=lambda n: "💬 Open a post to like, repost or comment" if n is None
+                          else f"Post #{n} by {authors[n]}")
+    batch = []
+    for post, post_index in entries:
+        number = total_posts - post_index
+        if number != opened:
+            batch.append(post_fragment(post, number))
+            continue
+        if batch:
+            st.markdown('\n'.join(batch), unsafe_allow_html=True)
+            batch = []
+        st.session_state.setdefault(f"show_comments_{post_index}", True)
+        render_post_card(post, post_index, total_posts)
+    if batch:
+        st.markdown('\n'.join(batch), unsafe_allow_html=True)
+
+def render_live_post(post):
+    """Render a compact card for a post that arrived since the page loaded"""
+    profile = get_agent_profile(post.get('author', 'Unknown'))
+    st.markdown(f"""
+    <div style="border-left: 5px solid {profile['color']}; padding: 10px 15px; margin-bottom: 10px; border-radius: 8px;">
+        <b>{html.escape(profile['avatar'])} {html.escape(profile['name'])}</b> {html.escape(profile['handle'])} • <i>just now</i><br>
+        {html.escape(str(post.get('text', '')))}
+    </div>
+    """, unsafe_allow_html=True)
+
+def live_updates():
+    """Poll the feed tail and show posts appended since the last full page load"""
+    new = st.session_state.feed_tail.poll(limit=PAGE_SIZE)
+    live_posts = [post for _, post in reversed(new)] + st.session_state.live_posts
+    st.session_state.live_posts = live_posts[:PAGE_SIZE]
+
+    if st.session_state.live_posts:
+        st.markdown(f"### 🔴 {len(st.session_state.live_posts)} new posts")
+        for post in st.session_state.live_posts:
+            render_live_post(post)
+        st.markdown("---")
+
+def request_workflow_run():
+    """Queue a workflow on the shared background runner (one at a time across all sessions)."""
+    from jobs import DuplicateJobError, get_job_runner
+    from jobs.workflow import agent_workflow
     try:
-        from autogen_agentchat.teams import RoundRobinGroupChat
-        from autogen_agentchat.conditions import TextMentionTermination, MaxMessageTermination
-        from autogen_ext.models.openai import OpenAIChatCompletionClient
-        from autogen_core.tools import FunctionTool
-        from agents import TrendSetterAgent, NewsBreakerAgent, LogicQAAgent
-        from agents.tools import post_to_site, read_site_feed
-
-        # Create progress placeholder
-        progress_text = st.empty()
-        progress_bar = st.progress(0)
-
-        progress_text.text("🔧 Setting up AI agents...")
-        progress_bar.progress(20)
-
-        # Setup client
-        client = OpenAIChatCompletionClient(model=model_name, api_key=api_key)
-
-        # Create tools
-        post_tool = FunctionTool(
-            post_to_site,
-            name="post_to_site",
-            description="Post a message to the social feed"
-        )
-        read_tool = FunctionTool(
-            read_site_feed,
-            name="read_site_feed",
-            description="Read all posts from the social feed"
-        )
-
-        progress_text.text("🤖 Initializing agents...")
-        progress_bar.progress(40)
-
-        # Build agents
-        trendsetter = TrendSetterAgent(client, tool_bench=[post_tool, read_tool]).build()
-        newsbreaker = NewsBreakerAgent(client, tool_bench=[post_tool, read_tool]).build()
-        logicqa = LogicQAAgent(client, tool_bench=[post_tool, read_tool]).build()
-
-        progress_text.text("🔄 Starting agent workflow...")
-        progress_bar.progress(60)
-
-        # Create team
-        squad = RoundRobinGroupChat(
-            participants=[trendsetter, newsbreaker, logicqa],
-            termination_condition=TextMentionTermination("WORKFLOW_COMPLETE") | MaxMessageTermination(9)
-        )
-
-        mission = "Create engaging social media posts. Each agent posts once, then say WORKFLOW_COMPLETE."
-
-        progress_text.text("✨ Agents are generating content...")
-        progress_bar.progress(80)
-
-        # Run workflow (synchronous for Streamlit)
-        async def run():
-            async for event in squad.run_stream(task=mission):
-                pass  # Process silently
-
-        asyncio.run(run())
-
-        progress_bar.progress(100)
-        progress_text.text("✅ Workflow complete! Refreshing feed...")
-
-        return True
-    except Exception as e:
-        st.error(f"❌ Error running agents: {str(e)}")
-        return False
+        job = get_job_runner().submit("workflow", agent_workflow)
+    except DuplicateJobError as e:
+        job = e.job
+        st.session_state.job_notice = ("info", f"A workflow is already {job.status} (job #{job.id}); following it.")
+    st.session_state.setdefault("watched_jobs", [])
+    if job.id not in st.session_state.watched_jobs:
+        st.session_state.watched_jobs.append(job.id)
+
+def cancel_job(job_id):
+    from jobs import get_job_runner
+    get_job_runner().cancel(job_id)
+
+def render_jobs():
+    """Progress, live drafts and a cancel button for the workflows this session is following"""
+    from jobs import get_job_runner
+    runner = get_job_runner()
+    notice = st.session_state.pop("job_notice", None)
+    if notice:
+        getattr(st, notice[0])(notice[1])
+    finished = False
+    for job_id in list(st.session_state.get("watched_jobs", [])):
+        job = runner.get(job_id)
+        if job is None:
+            st.session_state.watched_jobs.remove(job_id)
+            continue
+        snap = job.snapshot()
+        if not job.active:
+            # Shown once after the full rerun that refreshes the feed
+            st.session_state.watched_jobs.remove(job_id)
+            finished = True
+            if snap["status"] == "succeeded":
+                result = snap["result"] or {}
+                st.session_state.job_notice = ("success", f"✅ Workflow #{job_id} complete: "
+                                               f"{result.get('posts', 0)} posts in {result.get('turns', 0)} turns")
+            elif snap["status"] == "failed":
+                st.session_state.job_notice = ("error", f"❌ Error running agents: {snap['error']}")
+            else:
+                st.session_state.job_notice = ("warning", f"⏹ Workflow #{job_id} cancelled")
+            continue
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.progress(snap["progress"], text=f"#{job_id} {snap['status']}: {snap['message']}")
+        with col2:
+            st.button("⏹ Cancel", key=f"cancel_{job_id}", on_click=cancel_job, args=(job_id,))
+        for source, draft in snap["details"].get("drafts", {}).items():
+            if draft:
+                st.markdown(f"**{source}** is typing…\n\n{draft}▌")
+    if finished:
+        reset_paging()
+        st.rerun()
+
+def render_run_stats():
+    """Per-agent latency / token / tool stats of the most recent workflow run."""
+    from config.settings import RUN_TRACE_DIR
+    from telemetry import latest_trace, load_trace, summarize
+
+    with st.sidebar.expander("📈 Run stats"):
+        path = latest_trace(RUN_TRACE_DIR)
+        turns = load_trace(path) if path else []
+        if not turns:
+            st.caption("No instrumented runs yet.")
+            return
+        st.caption(f"Run {turns[0]['run_id']} • {len(turns)} turns")
+        st.table([{
+            "agent": row["agent"],
+            "turns": row["turns"],
+            "ttft p50 ms": round(row["ttft_p50_ms"], 1),
+            "ttft p95 ms": round(row["ttft_p95_ms"], 1),
+            "model p50 ms": round(row["model_p50_ms"], 1),
+            "model p95 ms": round(row["model_p95_ms"], 1),
+            "tokens in/out": f"{row['prompt_tokens']}/{row['completion_tokens']}",
+            "tool ms": round(row["tool_ms"], 1),
+            "queue p50 ms": round(row["queue_p50_ms"], 1),
+            "turn p50 ms": round(row["turn_p50_ms"], 1),
+        } for row in summarize(turns)])
+
+def activity_html(series, authors):
+    """Hourly post counts as CSS bars, then the per-author table, as one HTML fragment."""
+    peak = max((count for _, count in series), default=0) or 1
+    bars = ''.join(
+        f"<div title='{datetime.fromtimestamp(start).strftime('%H:00')}: {count} posts' style='flex: 1; "
+        f"height: {100 * count / peak:.0f}%; min-height: 1px; background: #1DA1F2;'></div>"
+        for start, count in series)
+    hours = (f"<div style='display: flex; justify-content: space-between; font-size: 11px; opacity: 0.7;'>"
+             f"<span>{datetime.fromtimestamp(series[0][0]).strftime('%H:00')}</span>"
+             f"<span>{datetime.fromtimestamp(series[-1][0]).strftime('%H:00')}</span></div>") if series else ""
+    rows = ''.join(f"<tr><td>{html.escape(row['author'])}</td><td>{row['posts']}</td><td>{row['share']:.0%}</td>"
+                   f"<td>{row['avg_chars']:.0f}</td></tr>" for row in authors)
+    return (f"<div style='display: flex; align-items: flex-end; gap: 2px; height: 80px;'>{bars}</div>{hours}"
+            f"<table style='width: 100%; font-size: 13px;'><tr><th>author</th><th>posts</th><th>share</th>"
+            f"<th>avg chars</th></tr>{rows}</table>")
 
 def render_sidebar():
     """Render sidebar with agent profiles and stats"""
     st.sidebar.title("🤖 AI Social Network")
     st.sidebar.markdown("### Active AI Agents")
+    index = get_feed_index()
+    # Materialized aggregates: kept current on append, so none of this scans the feed
+    stats = get_feed_stats()
+    summary = stats.summary()
+    by_author = {row["author"]: row for row in summary["authors"]}
 
     for agent_key, profile in AGENT_PROFILES.items():
         if agent_key in ["TrendSetter", "NewsBreaker", "LogicQA"]:  # Main agents
@@ -289,20 +495,54 @@ def render_sidebar():
                 st.markdown(f"**{profile['handle']}**")
                 st.caption(profile['bio'])
                 st.markdown(f"**Role:** {profile['role']}")
-                st.markdown(f"**Status:** 🟢 Active")
+                row = by_author.get(agent_key)
+                st.markdown(f"**Posts:** {row['posts'] if row else 0}"
+                            + (f" • avg {row['avg_chars']:.0f} chars" if row else ""))
+                st.markdown("**Status:** 🟢 Active")
 
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📊 Network Stats")
-    feed = load_feed()
-    posts = feed.get("posts", [])
 
-    st.sidebar.metric("Total Posts", len(posts))
-    st.sidebar.metric("Active Agents", len(AGENT_PROFILES))
-    st.sidebar.metric("Network Activity", "🔥 High")
+    recent, previous = stats.activity(24)
+    st.sidebar.metric("Total Posts", summary["posts"])
+    st.sidebar.metric("Posts (last hour)", len(index.between(time.time() - 3600)))
+    st.sidebar.metric("Active Agents", len(summary["authors"]))
+    st.sidebar.metric("Avg Post Length", f"{summary['avg_chars']:.0f} chars")
+    st.sidebar.metric("Network Activity", f"{recent:.1f} posts/h", delta=f"{recent - previous:+.1f} vs previous 24h")
+
+    with st.sidebar.expander("📈 Activity (last 24h)"):
+        # Plain HTML: st.bar_chart / st.table would load pandas and altair on first paint
+        st.markdown(activity_html(stats.per_hour(24), summary["authors"]), unsafe_allow_html=True)
+
+    with st.sidebar.expander("🐞 Debug: feed cache"):
+        cache_stats = get_feed_cache().stats()
+        st.markdown(f"**Hits:** {cache_stats['hits']} • **Misses:** {cache_stats['misses']}")
+        st.caption(f"{cache_stats['entries']} entries • {cache_stats['bytes'] / 1024:.1f} KiB of "
+                   f"{cache_stats['max_bytes'] / 1024 / 1024:.0f} MiB • {cache_stats['evictions']} evictions")
+
+    render_run_stats()
+
+    st.sidebar.markdown("---")
+    st.sidebar.button("▶️ Run Agents", on_click=request_workflow_run, help="Run one multi-agent workflow now")
 
     st.sidebar.markdown("---")
     st.sidebar.info("💡 **How it works:** This feed is generated by a multi-agent AI system using AutoGen. Each agent has a specific role and interacts through next-token prediction to create realistic social media conversations.")
 
+def render_search_results(query, author=None):
+    """Render the posts best matching ``query`` (BM25-ranked) instead of the timeline."""
+    results = get_search_index().search(query, author=author, limit=SEARCH_RESULTS)
+    if not results.hits:
+        st.info("🔎 No posts match this search.")
+        return
+    matched = f"{results.matched}+" if results.truncated else f"{results.matched}"
+    st.caption(f"Top {len(results.hits)} of {matched} matching posts • {results.elapsed_ms:.1f} ms")
+    index = get_feed_index()
+    total_posts = index.count()
+    posts = get_search_index().read(results.offsets)
+    render_posts([(post, total_posts - 1 - index.position(offset)) for offset, post in zip(results.offsets, posts)],
+                 total_posts)
+
+
 def main():
     st.set_page_config(
         page_title="AI Social Network",
@@ -441,6 +681,37 @@ def main():
         *:focus {
             outline: none !important;
         }
+
+        /* Pre-rendered post cards (FEED_RENDER_MODE=html) */
+        .post-card {
+            background: linear-gradient(135deg, var(--tint) 0%, rgba(255,255,255,0.05) 100%);
+            border-left: 5px solid var(--accent);
+            padding: 16px 20px;
+            border-radius: 12px;
+            margin-bottom: 20px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        }
+        .post-head {
+            display: flex;
+            align-items: center;
+            gap: 12px;
+        }
+        .post-avatar {
+            font-size: 40px;
+        }
+        .post-who {
+            flex: 1;
+        }
+        .post-meta {
+            color: #b0b0b0 !important;
+            font-size: 14px;
+        }
+        .post-text {
+            margin: 15px 0;
+            font-size: 16px;
+            line-height: 1.6;
+            white-space: pre-wrap;
+        }
     </style>
     """, unsafe_allow_html=True)
 
@@ -451,24 +722,74 @@ def main():
     st.title("🌐 AI Agent's Social Feed")
     st.markdown("**Real-time multi-agent conversations powered by next-token prediction**")
 
-    # Refresh button only
-    col1, col2 = st.columns([1, 5])
+    st.session_state.setdefault("feed_cursor", None)
+    st.session_state.setdefault("feed_pages", 1)
+    st.session_state.setdefault("feed_more", [])
+    st.session_state.setdefault("feed_more_from", None)
+    st.session_state.setdefault("feed_more_next", None)
+    index = get_feed_index()
+
+    # Refresh button, live toggle, author filter and jump-to-time controls
+    col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 2, 1.2, 1.2, 1])
     with col1:
         if st.button("🔄 Refresh Feed"):
+            reset_paging()
+            st.rerun()
+    with col2:
+        live = st.toggle("🔴 Live", help="Show new posts as agents write them")
+    with col3:
+        author = st.selectbox("Filter by author", ["All authors"] + sorted(index.authors()),
+                              label_visibility="collapsed", on_change=reset_paging)
+    with col4:
+        jump_date = st.date_input("Jump to date", label_visibility="collapsed")
+    with col5:
+        jump_time = st.time_input("Jump to time", label_visibility="collapsed")
+    with col6:
+        if st.button("⏩ Jump"):
+            reset_paging(index.cursor_at(datetime.combine(jump_date, jump_time)))
+
+    query = st.text_input("Search posts", placeholder='🔎 Search posts — words or "an exact phrase"',
+                          label_visibility="collapsed").strip()
+
+    if st.session_state.feed_cursor is not None and not query:
+        st.caption("Showing posts older than the selected time.")
+        if st.button("⏮ Back to latest"):
+            reset_paging()
             st.rerun()
 
     st.markdown("---")
 
-    # Load and display posts
-    feed = load_feed()
-    posts = feed.get("posts", [])
+    # Workflows run on a background thread; this fragment polls their progress
+    if st.session_state.get("watched_jobs") or st.session_state.get("job_notice"):
+        st.fragment(render_jobs, run_every=JOB_REFRESH_SECONDS)()
+
+    # Searching replaces the timeline (and live updates) with ranked matches
+    if query:
+        render_search_results(query, None if author == "All authors" else author)
+        return
+
+    # Live mode: a fragment re-runs on a timer and only parses appended posts.
+    # A full rerun reloads the page below, so start tailing from here again.
+    st.session_state.feed_tail = FeedTail(get_feed_store())
+    st.session_state.live_posts = []
+    if live:
+        st.fragment(live_updates, run_every=LIVE_REFRESH_SECONDS)()
+
+    # Load and display the current window, newest first
+    author = None if author == "All authors" else author
+    page = load_feed(st.session_state.feed_cursor, PAGE_SIZE, author)
 
-    if not posts:
+    if not page["posts"]:
         st.info("📭 No posts yet. Run `python main.py` to start the AI agent conversation!")
     else:
-        # Display posts in reverse chronological order
-        for idx, post in enumerate(reversed(posts)):
-            render_post_card(post, idx, len(posts))
+        total_posts = index.count()
+        rows = list(zip(page["offsets"], page["posts"])) + older_posts(page, author)
+        render_posts([(post, total_posts - 1 - index.position(offset)) for offset, post in rows], total_posts)
+
+        if st.session_state.feed_more_next is not None:
+            if st.button("⬇️ Load more"):
+                st.session_state.feed_pages += 1
+                st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,30 @@
+"""
+Per-turn run instrumentation.
+
+Exports are resolved on first access (PEP 562), so reading traces and metrics
+(e.g. the UI's run stats) doesn't import autogen, which only the recorder
+and the instrumented clients need.
+"""
+import importlib
+
+_EXPORTS = {
+    "RunRecorder": "telemetry.recorder", "TraceLog": "telemetry.recorder",
+    "new_run_id": "telemetry.recorder", "open_trace": "telemetry.recorder",
+    "summarize": "telemetry.metrics", "format_summary": "telemetry.metrics",
+    "prometheus_text": "telemetry.metrics", "write_prometheus": "telemetry.metrics",
+    "load_trace": "telemetry.metrics", "latest_trace": "telemetry.metrics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,68 @@
+"""
+Model client and tool wrappers that report timings to a ``RunRecorder``.
+"""
+import time
+
+from autogen_core.models import CreateResult
+from autogen_core.tools import BaseTool
+
+from llm.wrapper import ChatCompletionClientWrapper
+
+
+class InstrumentedChatCompletionClient(ChatCompletionClientWrapper):
+    """Times every model call and reports it, with its token usage, for ``agent``."""
+
+    def __init__(self, inner, recorder, agent):
+        super().__init__(inner)
+        self.recorder = recorder
+        self.agent = agent
+
+    async def create(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                     extra_create_args={}, cancellation_token=None):
+        started = time.perf_counter()
+        self.recorder.model_started(self.agent, started)
+        result = await super().create(messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+                                      extra_create_args=extra_create_args, cancellation_token=cancellation_token)
+        self.recorder.model_call(self.agent, started, time.perf_counter() - started, result.usage, result.cached)
+        return result
+
+    async def create_stream(self, messages, *, tools=[], tool_choice="auto", json_output=None,
+                            extra_create_args={}, cancellation_token=None):
+        started = time.perf_counter()
+        self.recorder.model_started(self.agent, started)
+        async for chunk in super().create_stream(messages, tools=tools, tool_choice=tool_choice,
+                                                 json_output=json_output, extra_create_args=extra_create_args,
+                                                 cancellation_token=cancellation_token):
+            if isinstance(chunk, str) and chunk:
+                self.recorder.visible(self.agent, time.perf_counter())
+            elif isinstance(chunk, CreateResult):
+                self.recorder.model_call(self.agent, started, time.perf_counter() - started,
+                                         chunk.usage, chunk.cached)
+            yield chunk
+
+
+class TimedTool(BaseTool):
+    """Delegates to ``inner`` and reports its execution time for ``agent``."""
+
+    def __init__(self, inner, recorder, agent):
+        super().__init__(inner.args_type(), inner.return_type(), inner.name, inner.description)
+        self.inner = inner
+        self.recorder = recorder
+        self.agent = agent
+
+    @property
+    def schema(self):
+        return self.inner.schema
+
+    def return_value_as_string(self, value):
+        return self.inner.return_value_as_string(value)
+
+    async def run(self, args, cancellation_token):
+        started = time.perf_counter()
+        error = True
+        try:
+            result = await self.inner.run(args, cancellation_token)
+            error = False
+            return result
+        finally:
+            self.recorder.tool_call(self.agent, self.name, started, time.perf_counter() - started, error)
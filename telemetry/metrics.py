@@ -0,0 +1,139 @@
+"""
+Aggregation and export of recorded turns: summary table, Prometheus text
+format and trace loading for the UI.
+"""
+import glob
+import json
+import os
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(turns) -> list:
+    """One row of aggregates per agent, in order of first appearance."""
+    by_agent = {}
+    for turn in turns:
+        by_agent.setdefault(turn["agent"], []).append(turn)
+    rows = []
+    for agent, agent_turns in by_agent.items():
+        rows.append({
+            "agent": agent,
+            "turns": len(agent_turns),
+            "ttft_p50_ms": percentile([t["ttft_ms"] for t in agent_turns], 0.5),
+            "ttft_p95_ms": percentile([t["ttft_ms"] for t in agent_turns], 0.95),
+            "model_calls": sum(t["model_calls"] for t in agent_turns),
+            "cached_calls": sum(t["cached_calls"] for t in agent_turns),
+            "model_p50_ms": percentile([t["model_ms"] for t in agent_turns], 0.5),
+            "model_p95_ms": percentile([t["model_ms"] for t in agent_turns], 0.95),
+            "prompt_tokens": sum(t["prompt_tokens"] for t in agent_turns),
+            "completion_tokens": sum(t["completion_tokens"] for t in agent_turns),
+            "tool_calls": sum(t["tool_calls"] for t in agent_turns),
+            "tool_errors": sum(t["tool_errors"] for t in agent_turns),
+            "tool_ms": sum(t["tool_ms"] for t in agent_turns),
+            "queue_p50_ms": percentile([t["queue_ms"] for t in agent_turns], 0.5),
+            "turn_p50_ms": percentile([t["turn_ms"] for t in agent_turns], 0.5),
+            "turn_p95_ms": percentile([t["turn_ms"] for t in agent_turns], 0.95),
+        })
+    return rows
+
+
+def format_summary(turns) -> str:
+    header = (f"{'agent':<14} {'turns':>5} {'ttft p50':>9} {'ttft p95':>9} {'model p50':>10} {'model p95':>10} "
+              f"{'prompt tok':>11} {'compl tok':>10} {'tools':>6} {'tool ms':>9} {'queue p50':>10} {'turn p50':>9}")
+    lines = [header, '-' * len(header)]
+    for row in summarize(turns):
+        lines.append(f"{row['agent']:<14} {row['turns']:>5} {row['ttft_p50_ms']:>7.1f}ms {row['ttft_p95_ms']:>7.1f}ms "
+                     f"{row['model_p50_ms']:>8.1f}ms {row['model_p95_ms']:>8.1f}ms "
+                     f"{row['prompt_tokens']:>11} {row['completion_tokens']:>10} {row['tool_calls']:>6} "
+                     f"{row['tool_ms']:>9.1f} {row['queue_p50_ms']:>8.1f}ms {row['turn_p50_ms']:>7.1f}ms")
+    return '\n'.join(lines)
+
+
+_COUNTERS = (
+    ("agent_turns_total", "Agent turns completed.", None),
+    ("agent_model_calls_total", "Model calls made.", "model_calls"),
+    ("agent_model_cached_calls_total", "Model calls served from the response cache.", "cached_calls"),
+    ("agent_model_seconds_total", "Time spent waiting on the model.", "model_ms"),
+    ("agent_prompt_tokens_total", "Prompt tokens sent to the model.", "prompt_tokens"),
+    ("agent_completion_tokens_total", "Completion tokens received from the model.", "completion_tokens"),
+    ("agent_tool_calls_total", "Tool calls executed.", "tool_calls"),
+    ("agent_tool_errors_total", "Tool calls that raised.", "tool_errors"),
+    ("agent_tool_seconds_total", "Time spent executing tools.", "tool_ms"),
+    ("agent_queue_seconds_total", "Time from the previous turn to the agent's first model call.", "queue_ms"),
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(turns) -> str:
+    """Render ``turns`` as Prometheus text exposition format (textfile-collector friendly)."""
+    by_agent = {}
+    for turn in turns:
+        by_agent.setdefault(turn["agent"], []).append(turn)
+
+    lines = []
+    for name, help_text, key in _COUNTERS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for agent, agent_turns in by_agent.items():
+            if key is None:
+                value = len(agent_turns)
+            else:
+                value = sum(t[key] for t in agent_turns)
+                if key.endswith('_ms'):
+                    value = value / 1000
+            lines.append(f'{name}{{agent="{_escape(agent)}"}} {value:g}')
+
+    lines += ["# HELP agent_tool_seconds_by_tool_total Time spent executing each tool.",
+              "# TYPE agent_tool_seconds_by_tool_total counter"]
+    for agent, agent_turns in by_agent.items():
+        per_tool = {}
+        for turn in agent_turns:
+            for tool, ms in turn["tools"].items():
+                per_tool[tool] = per_tool.get(tool, 0.0) + ms
+        for tool, ms in per_tool.items():
+            lines.append(f'agent_tool_seconds_by_tool_total{{agent="{_escape(agent)}",tool="{_escape(tool)}"}} '
+                         f'{ms / 1000:g}')
+
+    for name, help_text, key in (("agent_ttft_seconds", "Time to first visible output per agent turn.", "ttft_ms"),
+                                 ("agent_turn_seconds", "Wall time per agent turn.", "turn_ms")):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+        for agent, agent_turns in by_agent.items():
+            durations = [t[key] / 1000 for t in agent_turns]
+            for q in (0.5, 0.95):
+                lines.append(f'{name}{{agent="{_escape(agent)}",quantile="{q}"}} {percentile(durations, q):g}')
+            lines.append(f'{name}_sum{{agent="{_escape(agent)}"}} {sum(durations):g}')
+            lines.append(f'{name}_count{{agent="{_escape(agent)}"}} {len(durations)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, turns):
+    """Atomically replace ``path`` with the metrics for ``turns``."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(turns))
+    os.replace(tmp, path)
+
+
+def load_trace(path) -> list:
+    turns = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                turns.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn last line of a run still in progress
+    return turns
+
+
+def latest_trace(directory):
+    """Path of the most recently written trace in ``directory``, or None."""
+    paths = glob.glob(os.path.join(directory, '*.jsonl'))
+    return max(paths, key=os.path.getmtime) if paths else None
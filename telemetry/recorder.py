@@ -0,0 +1,159 @@
+"""
+Per-turn recording of agent workflows.
+
+A ``RunRecorder`` hands out instrumented model clients and tools, one set per
+agent, and turns what they report into one record per agent turn:
+
+    ttft_ms           time to first visible output: from the previous turn (or
+                      run start) to the first streamed token, or to the first
+                      model response when nothing was streamed
+    queue_ms          time from the previous turn (or run start) to this
+                      agent's first model call
+    model_ms          time spent in model calls, with their prompt and
+                      completion tokens
+    tool_ms           time spent executing tools, with call / error counts
+    turn_ms           queue + model + tools + framework time, up to the
+                      agent's response message
+
+A turn is closed when the agent's response message shows up in the team's
+event stream, so the run loop must pass every event to ``observe``. Closed
+turns are appended to a JSON-lines trace as they happen.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from autogen_agentchat.base import TaskResult
+from autogen_agentchat.messages import BaseChatMessage
+
+
+_run_seq = itertools.count()
+
+
+def new_run_id() -> str:
+    """Sortable id unique across processes and across runs of one process (e.g. jobs started in the same ms)."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]}-{os.getpid()}-{next(_run_seq)}"
+
+
+class TraceLog:
+    """Thread-safe JSON-lines appender shared by the recorders of one run."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RunRecorder:
+    """Collects per-turn stats for one team run (one squad)."""
+
+    def __init__(self, run_id=None, trace=None, squad=None):
+        self.run_id = run_id or new_run_id()
+        self.trace = trace
+        self.squad = squad
+        self.turns = []
+        self._open = {}
+        self._last_close = time.perf_counter()
+
+    def client(self, inner, agent):
+        """``inner`` wrapped so its calls are charged to ``agent``."""
+        from telemetry.instrument import InstrumentedChatCompletionClient
+        return InstrumentedChatCompletionClient(inner, self, agent)
+
+    def tools(self, tools, agent):
+        """``tools`` wrapped so their execution is charged to ``agent``."""
+        from telemetry.instrument import TimedTool
+        return [TimedTool(tool, self, agent) for tool in tools]
+
+    def _turn(self, agent, started):
+        turn = self._open.get(agent)
+        if turn is None:
+            turn = self._open[agent] = {
+                "run_id": self.run_id,
+                "squad": self.squad,
+                "turn": len(self.turns) + len(self._open) + 1,
+                "agent": agent,
+                "started_at": time.time() - (time.perf_counter() - started),
+                "_start": started,
+                "_first_visible": None,
+                "queue_ms": (started - self._last_close) * 1000,
+                "model_ms": 0.0, "model_calls": 0, "cached_calls": 0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+                "tool_ms": 0.0, "tool_calls": 0, "tool_errors": 0, "tools": {},
+            }
+        return turn
+
+    def model_started(self, agent, started):
+        self._turn(agent, started)
+
+    def visible(self, agent, at):
+        """The agent produced its first user-visible output (e.g. a streamed token) at ``at``."""
+        turn = self._turn(agent, at)
+        if turn["_first_visible"] is None:
+            turn["_first_visible"] = at
+
+    def model_call(self, agent, started, seconds, usage=None, cached=False):
+        turn = self._turn(agent, started)
+        if turn["_first_visible"] is None:
+            turn["_first_visible"] = started + seconds
+        turn["model_ms"] += seconds * 1000
+        turn["model_calls"] += 1
+        turn["cached_calls"] += int(bool(cached))
+        if usage is not None:
+            turn["prompt_tokens"] += usage.prompt_tokens
+            turn["completion_tokens"] += usage.completion_tokens
+
+    def tool_call(self, agent, name, started, seconds, error=False):
+        turn = self._turn(agent, started)
+        turn["tool_ms"] += seconds * 1000
+        turn["tool_calls"] += 1
+        turn["tool_errors"] += int(error)
+        turn["tools"][name] = turn["tools"].get(name, 0.0) + seconds * 1000
+
+    def observe(self, event):
+        """Feed every event from ``run_stream``; closes turns as responses arrive."""
+        if isinstance(event, BaseChatMessage) and event.source in self._open:
+            self._close(event.source)
+        elif isinstance(event, TaskResult):
+            self.close()
+
+    def _close(self, agent):
+        now = time.perf_counter()
+        turn = self._open.pop(agent)
+        start, first_visible = turn.pop("_start"), turn.pop("_first_visible")
+        turn["ttft_ms"] = ((first_visible or now) - start) * 1000 + turn["queue_ms"]
+        turn["turn_ms"] = (now - start) * 1000 + turn["queue_ms"]
+        for key in ("ttft_ms", "queue_ms", "model_ms", "tool_ms", "turn_ms"):
+            turn[key] = round(turn[key], 3)
+        turn["tools"] = {name: round(ms, 3) for name, ms in turn["tools"].items()}
+        self._last_close = now
+        self.turns.append(turn)
+        if self.trace is not None:
+            self.trace.write(turn)
+
+    def close(self):
+        """Close any turns still open (e.g. the run was cut off mid-turn)."""
+        for agent in list(self._open):
+            self._close(agent)
+
+
+def open_trace(run_id, directory=None) -> TraceLog:
+    """Open ``<RUN_TRACE_DIR>/<run_id>.jsonl`` for appending."""
+    if directory is None:
+        from config.settings import RUN_TRACE_DIR
+        directory = RUN_TRACE_DIR
+    return TraceLog(os.path.join(directory, f"{run_id}.jsonl"))
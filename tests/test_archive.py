@@ -0,0 +1,120 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import feed.archive
+from feed.archive import ArchiveError, ArchivePartition
+from feed.store import SegmentedFeedStore
+
+DAY0 = date(2025, 3, 1)
+
+
+def make_posts(days, per_day=40):
+    """``per_day`` posts on each of ``days`` consecutive days from ``DAY0``, oldest first."""
+    return [{"author": f"Agent{i % 3}", "text": f"day {d} post {i} " + "words " * (i % 7),
+             "timestamp": (datetime.combine(DAY0 + timedelta(days=d), datetime.min.time())
+                           + timedelta(minutes=30 * i + 1)).isoformat()}
+            for d in range(days) for i in range(per_day)]
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(feed.archive, "BLOCK_BYTES", 512)  # several blocks per day
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SegmentedFeedStore(str(tmp_path / "feed"), segment_max_bytes=4096, compact_after=1000)
+    store.append_many(make_posts(5))
+    store.compact()
+    return store
+
+
+def entries(store):
+    return [(offset, next_offset, post.to_dict()) for offset, next_offset, post in store.scan()]
+
+
+def test_rotate_archives_cold_days_at_the_same_offsets(store):
+    before = entries(store)
+    result = store.rotate(DAY0 + timedelta(days=3))
+    assert [part["day"] for part in result["archived"]] == ["2025-03-01", "2025-03-02", "2025-03-03"]
+    assert all(part["posts"] == 40 for part in result["archived"])
+    assert [p["kind"] for p in store.partitions()].count("arc") == 3
+
+    assert entries(store) == before
+    assert [(o, n, p.to_dict()) for o, n, p in store.scan_reverse()] == before[::-1]
+    for offset, _, post in before[::17]:
+        assert store.read_at(offset).to_dict() == post
+    offsets = [offset for offset, _, _ in before]
+    assert [p.to_dict() for p in store.read_many(offsets[5:90:7])] == [post for _, _, post in before[5:90:7]]
+    assert store.verify() == []
+
+
+def test_rotate_is_idempotent_and_keeps_appending(store):
+    store.rotate(DAY0 + timedelta(days=2))
+    assert store.rotate(DAY0 + timedelta(days=2))["archived"] == []
+    end = store.end_offset()
+    assert store.append({"author": "A", "text": "fresh", "timestamp": datetime.now().isoformat()}) == end
+    assert store.read_at(end)["text"] == "fresh"
+
+
+def test_dry_run_changes_nothing(store):
+    files = sorted(os.listdir(store.directory))
+    result = store.rotate(DAY0 + timedelta(days=4), DAY0 + timedelta(days=4), dry_run=True)
+    assert len(result["archived"]) == 4
+    assert sorted(os.listdir(store.directory)) == files
+
+
+def test_retention_drops_the_oldest_days(store):
+    before = entries(store)
+    result = store.rotate(DAY0 + timedelta(days=4), drop_before=DAY0 + timedelta(days=2))
+    assert [part["day"] for part in result["dropped"]] == ["2025-03-01", "2025-03-02"]
+    assert entries(store) == before[80:]
+    assert store.start_offset() == before[80][0]
+    assert store.verify() == []
+
+
+def test_quiet_feed_seals_its_active_segment(tmp_path):
+    store = SegmentedFeedStore(str(tmp_path / "feed"))
+    store.append_many(make_posts(3, per_day=5))  # one small, never rolled segment
+    store.rotate(DAY0 + timedelta(days=2))
+    assert [part["day"] for part in store.partitions() if part["kind"] == "arc"] == ["2025-03-01", "2025-03-02"]
+    assert len(list(store.scan())) == 15
+
+
+def test_partition_reads(store):
+    store.rotate(DAY0 + timedelta(days=1))
+    part = next(p for p in store.partitions() if p["kind"] == "arc")
+    archive = ArchivePartition(part["path"])
+    lines = list(archive.lines())
+    assert len(lines) == archive.posts == 40
+    assert len(archive._ustarts) > 1
+    assert list(archive.lines_reverse()) == lines[::-1]
+    middle = lines[20][0]
+    assert list(archive.lines(middle)) == lines[20:]
+    assert list(archive.lines_reverse(middle)) == lines[19::-1]
+    assert archive.line_at(middle) == lines[20][1]
+    assert archive.info()["raw_bytes"] == archive.end - archive.base == sum(len(line) for _, line in lines)
+    with pytest.raises(KeyError):
+        archive.line_at(archive.end)
+
+
+def test_verify_reports_damaged_archives(store):
+    store.rotate(DAY0 + timedelta(days=1))
+    path = next(p["path"] for p in store.partitions() if p["kind"] == "arc")
+    with open(path, 'r+b') as f:
+        f.seek(10)
+        byte = f.read(1)
+        f.seek(10)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    store._archives.clear()
+    assert store.verify()
+
+
+def test_rejects_files_that_are_not_archives(tmp_path):
+    for content in (b"", b"not an archive at all"):
+        path = tmp_path / "bogus.jsonl.z"
+        path.write_bytes(content)
+        with pytest.raises(ArchiveError):
+            ArchivePartition(str(path))
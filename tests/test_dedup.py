@@ -0,0 +1,153 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from feed.dedup import FLAG, MERGE, REJECT, DedupIndex, DuplicatePost, dedupe_posts, dedupe_store, similarity, \
+    signatures
+from feed.post import decode_post, encode_post
+from feed.store import SegmentedFeedStore
+from feed.writer import FeedWriter
+
+TOPICS = [
+    "Rocket launch window opens tonight over the coastal spaceport",
+    "Quarterly chip earnings beat analyst forecasts by a wide margin",
+    "New robot arm learns to fold laundry from video demonstrations",
+    "Central bank holds interest rates steady amid cooling inflation",
+    "Open source compiler release brings faster incremental builds",
+]
+
+
+def echo(text):
+    """Same words, different surface: a near-duplicate at similarity 1."""
+    return text.upper() + "!!"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentedFeedStore(str(tmp_path / "feed"))
+
+
+def write_all(store, policy, posts):
+    writer = FeedWriter(store, window=0.001, dedup=DedupIndex(store, policy=policy))
+    results = []
+    try:
+        for post in posts:
+            try:
+                results.append(writer.write(post, timeout=10))
+            except DuplicatePost as e:
+                results.append(e)
+    finally:
+        writer.stop()
+    return writer, results
+
+
+def test_signatures_estimate_similarity():
+    (_, a), (_, b), (_, c) = signatures([TOPICS[0], echo(TOPICS[0]), TOPICS[1]])
+    assert similarity(a, b) == 1.0
+    assert similarity(a, c) < 0.3
+
+
+def test_reject_keeps_duplicates_out(store):
+    writer, results = write_all(store, REJECT, [{"author": "A", "text": TOPICS[0]},
+                                                {"author": "B", "text": echo(TOPICS[0])},
+                                                {"author": "C", "text": TOPICS[1]}])
+    assert isinstance(results[1], DuplicatePost)
+    assert (results[1].offset, results[1].author, results[1].action) == (results[0], "A", "rejected")
+    assert [post['author'] for _, _, post in store.scan()] == ["A", "C"]
+    assert (writer.total_posts, writer.total_duplicates) == (2, 1)
+
+
+def test_flag_stores_duplicates_marked(store):
+    _, results = write_all(store, FLAG, [{"author": "A", "text": TOPICS[0]},
+                                         {"author": "B", "text": echo(TOPICS[0])}])
+    assert all(isinstance(result, int) for result in results)
+    flagged = store.read_at(results[1])
+    assert flagged['duplicate_of'] == results[0] and flagged['similarity'] == 1.0
+    assert 'duplicate_of' not in store.read_at(results[0])
+
+
+def test_merge_records_echoes(store):
+    index = DedupIndex(store, policy=MERGE)
+    writer = FeedWriter(store, window=0.001, dedup=index)
+    try:
+        original = writer.write({"author": "A", "text": TOPICS[2], "timestamp": "2025-01-01T10:00:00"})
+        with pytest.raises(DuplicatePost):
+            writer.write({"author": "B", "text": echo(TOPICS[2]), "timestamp": "2025-01-01T10:05:00"})
+    finally:
+        writer.stop()
+    assert len(list(store.scan())) == 1
+    assert index.merges() == {original: [("B", "2025-01-01T10:05:00", 1.0)]}
+
+
+def test_duplicates_within_one_batch(store):
+    writer = FeedWriter(store, dedup=DedupIndex(store, policy=REJECT))
+    results = writer._append([{"author": "A", "text": TOPICS[3]}, {"author": "B", "text": echo(TOPICS[3])},
+                              {"author": "C", "text": TOPICS[4]}])
+    assert isinstance(results[1], DuplicatePost) and results[1].offset == results[0]
+    assert [post['author'] for _, _, post in store.scan()] == ["A", "C"]
+
+
+def test_dedupe_posts_policies():
+    posts = [{"author": "A", "text": TOPICS[0]}, {"author": "B", "text": TOPICS[1]},
+             {"author": "C", "text": echo(TOPICS[0])}]
+    kept, duplicates = dedupe_posts(posts, REJECT)
+    assert duplicates == 1 and [post['author'] for post in kept] == ["A", "B"]
+    kept, _ = dedupe_posts(posts, MERGE)
+    assert kept[0]['echoes'] == [{"author": "C", "timestamp": None, "similarity": 1.0}]
+    kept, _ = dedupe_posts(posts, FLAG)
+    assert kept[2]['duplicate_of'] == 0 and len(kept) == 3
+
+
+def test_rewrite_replaces_hot_posts(store):
+    store.append_many([{"author": f"A{i}", "text": f"post {i}"} for i in range(10)])
+    end = store.end_offset()
+
+    def odd_only(lines):
+        for _, line in lines:
+            if int(decode_post(line)['text'].split()[-1]) % 2:
+                yield line
+
+    assert store.rewrite(odd_only, dry_run=True) is None
+    assert store.end_offset() == end
+    backup = store.rewrite(odd_only)
+    assert backup is not None and store.end_offset() < end
+    assert [post['author'] for _, _, post in store.scan()] == ["A1", "A3", "A5", "A7", "A9"]
+    assert store.verify() == []
+    store.append_many([{"author": "Late", "text": "after the rewrite"}])
+    assert [post['author'] for _, _, post in store.scan()][-1] == "Late"
+
+
+def test_dedupe_store_remaps_offsets(store):
+    store.append_many([{"author": "A", "text": TOPICS[0]}, {"author": "B", "text": echo(TOPICS[0])},
+                       {"author": "C", "text": TOPICS[1]}, {"author": "D", "text": echo(TOPICS[1])}])
+    flagged_before = store.append_many([{"author": "E", "text": TOPICS[4]}])[0]
+    c_before = [offset for offset, _, post in store.scan() if post['author'] == "C"][0]
+    store.rewrite(lambda lines: (line if offset != flagged_before else encode_post(
+        dict(decode_post(line).to_dict(), duplicate_of=c_before), store.record_format) for offset, line in lines))
+    posts, duplicates, backup = dedupe_store(store, REJECT)
+    assert (posts, duplicates) == (5, 2) and backup is not None
+    kept = {post['author']: (offset, post) for offset, _, post in store.scan()}
+    assert list(kept) == ["A", "C", "E"]
+    assert kept["E"][1]['duplicate_of'] == kept["C"][0] != c_before
+    assert store.verify() == []
+
+
+def test_dedupe_store_flag_and_merge(tmp_path):
+    for policy in (FLAG, MERGE):
+        store = SegmentedFeedStore(str(tmp_path / policy))
+        store.append_many([{"author": "A", "text": TOPICS[2]}, {"author": "B", "text": TOPICS[3]},
+                           {"author": "C", "text": echo(TOPICS[3])}])
+        dedupe_store(store, policy)
+        scanned = [(offset, post) for offset, _, post in store.scan()]
+        if policy == FLAG:
+            assert scanned[2][1]['duplicate_of'] == scanned[1][0]
+        else:
+            assert len(scanned) == 2
+            assert DedupIndex(store).merges() == {scanned[1][0]: [("C", None, 1.0)]}
+
+
+def test_dedupe_store_dry_run_changes_nothing(store):
+    store.append_many([{"author": "A", "text": TOPICS[0]}, {"author": "B", "text": echo(TOPICS[0])}])
+    before = list(store.scan())
+    assert dedupe_store(store, REJECT, dry_run=True) == (2, 1, None)
+    assert list(store.scan()) == before
@@ -0,0 +1,53 @@
+import pytest
+
+from feed.digest import FeedDigest, keywords
+from feed.store import SegmentedFeedStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentedFeedStore(str(tmp_path / "feed"))
+
+
+def post(author, text, minute=0):
+    return {"author": author, "text": text, "timestamp": f"2025-01-01T10:{minute:02d}:00"}
+
+
+def test_keywords_drop_stopwords():
+    assert keywords("The #RocketLab agents have posted about rockets") == ["#rocketlab", "agents", "rockets"]
+
+
+def test_latest_posts_per_author_newest_first(store):
+    store.append_many([post("A", f"alpha {i}", i) for i in range(5)] + [post("B", "beta", 6)])
+    text = FeedDigest(store, per_author=2).text()
+    assert text.startswith("Feed has 6 posts.")
+    lines = text.splitlines()
+    assert lines[lines.index("A (5 posts), latest:") + 1:][:2] == ["- [10:04] alpha 4", "- [10:03] alpha 3"]
+
+
+def test_most_recently_active_authors_come_first(store):
+    digest = FeedDigest(store)
+    store.add_listener(lambda entries: digest.on_append(entries))
+    store.append_many([post("A", "alpha"), post("B", "beta"), post("C", "gamma")])
+    assert [line.split()[0] for line in digest.text().splitlines() if line.endswith("latest:")] == ["C", "B", "A"]
+    store.append_many([post("A", "alpha again")])
+    assert [line.split()[0] for line in digest.text().splitlines() if line.endswith("latest:")] == ["A", "C", "B"]
+
+
+def test_cap_trims_whole_lines_from_the_oldest_authors(store):
+    store.append_many([post(f"Agent{i}", f"message number {i} " + "words " * 15, i) for i in range(20)])
+    digest = FeedDigest(store, per_author=1, max_chars=600)
+    text = digest.text()
+    assert len(text) <= 600
+    lines = text.splitlines()
+    assert lines[-1].startswith("- ")  # no heading left without its post
+    assert "Agent19 (1 posts), latest:" in lines and "Agent0 (1 posts), latest:" not in lines
+
+
+def test_text_is_cached_until_an_append(store):
+    store.append_many([post("A", "alpha")])
+    digest = FeedDigest(store)
+    first = digest.text()
+    assert digest.text() is first
+    store.append_many([post("B", "beta")])
+    assert "B (1 posts), latest:" in digest.text()
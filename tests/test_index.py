@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from feed.index import FeedIndex
+from feed.store import SegmentedFeedStore
+
+START = datetime(2025, 1, 1, 10, 0)
+
+
+def make_posts(n, start=0):
+    return [{"author": f"Agent{i % 3}", "text": f"post {i}", "timestamp": (START + timedelta(minutes=10 * i)).isoformat()}
+            for i in range(start, start + n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentedFeedStore(str(tmp_path / "feed"))
+
+
+def test_queries(store):
+    offsets = store.append_many(make_posts(30))
+    index = FeedIndex(store)
+    assert index.count() == 30
+    assert index.authors() == {"Agent0": 10, "Agent1": 10, "Agent2": 10}
+    assert index.latest(3) == offsets[:-4:-1]
+    assert index.by_author("Agent1", limit=2) == [offsets[28], offsets[25]]
+    assert index.by_author("Agent1", before=offsets[7]) == [offsets[4], offsets[1]]
+    assert index.position(offsets[12]) == 12
+    assert index.cursor_at(START + timedelta(minutes=95)) == offsets[10]
+    assert index.cursor_at(START + timedelta(days=1)) is None
+    assert index.between(START, START + timedelta(minutes=30)) == offsets[2::-1]  # end is exclusive
+
+
+def test_listener_keeps_index_current(store):
+    index = FeedIndex(store)
+    store.add_listener(index.on_append)
+    offsets = store.append_many(make_posts(5))
+    offsets += store.append_many(make_posts(5, 5))
+    assert index.offsets == offsets
+
+
+def test_catches_up_with_appends_it_did_not_see(store):
+    """A second process's index (no listener) reads the sidecar, then scans only what is missing."""
+    writer_index = FeedIndex(store)
+    store.add_listener(writer_index.on_append)
+    store.append_many(make_posts(10))
+    reader_index = FeedIndex(store).sync()
+    assert reader_index.count() == 10
+
+    other = SegmentedFeedStore(store.directory)  # appends the first index never hears about
+    other.append_many(make_posts(4, 10))
+    assert reader_index.count() == 14
+    store.append_many(make_posts(2, 14))  # the listener sees a gap and catches up from the store
+    assert writer_index.count() == 16
+    assert reader_index.count() == 16
+    assert writer_index.offsets == reader_index.offsets == [offset for offset, _, _ in store.scan()]
+
+
+def test_persisted_sidecar_is_reused(store):
+    store.append_many(make_posts(8))
+    FeedIndex(store).sync()
+    reloaded = FeedIndex(store)
+    reloaded._read_sidecar()
+    assert len(reloaded.offsets) == 8  # loaded from the sidecar, before any scan
+
+
+def test_rebuild(store):
+    index = FeedIndex(store)
+    store.add_listener(index.on_append)
+    store.append_many(make_posts(6))
+    with open(index.path, 'ab') as f:
+        f.write(b'[999999, 1000000, "Ghost", null]\n')
+    assert FeedIndex(store).rebuild().authors() == {"Agent0": 2, "Agent1": 2, "Agent2": 2}
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from autogen_core.models import CreateResult, SystemMessage, UserMessage
+
+from llm.cache import CacheMissError, CachedChatCompletionClient, ResponseStore, request_key
+from llm.fake import FakeChatCompletionClient
+
+
+def task(text="say something"):
+    return [SystemMessage(content="ROLE: Tester"), UserMessage(content=text, source="user")]
+
+
+def cached_client(tmp_path, mode, **fake_args):
+    fake = FakeChatCompletionClient(response_chars=40, **fake_args)
+    return CachedChatCompletionClient(fake, str(tmp_path / "cache"), mode=mode), fake
+
+
+def cache_files(tmp_path):
+    return [name for _, _, names in os.walk(tmp_path / "cache") for name in names]
+
+
+def test_request_key_is_stable_and_covers_the_request():
+    key = request_key("fake", task())
+    assert key == request_key("fake", task()) and len(key) == 64
+    assert key != request_key("fake", task("say something else"))
+    assert key != request_key("other-model", task())
+    assert key != request_key("fake", [UserMessage(content="say something", source="user")])
+    assert key != request_key("fake", task(), tool_choice="none")
+    assert key != request_key("fake", task(), extra_create_args={"temperature": 0})
+
+
+def test_record_then_replay(tmp_path):
+    recorder, fake = cached_client(tmp_path, "record")
+    first = asyncio.run(recorder.create(task()))
+    again = asyncio.run(recorder.create(task()))
+    assert fake.calls == 1 and again.cached and again.content == first.content
+    assert recorder.stats() == {"mode": "record", "hits": 1, "misses": 1}
+
+    replayer, fresh = cached_client(tmp_path, "replay", seed=99)
+    replayed = asyncio.run(replayer.create(task()))
+    assert fresh.calls == 0 and replayed.content == first.content and replayed.usage == first.usage
+
+
+def test_replay_miss_raises(tmp_path):
+    replayer, fake = cached_client(tmp_path, "replay")
+    with pytest.raises(CacheMissError):
+        asyncio.run(replayer.create(task("never recorded")))
+    assert fake.calls == 0
+
+
+def test_off_passes_through(tmp_path):
+    client, fake = cached_client(tmp_path, "off")
+    asyncio.run(client.create(task()))
+    asyncio.run(client.create(task()))
+    assert fake.calls == 2 and not cache_files(tmp_path)
+
+
+def test_unknown_mode_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        cached_client(tmp_path, "sometimes")
+
+
+def test_streams_are_recorded_and_replayed(tmp_path):
+    async def stream(client):
+        return [chunk async for chunk in client.create_stream(task())]
+
+    recorder, _ = cached_client(tmp_path, "record")
+    chunks = asyncio.run(stream(recorder))
+    assert isinstance(chunks[-1], CreateResult)
+    replayer, fake = cached_client(tmp_path, "replay")
+    replayed = asyncio.run(stream(replayer))
+    assert fake.calls == 0
+    assert replayed[0] == chunks[-1].content and replayed[-1].content == chunks[-1].content
+
+
+def test_concurrent_writes_are_atomic(tmp_path):
+    store = ResponseStore(str(tmp_path / "cache"))
+    key = "ab" + "0" * 62
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(50):
+                store.put(key, {"writer": n, "i": i, "pad": "x" * 2000})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert cache_files(tmp_path) == [key + ".json"]
+    assert store.get(key)["i"] == 49
+
+
+def test_torn_entry_is_a_miss(tmp_path):
+    store = ResponseStore(str(tmp_path / "cache"))
+    key = "cd" + "1" * 62
+    store.put(key, {"ok": True})
+    with open(store._path(key), "w", encoding="utf-8") as f:
+        f.write('{"ok": tr')
+    assert store.get(key) is None
+
+
+def test_lru_eviction(tmp_path):
+    store = ResponseStore(str(tmp_path / "cache"), max_bytes=5000)
+    keys = [f"{i:02d}" + "e" * 62 for i in range(5)]
+    for key in keys:
+        store.put(key, {"pad": "x" * 900})
+    for i, key in enumerate(keys):
+        os.utime(store._path(key), (i, i))
+    store.get(keys[0])  # recently used again
+    store.put("99" + "f" * 62, {"pad": "x" * 900})
+    assert store.get(keys[0]) is not None
+    assert store.get(keys[1]) is None
+    assert sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path / "cache")
+               for name in names) <= 5000
+    assert json.loads(open(store._path(keys[0]), encoding="utf-8").read()) == {"pad": "x" * 900}
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from feed.lock import FileLock
+
+HOLDER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from feed.lock import FileLock
+with FileLock({path!r}):
+    print("locked", flush=True)
+    sys.stdin.readline()
+"""
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "feed.lock")
+
+
+def test_reentrant_within_a_thread(path):
+    lock = FileLock(path)
+    with lock:
+        with lock:
+            assert lock.acquire(blocking=False)
+            lock.release()
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_serializes_threads(path):
+    lock = FileLock(path)
+    inside, overlaps = [], []
+
+    def work():
+        for _ in range(20):
+            with lock:
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(1)
+                time.sleep(0.001)
+                inside.pop()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlaps
+
+
+def test_excludes_other_processes(path):
+    import os
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    holder = subprocess.Popen([sys.executable, "-c", HOLDER.format(root=root, path=path)],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        lock = FileLock(path)
+        assert not lock.acquire(blocking=False)
+        holder.stdin.write("\n")
+        holder.stdin.flush()
+        holder.wait(10)
+        assert lock.acquire(blocking=False)
+        lock.release()
+    finally:
+        holder.kill()
+        holder.wait()
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from feed.post import V1, V2, Post, decode_post, encode_post
+
+TRICKY = "line one\nline two \\ backslash \x1f separator \\n not a newline \\x émoji 🚀"
+
+
+@pytest.mark.parametrize("record_format", [V1, V2])
+@pytest.mark.parametrize("data", [
+    {"author": "NewsBreaker", "text": "Breaking: agents post", "timestamp": "2025-01-01T10:00:00"},
+    {"author": "LogicQA", "text": TRICKY, "timestamp": "2025-01-01T10:00:00"},
+    {"author": "Trend\x1fSetter\n", "text": "x", "timestamp": "2025-01-01T10:00:00", "duplicate_of": 42,
+     "similarity": 0.83, "tags": ["a", "b\x1f"]},
+    {"author": "NoStamp", "text": "no timestamp"},
+])
+def test_round_trip(data, record_format):
+    line = encode_post(data, record_format)
+    assert line.endswith(b'\n') and line.count(b'\n') == 1
+    assert decode_post(line).to_dict() == data
+
+
+def test_v2_line_layout():
+    line = encode_post({"author": "A", "text": "hi", "timestamp": "t"}, V2)
+    assert line == b'\x02t\x1fA\x1f\x1fhi\n'
+
+
+def test_v2_falls_back_to_v1_for_values_it_cannot_hold():
+    for data in ({"author": "A", "text": "", "timestamp": "t"}, {"author": "A", "text": 7, "timestamp": "t"}):
+        line = encode_post(data, V2)
+        assert line.startswith(b'{')
+        assert decode_post(line).to_dict() == data
+
+
+def test_v1_lines_are_plain_json():
+    data = {"author": "A", "text": "é", "timestamp": "t"}
+    assert json.loads(encode_post(data, V1)) == data
+
+
+@pytest.mark.parametrize("record_format", [V1, V2])
+def test_decode_only_requested_fields(record_format):
+    post = decode_post(encode_post({"author": "A", "text": "body", "timestamp": "t", "score": 1}, record_format),
+                       fields=("author", "timestamp"))
+    assert (post.author, post.timestamp, post.text) == ("A", "t", None)
+
+
+def test_decoded_authors_are_interned():
+    first = decode_post(encode_post({"author": "Interned Author", "text": "a", "timestamp": "t"}))
+    second = decode_post(encode_post({"author": "Interned Author", "text": "b", "timestamp": "t"}))
+    assert first.author is second.author
+
+
+def test_post_reads_like_a_dict():
+    post = Post.from_dict({"author": "A", "text": "hi", "duplicate_of": 3})
+    assert post['text'] == "hi" and post.get('duplicate_of') == 3
+    assert post.get('timestamp', 'none') == 'none'
+    assert 'duplicate_of' in post and 'missing' not in post
+    with pytest.raises(KeyError):
+        post['missing']
+
+
+def test_rejects_unknown_records():
+    with pytest.raises(ValueError):
+        decode_post(b'\x07garbage\n')
+    with pytest.raises(ValueError):
+        decode_post(b'\x02only\x1ftwo\n')
+    with pytest.raises(ValueError):
+        encode_post({"text": "x"}, "v9")
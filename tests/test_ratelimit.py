@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from autogen_core.models import AssistantMessage, SystemMessage, UserMessage
+
+from llm import ratelimit
+from llm.fake import FakeChatCompletionClient, FakeRateLimitError
+from llm.ratelimit import (PRIORITY_IN_PROGRESS, PRIORITY_NEW_RUN, ModelScheduler, RateLimitedChatCompletionClient,
+                           TokenBucket, is_retryable, request_priority, retry_after)
+
+TASK = [SystemMessage(content="ROLE: Tester"), UserMessage(content="say something", source="user")]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_token_bucket_paces_to_its_rate(clock):
+    bucket = TokenBucket(60, burst=2)  # one per second
+    assert bucket.delay(1) == 0
+    bucket.take(1)
+    bucket.take(1)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+    clock.now += 10
+    assert bucket.delay(1) == 0 and bucket.tokens == 2  # never above the burst
+    bucket.drain()
+    assert bucket.delay(5) == pytest.approx(2.0)  # requests above capacity wait for a full bucket
+
+
+def test_retryable_errors_and_retry_after():
+    error = FakeRateLimitError(retry_after=1.5)
+    assert is_retryable(error) and retry_after(error) == 1.5
+    assert retry_after(FakeRateLimitError()) is None
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_request_priority():
+    assert request_priority(TASK) == PRIORITY_NEW_RUN
+    assert request_priority(TASK + [AssistantMessage(content="hi", source="Tester")]) == PRIORITY_IN_PROGRESS
+
+
+def test_429_halves_concurrency_and_success_recovers_it():
+    scheduler = ModelScheduler(max_concurrency=8, retry_base=0.01)
+    assert scheduler.limit == 4
+    backoff = scheduler.record_failure(FakeRateLimitError(retry_after=2.0), attempt=0)
+    assert backoff >= 2.0 and scheduler.limit == 2 and scheduler.rate_limited == 1
+    scheduler.record_failure(FakeRateLimitError(), attempt=1)
+    assert scheduler.limit == 1
+    for _ in range(40):
+        scheduler.record_success(0.01, 0)
+    assert scheduler.limit > 4
+    assert scheduler.limit <= 8
+
+
+def test_slow_responses_shrink_concurrency():
+    scheduler = ModelScheduler(max_concurrency=8)
+    for _ in range(5):
+        scheduler.record_success(0.1, 0)
+    before = scheduler.limit
+    for _ in range(10):
+        scheduler.record_success(1.0, 0)
+    assert scheduler.limit < before
+
+
+def test_client_retries_429s_from_the_endpoint():
+    fake = FakeChatCompletionClient(rpm_limit=2, rate_window=0.2, response_chars=20)
+    scheduler = ModelScheduler(max_concurrency=4, retry_base=0.01, retry_max=0.05)
+    client = RateLimitedChatCompletionClient(fake, scheduler)
+
+    async def run():
+        return await asyncio.gather(*[client.create(TASK) for _ in range(6)])
+
+    results = asyncio.run(run())
+    assert len(results) == 6 and fake.calls == 6
+    assert fake.rejected > 0 and scheduler.rate_limited == fake.rejected
+    assert scheduler.requests == 6 and scheduler.limit < 4
+
+
+def test_client_gives_up_after_max_retries():
+    fake = FakeChatCompletionClient(error_rate=1.0)
+    client = RateLimitedChatCompletionClient(fake, ModelScheduler(max_retries=2, retry_base=0.001))
+    with pytest.raises(FakeRateLimitError):
+        asyncio.run(client.create(TASK))
+    assert fake.rejected == 3
+
+
+def test_rpm_bucket_paces_requests():
+    fake = FakeChatCompletionClient(response_chars=20)
+    client = RateLimitedChatCompletionClient(fake, ModelScheduler(rpm=600, rpm_burst=1))  # one per 100ms
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*[client.create(TASK) for _ in range(4)])
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.28
+
+
+def test_in_progress_requests_go_first():
+    scheduler = ModelScheduler(max_concurrency=1, min_concurrency=1)
+    scheduler.limit = 1
+    order = []
+
+    async def request(name, priority):
+        await scheduler.acquire(priority, 0)
+        order.append(name)
+        await asyncio.sleep(0.01)
+        await scheduler.release()
+
+    async def run():
+        first = asyncio.create_task(request("first", PRIORITY_NEW_RUN))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, request("new", PRIORITY_NEW_RUN), request("reply", PRIORITY_IN_PROGRESS))
+
+    asyncio.run(run())
+    assert order == ["first", "reply", "new"]
+
+
+def test_each_event_loop_has_its_own_queue():
+    scheduler = ModelScheduler(max_concurrency=2, min_concurrency=2)
+    scheduler.limit = 2
+    peaks, errors = [], []
+
+    async def squad():
+        in_flight, peak = 0, 0
+
+        async def request():
+            nonlocal in_flight, peak
+            await scheduler.acquire(PRIORITY_NEW_RUN, 0)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            await scheduler.release()
+
+        await asyncio.gather(*[request() for _ in range(10)])
+        return peak
+
+    def thread_main():
+        try:
+            for _ in range(3):  # a fresh loop per asyncio.run, like successive jobs
+                peaks.append(asyncio.run(squad()))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=thread_main) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert not errors
+    assert len(peaks) == 12 and max(peaks) == 2
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from jobs.runner import CANCELLED, FAILED, SUCCEEDED, DuplicateJobError, JobRunner
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.active:
+        assert time.monotonic() < deadline, f"job {job.id} still {job.status}"
+        time.sleep(0.005)
+    return job
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(workers=1)
+    yield runner
+    runner.stop()
+
+
+async def blocked(job, gate, **_):
+    job.update(0.5, "waiting")
+    while not gate.is_set():
+        await asyncio.sleep(0.005)
+    return "done"
+
+
+def test_job_result_and_progress(runner):
+    async def work(job, n):
+        job.update(0.5, "halfway", seen=n)
+        return n * 2
+
+    job = wait_for(runner.submit("double", work, n=21))
+    snap = job.snapshot()
+    assert (snap["status"], snap["result"], snap["progress"]) == (SUCCEEDED, 42, 1.0)
+    assert snap["details"] == {"seen": 21}
+
+
+def test_failure_is_recorded(runner):
+    async def boom(job):
+        raise ValueError("bad input")
+
+    job = wait_for(runner.submit("boom", boom))
+    assert job.status == FAILED and "bad input" in job.message and "ValueError" in job.error
+
+
+def test_duplicate_active_job_is_rejected(runner):
+    gate = threading.Event()
+    first = runner.submit("workflow", blocked, gate=gate)
+    with pytest.raises(DuplicateJobError) as raised:
+        runner.submit("workflow", blocked, gate=gate)
+    assert raised.value.job is first
+    other = runner.submit("workflow", blocked, gate=gate, mission="another")  # different params
+    gate.set()
+    wait_for(first)
+    wait_for(other)
+    again = wait_for(runner.submit("workflow", blocked, gate=gate))  # allowed once the first finished
+    assert again.status == SUCCEEDED and again.id != first.id
+
+
+def test_cancel_running_and_queued_jobs(runner):
+    gate = threading.Event()
+    running = runner.submit("a", blocked, gate=gate)
+    queued = runner.submit("b", blocked, gate=gate)  # waits for the single worker
+    deadline = time.monotonic() + 5
+    while running.status != "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    assert queued.status == "queued"
+    assert runner.cancel(queued.id) and runner.cancel(running.id)
+    assert wait_for(running).status == CANCELLED
+    assert wait_for(queued).status == CANCELLED and queued.started_at is None
+    assert not runner.cancel(running.id)  # already finished
+    assert not runner.cancel(12345)
+
+
+def test_workers_limit_concurrency():
+    runner = JobRunner(workers=2)
+    peak, active = [0], [0]
+
+    async def work(job, i):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+
+    try:
+        jobs = [runner.submit("w", work, i=i) for i in range(6)]
+        assert all(wait_for(job).status == SUCCEEDED for job in jobs)
+        assert peak[0] == 2
+    finally:
+        runner.stop()
+
+
+def test_finished_history_is_bounded():
+    runner = JobRunner(history=3)
+
+    async def noop(job, i):
+        return i
+
+    try:
+        for i in range(6):
+            wait_for(runner.submit("noop", noop, i=i))
+        runner.submit("noop", noop, i=99)
+        assert len(runner.jobs()) <= 4
+    finally:
+        runner.stop()
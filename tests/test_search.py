@@ -0,0 +1,120 @@
+import math
+import random
+
+import pytest
+
+from feed.search import SearchIndex, index_terms, tokenize
+from feed.store import SegmentedFeedStore
+
+WORDS = ("agents model token latency feed search index rocket launch market chip robot data "
+         "the of and is a").split()
+
+
+def make_posts(n, seed=7):
+    rng = random.Random(seed)
+    return [{"author": f"Agent{i % 4}", "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25))),
+             "timestamp": f"2025-01-01T00:00:{i % 60:02d}"} for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SegmentedFeedStore(str(tmp_path / "feed"))
+    store.append_many(make_posts(400))
+    return store
+
+
+def brute_force(store, query, author=None, k1=1.2, b=0.75):
+    """Every post holding all query terms, scored with textbook BM25, best (then newest) first."""
+    docs = [(offset, post) for offset, _, post in store.scan()]
+    tokens = {offset: tokenize(post['text']) for offset, post in docs}
+    avg_len = sum(map(len, tokens.values())) / len(docs)
+    terms = list(index_terms(tokenize(query)))
+    df = {term: sum(1 for t in tokens.values() if term in t) for term in terms}
+    scored = []
+    for offset, post in docs:
+        if author is not None and post['author'] != author:
+            continue
+        if not all(term in tokens[offset] for term in terms):
+            continue
+        score = 0.0
+        for term in terms:
+            tf = tokens[offset].count(term)
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens[offset]) / avg_len))
+        scored.append((offset, score))
+    scored.sort(key=lambda hit: (-hit[1], -hit[0]))
+    return scored
+
+
+@pytest.mark.parametrize("query, author", [
+    ("agents", None), ("rocket launch", None), ("the model and the chip", None),
+    ("data robot", "Agent2"), ("feed", "Agent0"),
+])
+def test_ranking_matches_brute_force_bm25(store, query, author):
+    expected = brute_force(store, query, author)
+    results = SearchIndex(store).search(query, author=author, limit=15)
+    assert results.matched == len(expected) and not results.truncated
+    assert results.offsets == [offset for offset, _ in expected[:15]]
+    assert [score for _, score in results.hits] == pytest.approx([score for _, score in expected[:15]])
+
+
+def test_no_match(store):
+    index = SearchIndex(store)
+    assert index.search("zebra").hits == []
+    assert index.search("the and of").hits == []  # stopwords only
+    assert index.search("agents", author="Nobody").hits == []
+
+
+def test_candidate_cap_keeps_the_newest_matches(store):
+    expected = brute_force(store, "agents")
+    results = SearchIndex(store, max_candidates=10).search("agents", limit=50)
+    assert results.truncated and results.matched == 10
+    newest = sorted(offset for offset, _ in expected)[-10:]
+    assert sorted(results.offsets) == newest
+
+
+def test_phrase_queries_are_verified(tmp_path):
+    store = SegmentedFeedStore(str(tmp_path / "feed"))
+    store.append_many([{"author": "A", "text": "state of the art agents" if i % 10 == 0 else "art of the state agents"}
+                       for i in range(300)])
+    index = SearchIndex(store)
+    everything = index.search('"state of the art" agents', limit=50)
+    assert (len(everything.hits), everything.matched, everything.truncated) == (30, 30, False)
+    first = index.search('"state of the art" agents', limit=5)
+    assert len(first.hits) == first.matched == 5 and first.truncated
+    assert all(store.read_at(offset)['text'].startswith("state of the art") for offset in first.offsets)
+
+
+def test_follows_appends_and_survives_reload(store):
+    index = SearchIndex(store, checkpoint_min=50)
+    store.add_listener(index.on_append)
+    index.search("agents")
+    store.append_many([{"author": "Late", "text": "quantum agents arrive"}] * 3)
+    assert len(index.search("quantum").hits) == 3
+    reloaded = SearchIndex(store)
+    assert reloaded.search("agents rocket", limit=30).hits == index.search("agents rocket", limit=30).hits
+    assert len(reloaded.search("quantum", author="Late").hits) == 3
+
+
+def test_many_authors_and_long_posts(tmp_path):
+    store = SegmentedFeedStore(str(tmp_path / "feed"))
+    store.append_many([{"author": f"Agent{i}", "text": "market"} for i in range(70000)])
+    store.append_many([{"author": "Verbose", "text": "chip " + "word " * 70000}])
+    index = SearchIndex(store)
+    store.add_listener(index.on_append)
+    index.search("chip")
+    store.append_many([{"author": "Agent69999", "text": "robot"}])  # through the listener
+    assert len(index.search("robot", author="Agent69999").hits) == 1
+    assert len(index.search("chip", author="Verbose").hits) == 1
+
+
+def test_older_snapshot_format_is_rebuilt(store):
+    index = SearchIndex(store, checkpoint_min=1)
+    expected = index.search("agents rocket", limit=30).hits
+    with open(index.path, 'rb') as f:
+        header, body = f.readline(), f.read()
+    with open(index.path, 'wb') as f:
+        f.write(header.replace(b'"version":2', b'"version":1') + body)
+    with open(index.log_path, 'ab') as f:
+        f.write(b'[999999999, 1000000000, "Ghost", 1, {"rocket": 1}]\n')  # continues the old snapshot
+    assert SearchIndex(store).search("agents rocket", limit=30).hits == expected
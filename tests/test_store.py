@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from feed.post import V1, V2
+from feed.store import SegmentedFeedStore
+
+
+def make_posts(n, start=0):
+    return [{"author": f"Agent{i % 3}", "text": f"post number {i}", "timestamp": f"2025-01-01T10:{i % 60:02d}:00"}
+            for i in range(start, start + n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentedFeedStore(str(tmp_path / "feed"), segment_max_bytes=512, compact_after=1000)
+
+
+def texts(entries):
+    return [post['text'] for _, _, post in entries]
+
+
+def test_append_scan_and_read_back(store):
+    posts = make_posts(50)
+    offsets = store.append_many(posts[:20]) + [store.append(post) for post in posts[20:]]
+    assert offsets == sorted(offsets) and len(set(offsets)) == 50
+    entries = list(store.scan())
+    assert [offset for offset, _, _ in entries] == offsets
+    assert [post.to_dict() for _, _, post in entries] == posts
+    assert all(next_offset == following for (_, next_offset, _), following in zip(entries, offsets[1:]))
+    assert store.end_offset() == entries[-1][1]
+    assert store.read_at(offsets[17]).to_dict() == posts[17]
+    assert [p.to_dict() for p in store.read_many([offsets[3], offsets[40]])] == [posts[3], posts[40]]
+    assert store.count() == 50
+    with pytest.raises(KeyError):
+        store.read_at(store.end_offset())
+
+
+def test_appends_roll_segments(store):
+    for post in make_posts(60):
+        store.append(post)
+    assert sum(1 for name in os.listdir(store.directory) if name.startswith("seg-")) > 1
+
+
+def test_scan_from_offset_and_in_reverse(store):
+    offsets = store.append_many(make_posts(40))
+    assert texts(store.scan(offsets[25])) == [f"post number {i}" for i in range(25, 40)]
+    assert texts(store.scan_reverse()) == [f"post number {i}" for i in reversed(range(40))]
+    assert texts(store.scan_reverse(offsets[10])) == [f"post number {i}" for i in reversed(range(10))]
+
+
+def test_compaction_keeps_offsets(store):
+    offsets = store.append_many(make_posts(30))
+    offsets += store.append_many(make_posts(30, 30))
+    before = list(store.scan())
+    assert store.compact()
+    names = os.listdir(store.directory)
+    assert sum(1 for name in names if name.startswith("snap-")) == 1
+    assert sum(1 for name in names if name.startswith("seg-")) == 1  # only the active segment is left
+    assert [(o, n, p.to_dict()) for o, n, p in store.scan()] == [(o, n, p.to_dict()) for o, n, p in before]
+    assert store.read_at(offsets[5])['text'] == "post number 5"
+    new = store.append({"author": "A", "text": "after compaction"})
+    assert new == before[-1][1]
+    assert store.verify() == []
+
+
+def test_torn_tail_is_dropped_on_next_append(store):
+    store.append_many(make_posts(3))
+    end = store.end_offset()
+    segment = max(name for name in os.listdir(store.directory) if name.startswith("seg-"))
+    with open(os.path.join(store.directory, segment), 'ab') as f:
+        f.write(b'{"author": "crashed", "te')
+    assert store.count() == 3  # readers skip the incomplete line
+    assert store.append({"author": "A", "text": "next"}) == end
+    assert texts(store.scan())[-1] == "next"
+
+
+def test_mixed_record_formats(tmp_path):
+    directory = str(tmp_path / "feed")
+    SegmentedFeedStore(directory, record_format=V1).append_many(make_posts(5))
+    store = SegmentedFeedStore(directory, record_format=V2)
+    store.append_many(make_posts(5, 5))
+    assert [post.to_dict() for post in store.iter_posts()] == make_posts(10)
+
+
+def test_listeners_get_offsets_and_posts(store):
+    seen = []
+    store.add_listener(seen.extend)
+    offsets = store.append_many(make_posts(4))
+    assert [offset for offset, _, _ in seen] == offsets
+    assert [post['text'] for _, _, post in seen] == [f"post number {i}" for i in range(4)]
+
+
+def test_empty_store(store):
+    assert store.is_empty()
+    assert list(store.scan()) == [] and list(store.scan_reverse()) == []
+    assert store.end_offset() == 0
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from autogen_agentchat.base import Response, TaskResult
+from autogen_agentchat.messages import TextMessage
+
+from agents.team import FanOutTeam, turn_order
+
+
+class StubAgent:
+    """Answers after ``delay`` seconds, staging one post per turn like ``post_to_site`` would."""
+
+    def __init__(self, name, delay, staged, log):
+        self.name = name
+        self.delay = delay
+        self.staged = staged
+        self.log = log
+        self.inputs = []
+
+    async def on_messages_stream(self, messages, token):
+        self.inputs.append([m.source for m in messages])
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        self.staged.setdefault(self.name, []).append({"author": self.name, "text": f"post by {self.name}"})
+        self.log.append(("answer", self.name))
+        yield Response(chat_message=TextMessage(content=f"{self.name} done", source=self.name))
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.posts = []
+
+    async def write_many_async(self, posts):
+        self.posts.extend(posts)
+        return list(range(len(self.posts) - len(posts), len(self.posts)))
+
+
+def run(team, task="go"):
+    async def collect():
+        return [item async for item in team.run_stream(task)]
+    return asyncio.run(collect())
+
+
+def make_team(delays, depends_on, cycles=1):
+    staged, log, writer = {}, [], RecordingWriter()
+    agents = [StubAgent(name, delay, staged, log) for name, delay in delays]
+    return FanOutTeam(agents, depends_on, staged, writer, cycles=cycles), agents, writer, log
+
+
+def test_turn_order():
+    assert turn_order(["A", "B", "C"], {}) == ["A", "B", "C"]
+    assert turn_order(["A", "B", "C"], {"A": ["C"]}) == ["B", "C", "A"]
+    with pytest.raises(ValueError):
+        turn_order(["A", "B"], {"A": ["B"], "B": ["A"]})
+
+
+def test_unknown_dependency_rejected():
+    with pytest.raises(ValueError):
+        make_team([("A", 0)], {"A": ["Ghost"]})
+
+
+def test_commits_in_declared_order_whatever_finishes_first():
+    team, _, writer, log = make_team([("Slow", 0.05), ("Mid", 0.02), ("Fast", 0)], {}, cycles=2)
+    items = run(team)
+    assert [entry for entry in log if entry[0] == "answer"][:3] == [("answer", "Fast"), ("answer", "Mid"),
+                                                                     ("answer", "Slow")]
+    assert [post["author"] for post in writer.posts] == ["Slow", "Mid", "Fast"] * 2
+    result = items[-1]
+    assert isinstance(result, TaskResult)
+    assert [m.source for m in result.messages] == ["user"] + ["Slow", "Mid", "Fast"] * 2
+
+
+def test_dependents_wait_for_their_inputs():
+    team, agents, writer, log = make_team([("Critic", 0), ("Writer", 0.02), ("Other", 0)],
+                                          {"Critic": ["Writer"]})
+    run(team)
+    assert log.index(("start", "Critic")) > log.index(("answer", "Writer"))
+    assert log.index(("start", "Other")) < log.index(("answer", "Writer"))
+    critic = agents[0]
+    assert critic.inputs == [["user", "Writer"]]
+    assert [post["author"] for post in writer.posts] == ["Writer", "Critic", "Other"]
+
+
+def test_later_cycles_see_earlier_answers_once():
+    team, agents, _, _ = make_team([("A", 0), ("B", 0)], {}, cycles=2)
+    run(team)
+    assert agents[0].inputs == [["user"], ["B"]]
+    assert agents[1].inputs == [["user"], ["A"]]
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from feed.store import SegmentedFeedStore
+from feed.writer import FeedWriter
+
+
+def make_posts(n, start=0):
+    return [{"author": f"Agent{i % 3}", "text": f"post number {i}"} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentedFeedStore(str(tmp_path / "feed"))
+
+
+class FailingStore:
+    """Store whose commits fail, as when the disk is full."""
+
+    def append_many(self, posts):
+        raise OSError("disk full")
+
+
+def test_posts_within_the_window_share_a_commit(store):
+    writer = FeedWriter(store, window=0.5)
+    try:
+        futures = [writer.submit(post) for post in make_posts(20)]
+        offsets = [future.result(5) for future in futures]
+    finally:
+        writer.stop()
+    assert offsets == sorted(offsets)
+    assert writer.total_batches < 20 and writer.total_posts == 20
+    assert [post['text'] for _, _, post in store.scan()] == [post['text'] for post in make_posts(20)]
+
+
+def test_max_batch_caps_a_commit(store):
+    writer = FeedWriter(store, window=0.5, max_batch=4)
+    try:
+        for future in [writer.submit(post) for post in make_posts(10)]:
+            future.result(5)
+    finally:
+        writer.stop()
+    assert max(writer.batch_sizes) <= 4 and writer.total_batches >= 3
+    assert writer.stats()["posts"] == 10
+
+
+def test_write_many_async_keeps_order(store):
+    writer = FeedWriter(store, window=0.01)
+    try:
+        offsets = asyncio.run(writer.write_many_async(make_posts(30)))
+    finally:
+        writer.stop()
+    assert offsets == sorted(offsets)
+    assert [store.read_at(offset)['text'] for offset in offsets] == [post['text'] for post in make_posts(30)]
+
+
+def test_failed_commit_fails_every_post_of_the_batch():
+    writer = FeedWriter(FailingStore(), window=0.2)
+    try:
+        futures = [writer.submit(post) for post in make_posts(5)]
+        for future in futures:
+            with pytest.raises(OSError, match="disk full"):
+                future.result(5)
+    finally:
+        writer.stop()
+    assert writer.total_posts == 0
+
+
+def test_stop_flushes_queued_posts(store):
+    writer = FeedWriter(store, window=10)  # only stop() ends this batch
+    futures = [writer.submit(post) for post in make_posts(8)]
+    writer.stop()
+    assert all(future.done() for future in futures)
+    assert len(list(store.scan())) == 8
+    # Writing again restarts the thread
+    writer.window = 0.01
+    assert store.read_at(writer.write({"author": "Late", "text": "after stop"}, timeout=5))['author'] == "Late"
+    writer.stop()
@@ -1,58 +1,269 @@
 #!/usr/bin/env python3
 """
 Simple CLI tool to view the social feed without needing Streamlit.
-Usage: python view_feed.py
+
+Posts are streamed newest first straight off the end of the feed, so memory
+stays flat however large it grows and ``--limit N`` only reads its tail.
+``--follow`` then keeps printing new posts as they are appended, like
+``tail -f``; ``--json`` prints one JSON object per line for piping.
+
+Usage: python view_feed.py [--author NAME] [--limit N] [--since ISO_TIMESTAMP] [--follow] [--json]
+       python view_feed.py --stats
+       python view_feed.py --search QUERY [--author NAME] [--limit N]
 """
+import argparse
+import itertools
 import json
 import sys
 import os
+import time
+from datetime import datetime
 
 # Add current directory to path to import config
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # noinspection PyUnresolvedReferences
-from config.settings import FEED_PATH
+from config.settings import FEED_STORE_DIR
+from feed import get_feed_store, get_feed_index, get_feed_stats, get_search_index
+from feed.index import post_epoch
 
+AUTHOR_SCAN_POSTS = 5000
+AUTHOR_PAGE = 100
+FOLLOW_LIMIT = 10
+FOLLOW_POLL_SECONDS = 1.0
+# Posts are appended in roughly timestamp order; a backwards walk for --since
+# stops once it is this far past the cutoff.
+SINCE_SLACK_SECONDS = 300
 
-def view_feed():
-    """Display all posts from the social feed in the terminal."""
-    print("=" * 80)
-    print("🤖 AI SOCIAL FEED - COMMAND LINE VIEWER")
-    print("=" * 80)
 
-    try:
-        with open(FEED_PATH, 'r', encoding='utf-8') as f:
-            feed = json.load(f)
-            posts = feed.get('posts', [])
+def _matches(post, author, since):
+    if author is not None and post.get('author') != author:
+        return False
+    if since is not None:
+        epoch = post_epoch(post)
+        return epoch is not None and epoch >= since
+    return True
+
 
-        if not posts:
-            print("\n📭 No posts yet. Run 'python main.py' to generate content!\n")
+def _author_posts(author):
+    """An author's posts newest first: a backwards walk, then index pages if they turn out to be rare."""
+    before = None
+    for scanned, (offset, _, post) in enumerate(get_feed_store().scan_reverse(), 1):
+        if post.get('author') == author:
+            yield offset, post
+        before = offset
+        if scanned >= AUTHOR_SCAN_POSTS:
+            break
+    else:
+        return
+    index = get_feed_index()
+    while True:
+        offsets = index.by_author(author, limit=AUTHOR_PAGE, before=before)
+        if not offsets:
             return
+        yield from zip(offsets, index.read(offsets))
+        before = offsets[-1]
+
+
+def iter_posts(author=None, since=None):
+    """
+    Yield ``(offset, post)`` newest first, reading the feed backwards lazily.
+
+    ``since`` is epoch seconds. Past the newest ``AUTHOR_SCAN_POSTS`` posts,
+    an author's posts are fetched a page at a time through the feed index, so
+    a rare author doesn't mean reading the whole feed.
+    """
+    if author is not None:
+        entries = _author_posts(author)
+    else:
+        entries = ((offset, post) for offset, _, post in get_feed_store().scan_reverse())
+    for offset, post in entries:
+        if since is not None:
+            epoch = post_epoch(post)
+            if epoch is not None and epoch < since - SINCE_SLACK_SECONDS:
+                return
+            if epoch is None or epoch < since:
+                continue
+        yield offset, post
+
+
+def follow_posts(start, author=None, since=None, poll=FOLLOW_POLL_SECONDS):
+    """Yield ``(offset, post)`` for matching posts appended from ``start`` on, waiting for new ones forever."""
+    store = get_feed_store()
+    pos = start
+    while True:
+        if store.end_offset() > pos:
+            for offset, next_offset, post in store.scan(pos):
+                pos = next_offset
+                if _matches(post, author, since):
+                    yield offset, post
+        else:
+            time.sleep(poll)
 
-        print(f"\n📊 Total posts: {len(posts)}\n")
-        print("-" * 80)
 
-        # Display posts in reverse chronological order (newest first)
-        for idx, post in enumerate(reversed(posts), 1):
-            author = post.get('author', 'Unknown')
-            text = post.get('text', '')
-            print(f"\n#{idx} - 👤 {author}")
-            print(f"{'─' * 80}")
-            print(f"{text}")
-            print(f"{'─' * 80}")
+def print_post(idx, post, as_json=False):
+    if as_json:
+        print(json.dumps(post.to_dict(), ensure_ascii=False), flush=True)
+        return
+    print(f"\n#{idx} - 👤 {post.get('author', 'Unknown')} • {post.get('timestamp', '')}")
+    print(f"{'─' * 80}")
+    print(f"{post.get('text', '')}")
+    print(f"{'─' * 80}", flush=True)
 
+
+def view_feed(author=None, limit=None, since=None, follow=False, as_json=False):
+    """Display posts from the social feed in the terminal, newest first (or as they arrive with ``follow``)."""
+    if not as_json:
+        print("=" * 80)
+        print("🤖 AI SOCIAL FEED - COMMAND LINE VIEWER")
+        print("=" * 80)
+
+    try:
+        end = get_feed_store().end_offset()
+        posts = iter_posts(author, since)
+        if follow:
+            # Like tail -f: the latest few in order, then new posts below them
+            posts = reversed(list(itertools.islice(posts, limit if limit is not None else FOLLOW_LIMIT)))
+        elif limit is not None:
+            posts = itertools.islice(posts, limit)
+
+        shown = 0
+        for shown, (_, post) in enumerate(posts, 1):
+            print_post(shown, post, as_json)
+        if follow:
+            if not as_json:
+                print("\n👀 Following new posts (Ctrl+C to stop)...", flush=True)
+            for shown, (_, post) in enumerate(follow_posts(end, author, since), shown + 1):
+                print_post(shown, post, as_json)
+
+        if as_json:
+            return
+        if not shown:
+            if author or since:
+                print("\n📭 No posts match these filters.\n")
+            else:
+                print("\n📭 No posts yet. Run 'python main.py' to generate content!\n")
+            return
         print("\n" + "=" * 80)
-        print("✨ End of feed")
+        print(f"✨ {shown} posts shown")
         print("=" * 80)
 
     except FileNotFoundError:
-        print(f"\n❌ Feed file not found: {FEED_PATH}")
+        print(f"\n❌ Feed not found: {FEED_STORE_DIR}")
         print("💡 Run 'python main.py' first to generate the feed!\n")
     except json.JSONDecodeError:
-        print(f"\n❌ Invalid JSON in feed file: {FEED_PATH}")
-        print("💡 The feed file may be corrupted. Check its contents.\n")
+        print(f"\n❌ Invalid JSON in feed: {FEED_STORE_DIR}")
+        print("💡 The feed may be corrupted. Check its contents.\n")
+    except (BrokenPipeError, KeyboardInterrupt):
+        raise
     except Exception as e:
         print(f"\n❌ Error reading feed: {e}\n")
 
 
+def _when(epoch):
+    return datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M') if epoch is not None else "-"
+
+
+def view_stats(hours=24):
+    """Print feed analytics from the materialized aggregates (no feed scan)."""
+    stats = get_feed_stats()
+    summary = stats.summary()
+    print("=" * 80)
+    print("📊 AI SOCIAL FEED - STATS")
+    print("=" * 80)
+    if not summary["posts"]:
+        print("\n📭 No posts yet. Run 'python main.py' to generate content!\n")
+        return
+    print(f"\nPosts: {summary['posts']} • avg {summary['avg_chars']:.0f} chars • "
+          f"{_when(summary['first'])} → {_when(summary['last'])}")
+    if summary["busiest_hour"]:
+        start, count = summary["busiest_hour"]
+        print(f"Busiest hour: {_when(start)} ({count} posts)")
+
+    print(f"\n{'author':<24} {'posts':>7} {'share':>7} {'avg chars':>10}  last post")
+    for row in summary["authors"]:
+        print(f"{row['author'][:24]:<24} {row['posts']:>7} {row['share']:>7.1%} {row['avg_chars']:>10.0f}  "
+              f"{_when(row['last'])}")
+
+    recent, previous = stats.activity(hours)
+    print(f"\nActivity: {recent:.1f} posts/hour over the last {hours}h ({previous:.1f} the {hours}h before)")
+    series = stats.per_hour(hours)
+    peak = max(count for _, count in series) or 1
+    for start, count in series:
+        print(f"  {datetime.fromtimestamp(start).strftime('%m-%d %H:00')} {'█' * round(40 * count / peak):<40} {count}")
+    print("=" * 80)
+
+
+def view_search(query, author=None, limit=None):
+    """Print the posts best matching ``query`` (BM25-ranked, see feed/search.py)."""
+    index = get_search_index()
+    results = index.search(query, author=author, limit=limit or 20)
+    print("=" * 80)
+    print(f"🔎 AI SOCIAL FEED - SEARCH: {query}")
+    print("=" * 80)
+    if not results.hits:
+        print("\n📭 No posts match this search.\n")
+        return
+    matched = f"{results.matched}+" if results.truncated else str(results.matched)
+    print(f"\n{len(results.hits)} of {matched} matching posts • {results.elapsed_ms:.1f} ms\n")
+    print("-" * 80)
+    for idx, (post, (_, score)) in enumerate(zip(index.read(results.offsets), results.hits), 1):
+        print(f"\n#{idx} - 👤 {post.get('author', 'Unknown')} • score {score:.2f} • {post.get('timestamp', '')}")
+        print(f"{'─' * 80}")
+        print(f"{post.get('text', '')}")
+        print(f"{'─' * 80}")
+    print("=" * 80)
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO timestamp: {value!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="View the AI social feed in the terminal.")
+    parser.add_argument("--author", help="only show posts by this author")
+    parser.add_argument("--limit", "--latest", type=int, metavar="N", help="only show the newest N posts")
+    parser.add_argument("--since", metavar="TIMESTAMP", type=_timestamp,
+                        help="only show posts at or after this ISO timestamp")
+    parser.add_argument("--follow", "-f", action="store_true",
+                        help=f"show the newest posts (default {FOLLOW_LIMIT}), then new ones as they are posted")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per post (JSON lines)")
+    parser.add_argument("--stats", action="store_true", help="show posts per author, length and hourly activity")
+    parser.add_argument("--search", metavar="QUERY",
+                        help='show the posts best matching QUERY; "quoted words" must appear as a phrase')
+    args = parser.parse_args(argv)
+    mode = "--stats" if args.stats else "--search" if args.search else None
+    if mode:
+        # Stats come from the aggregates and search results are ranked, not a stream of posts
+        ignored = [flag for flag, value in (("--since", args.since), ("--follow", args.follow), ("--json", args.json),
+                                            ("--author", args.stats and args.author),
+                                            ("--limit", args.stats and args.limit)) if value]
+        if args.stats and args.search:
+            ignored.insert(0, "--search")
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be combined with {mode}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.stats:
+            view_stats()
+        elif args.search:
+            view_search(args.search, author=args.author, limit=args.limit)
+        else:
+            view_feed(author=args.author, limit=args.limit, since=args.since, follow=args.follow, as_json=args.json)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop quietly, and keep the
+        # interpreter's final flush from raising again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print()
+
+
 if __name__ == "__main__":
-    view_feed()
+    main()